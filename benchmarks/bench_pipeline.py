@@ -0,0 +1,193 @@
+"""
+Throughput, peak memory and startup time of the parse, stats and plot paths.
+
+Every stage runs in a fresh interpreter on synthetic logs (see
+``tslogs.synthetic``) or on the given logs, and reports the rows per second,
+the peak RSS of its process and the time until it was ready to start (the
+interpreter and imports). Results can be saved as a baseline and later runs
+compared against it, the exit status is 1 when a stage got slower or bigger
+than the threshold::
+
+    python benchmarks/bench_pipeline.py [--days N | LOG_PATH ...] [--repeat N]
+        [--save BASELINE.json] [--compare BASELINE.json [--threshold 0.15]]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+STAGE_NAMES = (
+    "parse",
+    "parse-cached",
+    "stats",
+    "stats-cached",
+    "rollups",
+    "distributions",
+    "ndjson",
+    "plot-data",
+)
+
+
+def _stage(name, paths, cache_dir):
+    """
+    Import what stage ``name`` needs, returns a function running it that
+    returns the number of rows it went over.
+    """
+    from tslogs.cache import LogCache
+    from tslogs.parse import load_files
+
+    cache = LogCache(cache_dir) if name.endswith("-cached") else None
+    if name in ("parse", "parse-cached"):
+        return lambda: len(load_files(paths, cache=cache))
+    if name in ("stats", "stats-cached", "distributions"):
+        from tslogs.stats import load_stats
+
+        dists = name == "distributions"
+        return lambda: load_stats(paths, cache=cache, distributions=dists).count
+    if name == "rollups":
+        from tslogs.stats import load_rollups
+
+        def rollups():
+            periods = load_rollups(paths, freq="1h").result().values()
+            return sum(stats.timeline.samples for stats in periods)
+
+        return rollups
+    if name == "ndjson":
+        from tslogs.export import write_ndjson
+        from tslogs.parse import iter_log_chunks
+
+        def ndjson():
+            with open(os.devnull, "w") as devnull:
+                return write_ndjson(iter_log_chunks(paths), devnull)
+
+        return ndjson
+    if name == "plot-data":
+        from tslogs.data_ploting import PlotInput, normalize_data
+
+        def plot_data():
+            frame = load_files(paths)
+            inputs = [PlotInput(field) for field in ("cpu_temp", "power", "multi")]
+            normalize_data(frame, inputs, 60, 2)
+            return len(frame)
+
+        return plot_data
+    raise ValueError(f"unknown stage {name!r}")
+
+
+def _run_stage(name, paths, cache_dir):
+    """Run one stage in this process, time taken after its imports."""
+    from tslogs.instrument import peak_rss
+
+    stage = _stage(name, paths, cache_dir)
+    ready = time.time()
+    start = time.perf_counter()
+    rows = stage()
+    seconds = time.perf_counter() - start
+    return {"ready": ready, "seconds": seconds, "rows": rows, "peak_rss": peak_rss()}
+
+
+def _spawn(name, paths, cache_dir):
+    spawned = time.time()
+    out = subprocess.run(
+        [sys.executable, __file__, "--stage", name, "--cache-dir", str(cache_dir)]
+        + [str(p) for p in paths],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    result = json.loads(out.splitlines()[-1])
+    result["startup"] = result.pop("ready") - spawned
+    return result
+
+
+def run(paths, repeat, cache_dir):
+    """Best of ``repeat`` runs of every stage, the cache is filled first."""
+    _spawn("parse-cached", paths, cache_dir)
+    results = {}
+    for name in STAGE_NAMES:
+        runs = [_spawn(name, paths, cache_dir) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r["seconds"])
+        best["rows_per_sec"] = best["rows"] / max(best["seconds"], 1e-9)
+        best["startup"] = min(r["startup"] for r in runs)
+        results[name] = best
+    return results
+
+
+def _mb(value):
+    return f"{value / 2**20:8.1f}MB" if value is not None else f"{'-':>10}"
+
+
+def report(results, baseline=None, threshold=0.15):
+    """Print the results, returns the stages that regressed against baseline."""
+    print(
+        f"{'stage':14} {'rows':>10} {'time':>9} {'rows/s':>12} {'peak RSS':>10}"
+        f" {'startup':>9}" + ("  vs baseline" if baseline else "")
+    )
+    regressed = []
+    for name, r in results.items():
+        line = (
+            f"{name:14} {r['rows']:>10} {r['seconds'] * 1000:7.0f}ms"
+            f" {r['rows_per_sec']:>12,.0f} {_mb(r['peak_rss'])}"
+            f" {r['startup'] * 1000:7.0f}ms"
+        )
+        base = (baseline or {}).get(name)
+        if base:
+            speed = r["rows_per_sec"] / base["rows_per_sec"] - 1
+            line += f"  {speed:+7.1%} rows/s"
+            slower = speed < -threshold
+            bigger = False
+            if r["peak_rss"] and base.get("peak_rss"):
+                rss = r["peak_rss"] / base["peak_rss"] - 1
+                line += f" {rss:+7.1%} RSS"
+                bigger = rss > threshold
+            if slower or bigger:
+                regressed.append(name)
+                line += "  REGRESSED"
+        print(line)
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("logs", nargs="*", type=Path, help="default: synthetic logs")
+    parser.add_argument("--days", type=int, default=7, help="of synthetic logs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", "-r", type=int, default=3)
+    parser.add_argument("--save", type=Path, metavar="BASELINE")
+    parser.add_argument("--compare", type=Path, metavar="BASELINE")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    parser.add_argument("--stage", choices=STAGE_NAMES, help=argparse.SUPPRESS)
+    parser.add_argument("--cache-dir", type=Path, help=argparse.SUPPRESS)
+    A = parser.parse_args(argv)
+
+    if A.stage:
+        print(json.dumps(_run_stage(A.stage, A.logs, A.cache_dir)))
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="tslogs-bench-") as tmp:
+        paths = A.logs
+        if not paths:
+            from tslogs.synthetic import generate_logs
+
+            paths = [Path(tmp) / "logs"]
+            generate_logs(paths[0], date(2020, 1, 1), A.days, A.seed)
+        results = run(paths, A.repeat, Path(tmp) / "cache")
+
+    baseline = json.loads(A.compare.read_text()) if A.compare else None
+    regressed = report(results, baseline, A.threshold)
+    if A.save:
+        A.save.write_text(json.dumps(results, indent=2))
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
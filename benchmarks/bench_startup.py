@@ -0,0 +1,64 @@
+"""
+Startup time of the ``tslogs`` command.
+
+Runs every command a few times in a fresh interpreter and prints the best
+and median wall time, next to a bare interpreter and the import cost of
+``matplotlib.pyplot`` which plain runs no longer pay. Cached runs use a
+temporary cache dir, filled before they are timed::
+
+    python benchmarks/bench_startup.py [--repeat N] [LOG_PATH]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_LOGS = ROOT / "tests" / "logs"
+
+
+def _run(args, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *args],
+            cwd=ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("logs", nargs="?", type=Path, default=DEFAULT_LOGS)
+    parser.add_argument("--repeat", "-r", type=int, default=10)
+    A = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="tslogs-bench-") as cache_dir:
+        cached = ["-m", "tslogs", "--cache-dir", cache_dir, str(A.logs)]
+        cases = {
+            "python (baseline)": ["-c", "pass"],
+            "import matplotlib.pyplot": ["-c", "import matplotlib.pyplot"],
+            "import tslogs.cli": ["-c", "import tslogs.cli"],
+            "tslogs --version": ["-m", "tslogs", "--version"],
+            "tslogs LOGS (summary)": ["-m", "tslogs", "--no-cache", str(A.logs)],
+            "tslogs LOGS (cached)": cached,
+        }
+        # fill the cache, the user's own cache dir is left alone
+        _run(cached, 1)
+        print(f"{'command':28} {'best':>9} {'median':>9}")
+        for name, args in cases.items():
+            best, median = _run(args, A.repeat)
+            print(f"{name:28} {best * 1000:7.0f}ms {median * 1000:7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
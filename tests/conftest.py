@@ -1,9 +1,50 @@
 import argparse
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Iterable, Optional, Sequence, Union
 
 import pytest
 
 import tslogs.cli as cli
+from tslogs.frame import LogFrame, LogLine
+
+# time of the first row of make_line and make_frame
+START = datetime(2020, 8, 7, 11)
+
+
+def make_line(
+    second: int, temp: float = 80, limits: Iterable[str] = (), value: float = 1.0
+) -> LogLine:
+    """
+    Row ``second`` seconds after ``START``, the fields before the CPU temp are
+    ``value`` and the ones after it 1.
+    """
+    return LogLine(
+        START + timedelta(seconds=int(second)),
+        *[value] * 5,
+        temp,
+        *[1.0] * 4,
+        limits=list(limits),
+    )
+
+
+def make_frame(
+    seconds: Sequence[int],
+    temps: Union[float, Sequence[float]] = 80,
+    limits: Optional[Sequence[Iterable[str]]] = None,
+    values: Optional[Sequence[float]] = None,
+) -> LogFrame:
+    """
+    Frame of :func:`make_line` rows at ``seconds``, ``temps`` is of every row or
+    of each, ``limits`` and ``values`` are of each row.
+    """
+    n = len(seconds)
+    temps = [temps] * n if isinstance(temps, (int, float)) else temps
+    limits = [()] * n if limits is None else limits
+    values = [1.0] * n if values is None else values
+    return LogFrame.from_loglines(
+        [make_line(*row) for row in zip(seconds, temps, limits, values)]
+    )
 
 
 @pytest.fixture
@@ -19,3 +60,11 @@ def test_root() -> Path:
 @pytest.fixture
 def log_root(test_root: Path) -> Path:
     return test_root / Path("logs")
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path: Path, monkeypatch) -> Path:
+    # keep the parsed logs cache of the tests out of the user's cache dir
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("TSLOGS_CACHE_DIR", str(cache_dir))
+    return cache_dir
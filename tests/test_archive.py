@@ -0,0 +1,40 @@
+import io
+from dataclasses import asdict
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from tslogs.archive import load_archive, save_archive
+from tslogs.parse import load_files
+
+
+class TestArchive:
+    def test_roundtrip(self, log_root: Path, tmp_path: Path) -> None:
+        frame = load_files([log_root])
+        path = tmp_path / "logs.npz"
+        save_archive(frame, path)
+
+        loaded = load_archive(path)
+        assert loaded.limit_names == frame.limit_names
+        assert [asdict(log) for log in loaded] == [asdict(log) for log in frame]
+        # archives are read like log files
+        assert [asdict(log) for log in load_files([path])] == [
+            asdict(log) for log in frame
+        ]
+
+    def test_file_object(self, log_root: Path) -> None:
+        frame = load_files([log_root / "2020-07-28.txt"])
+        buf = io.BytesIO()
+        save_archive(frame, buf, compress=False)
+        buf.seek(0)
+        assert len(load_archive(buf)) == len(frame)
+
+    def test_not_an_archive(self, tmp_path: Path) -> None:
+        path = tmp_path / "other.npz"
+        np.savez(path, time=np.arange(3))
+        with pytest.raises(ValueError):
+            load_archive(path)
+        # found among the logs it is skipped
+        (tmp_path / "broken.npz").write_bytes(b"not a zip")
+        assert len(load_files([tmp_path])) == 0
@@ -0,0 +1,81 @@
+import os
+import shutil
+from dataclasses import asdict
+from pathlib import Path
+
+import tslogs.parse as parse
+from tslogs.cache import LogCache
+from tslogs.parse import load_files
+from tslogs.stats import load_stats
+
+
+def _copy_logs(log_root: Path, dest: Path) -> Path:
+    shutil.copytree(log_root, dest)
+    return dest
+
+
+class TestLogCache:
+    def test_hit(self, log_root: Path, cache_dir: Path, monkeypatch) -> None:
+        cache = LogCache()
+        expected = [asdict(log) for log in load_files([log_root])]
+        assert [asdict(log) for log in load_files([log_root], cache=cache)] == expected
+        # parsed rows and index of every file, and the dir listing
+        assert (
+            len(list(cache_dir.glob("*.npz"))) == 2 * len(list(log_root.iterdir())) + 1
+        )
+
+        def fail(*args):
+            raise AssertionError("cached file was parsed again")
+
+        monkeypatch.setattr(parse, "_parse_rows", fail)
+        assert [asdict(log) for log in load_files([log_root], cache=cache)] == expected
+        assert load_stats([log_root], cache=cache).count == len(expected)
+
+    def test_invalidation(self, log_root: Path, tmp_path: Path) -> None:
+        logs = _copy_logs(log_root, tmp_path / "logs")
+        cache = LogCache()
+        path = logs / "2020-07-28.txt"
+        count = len(load_files([path], cache=cache))
+        assert cache.get(path) is not None
+
+        # appended lines change the size
+        line = path.read_text().splitlines()[-1]
+        with open(path, "a") as fp:
+            fp.write(line + "\n")
+        assert cache.get(path) is None
+        assert len(load_files([path], cache=cache)) == count + 1
+
+        # same size, different mtime
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert cache.get(path) is None
+
+    def test_corrupted_entry(self, log_root: Path) -> None:
+        cache = LogCache()
+        path = log_root / "2020-07-28.txt"
+        load_files([path], cache=cache)
+        cache._entry(path).write_bytes(b"garbage")
+        assert cache.get(path) is None
+        assert not cache._entry(path).exists()
+
+    def test_eviction(self, log_root: Path, tmp_path: Path) -> None:
+        files = sorted(log_root.iterdir())
+        cache = LogCache(tmp_path / "small")
+        load_files(files[:1], cache=cache)
+        entry_size = cache._entry(files[0]).stat().st_size
+
+        cache = LogCache(tmp_path / "small", max_size=entry_size)
+        load_files(files[1:2], cache=cache)
+        assert cache.get(files[0]) is None
+        assert cache.get(files[1]) is not None
+
+    def test_running_size(self, log_root: Path, tmp_path: Path, monkeypatch) -> None:
+        cache = LogCache(tmp_path / "cache")
+        scans = []
+        scan = cache._scan
+        monkeypatch.setattr(cache, "_scan", lambda: scans.append(1) or scan())
+        load_files([log_root], cache=cache)
+        # the directory is listed once, not on every write
+        assert len(scans) == 1
+        entries = list((tmp_path / "cache").glob("*.npz"))
+        assert cache._size == sum(e.stat().st_size for e in entries)
@@ -1,4 +1,8 @@
 import argparse
+import csv
+import json
+import subprocess
+import sys
 from pathlib import Path
 
 import tslogs.cli as cli
@@ -23,11 +27,35 @@ class TestArgsParser:
         assert p.indent == 4
         assert len(p.paths) == 1
 
+    def test_lazy_matplotlib(self) -> None:
+        # matplotlib is only imported for plots, it dominates startup time
+        code = "import sys, tslogs.cli; print('matplotlib' in sys.modules)"
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True)
+        assert out.stdout.strip() == b"False"
+
     def test_summary(self, log_root: Path) -> None:
         cli.main([f"{str(log_root)}"])
+        cli.main([str(log_root), "--distributions"])
 
-    def test_json(self, log_root: Path) -> None:
+    def test_json(self, log_root: Path, tmp_path: Path) -> None:
         cli.main([str(log_root), "-j"])
+        output = tmp_path / "output.json"
+        cli.main([str(log_root), "-j", "--output", str(output)])
+        assert len(json.loads(output.read_text())) == 10152
+
+    def test_ndjson(self, log_root: Path, tmp_path: Path) -> None:
+        output = tmp_path / "output.ndjson"
+        cli.main([str(log_root), "--ndjson", "--output", str(output)])
+        lines = output.read_text().splitlines()
+        assert len(lines) == 10152
+        assert json.loads(lines[0])["time"] == "2020-07-28 15:37:20"
+
+        # every path is kept unless merging is asked for
+        cli.main([str(log_root), str(log_root), "--ndjson", "--output", str(output)])
+        assert len(output.read_text().splitlines()) == 2 * 10152
+        args = [str(log_root), str(log_root), "--on-conflict", "first"]
+        cli.main([*args, "--ndjson", "--output", str(output)])
+        assert len(output.read_text().splitlines()) == 10152
 
     def test_plot(self, log_root, tmp_path: Path) -> None:
         output = tmp_path / "output.png"
@@ -45,3 +73,48 @@ class TestArgsParser:
                 "gpu_mhz",
             ]
         )
+        # every point and a min/max envelope
+        cli.main([str(log_root), "--output", str(output), "-p", "--points", "0"])
+        cli.main([str(log_root), "-o", str(output), "-p", "--lod-method", "minmax"])
+
+    def test_group_by(self, log_root: Path, tmp_path: Path) -> None:
+        output = tmp_path / "output.csv"
+        cli.main([str(log_root), "--group-by", "day", "--output", str(output)])
+        rows = list(csv.DictReader(output.read_text().splitlines()))
+        assert [row["period"][:10] for row in rows] == [
+            "2020-07-28",
+            "2020-07-31",
+            "2020-08-06",
+            "2020-08-07",
+        ]
+        assert sum(int(row["time_elapsed_secs"]) for row in rows) == 10170
+        assert rows[0]["PL1_secs"] == "0"
+
+        output = tmp_path / "output.json"
+        cli.main([str(log_root), "-g", "week", "-j", "--output", str(output)])
+        assert len(json.loads(output.read_text())) == 2
+
+    def test_fleet(self, log_root: Path, tmp_path: Path) -> None:
+        empty = tmp_path / "empty"
+        empty.mkdir()
+        args = [f"a={log_root}", str(log_root / "2020-07-28.txt"), str(empty)]
+        cli.main(["--fleet", *args])
+        cli.main(["-F", *args, "--rank-by", "PL1", "--top", "1", "-J", "2"])
+        assert cli.main(["--fleet", str(empty)]) == 1
+        cli.main(["--fleet", str(log_root), "--distributions"])
+
+    def test_episodes(self, log_root: Path) -> None:
+        cli.main([str(log_root), "--episodes"])
+        cli.main([str(log_root), "-e", "--min-duration", "60", "--max-gap", "1"])
+
+    def test_profile(self, log_root: Path, tmp_path: Path, capsys) -> None:
+        cli.main([str(log_root), "--profile", "json"])
+        profile = json.loads(capsys.readouterr().err)
+        stages = {stage["name"]: stage for stage in profile["stages"]}
+        assert stages["stats"]["rows"] == 10152
+
+        dump = tmp_path / "tslogs.prof"
+        cli.main([str(log_root), "--ndjson", "-o", str(tmp_path / "out.ndjson")])
+        cli.main([str(log_root), "-e", "--profile-dump", str(dump)])
+        assert "episodes" in capsys.readouterr().err
+        assert dump.stat().st_size > 0
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from tslogs.downsample import DOWNSAMPLERS, downsample
+
+
+class TestDownsample:
+    @pytest.mark.parametrize("method", list(DOWNSAMPLERS))
+    def test_keeps_shape(self, method: str) -> None:
+        rng = np.random.default_rng(0)
+        y = rng.normal(60, 5, 100_000)
+        y[12345], y[67890] = 120, 0
+        y[50000:60000] = np.nan
+        x = np.arange(len(y), dtype=np.float64)
+
+        idx = downsample(x, y, 1000, method)
+        assert len(idx) <= 1001
+        assert np.all(np.diff(idx) > 0)
+        assert idx[0] == 0 and idx[-1] == len(y) - 1
+        # spikes survive and the gap stays a gap
+        assert 12345 in idx and 67890 in idx
+        assert list(idx[np.isnan(y[idx])]) == [50000]
+
+    def test_short_series(self) -> None:
+        y = np.arange(10.0)
+        assert list(downsample(np.arange(10.0), y, 100)) == list(range(10))
+        with pytest.raises(ValueError):
+            downsample(y, y, 5, "average")
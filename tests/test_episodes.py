@@ -0,0 +1,52 @@
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+from conftest import make_frame
+
+from tslogs.episodes import find_episodes, temp_kind
+from tslogs.frame import LogFrame
+from tslogs.parse import load_files
+
+
+class TestEpisodes:
+    def test_runs(self) -> None:
+        temps = [80, 91, 95, 89, 92, 80, 80, 80, 80, 80, 80, 93]
+        limits = [[], ["PL1"], ["PL1"], [], [], [], [], ["PL1"], [], [], [], []]
+        # the multiplier of a row is its second
+        frame = make_frame(range(12), temps, limits, values=range(12))
+        episodes = find_episodes(frame, max_gap=5)
+        assert [(e.kind, e.start.second, e.end.second) for e in episodes] == [
+            ("PL1", 1, 7),
+            (temp_kind(90), 1, 4),
+            (temp_kind(90), 11, 11),
+        ]
+        pl1, hot = episodes[0], episodes[1]
+        assert pl1.duration == timedelta(seconds=7)
+        assert pl1.samples == 3
+        assert pl1.peak_cpu_temp == 95
+        assert pl1.avg_multi == np.mean(range(1, 8))
+        assert hot.samples == 3
+
+        # one second breaks
+        episodes = find_episodes(frame, limits=[], max_gap=1)
+        assert [e.samples for e in episodes] == [2, 1, 1]
+        assert find_episodes(frame, min_duration=5)[0].kind == "PL1"
+
+    def test_time_gap(self) -> None:
+        # logging stopped for a minute
+        frame = make_frame([0, 1, 61, 62], 95)
+        episodes = find_episodes(frame, temp_thresholds=(90, 99))
+        assert [(e.start.second, e.samples) for e in episodes] == [(0, 2), (1, 2)]
+        assert find_episodes(LogFrame.empty()) == []
+
+    def test_logs(self, log_root: Path) -> None:
+        frame = load_files([log_root])
+        episodes = find_episodes(frame)
+        assert episodes == sorted(episodes, key=lambda e: (e.start, e.kind))
+        for lm in frame.limit_names:
+            samples = sum(e.samples for e in episodes if e.kind == lm)
+            assert samples == np.count_nonzero(frame.limit_mask(lm))
+        hot = [e for e in episodes if e.kind == temp_kind(90)]
+        assert sum(e.samples for e in hot) == np.count_nonzero(frame["cpu_temp"] >= 90)
+        assert max(e.peak_cpu_temp for e in hot) == frame["cpu_temp"].max()
@@ -0,0 +1,54 @@
+import io
+import json
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from tslogs.export import write_json, write_ndjson
+from tslogs.frame import LogFrame, LogLine
+from tslogs.parse import iter_log_chunks, load_files
+
+
+def _lines():
+    return [
+        LogLine(datetime(2020, 8, 7, 11, 0, 0), *[1.5] * 10, limits=["PL1", "TEMP"]),
+        LogLine(datetime(2020, 8, 7, 11, 0, 1), *[float("nan")] * 10, limits=[]),
+        LogLine(datetime(2020, 8, 7, 11, 0, 2), *[-float("inf")] * 10, limits=["EDP"]),
+    ]
+
+
+class TestJsonExport:
+    @pytest.mark.parametrize("indent", [None, 0, 2, 4])
+    def test_same_as_json_dumps(self, indent) -> None:
+        lines = _lines()
+        expected = json.dumps(
+            [asdict(log) for log in lines], default=str, indent=indent
+        )
+        for logs in [lines, LogFrame.from_loglines(lines)]:
+            out = io.StringIO()
+            assert write_json(logs, out, indent) == len(lines)
+            assert out.getvalue() == expected
+
+    def test_empty(self) -> None:
+        out = io.BytesIO()
+        out.mode = "wb"
+        assert write_json([], out) == 0
+        assert out.getvalue() == b"[]"
+
+    def test_chunks(self, log_root: Path) -> None:
+        frame = load_files([log_root / "2020-07-28.txt"])
+        out = io.StringIO()
+        write_json(iter_log_chunks([log_root / "2020-07-28.txt"], chunk_size=1000), out)
+        assert len(json.loads(out.getvalue())) == len(frame)
+
+
+class TestNdjsonExport:
+    def test_lines(self) -> None:
+        lines = _lines()
+        out = io.StringIO()
+        assert write_ndjson(lines, out) == len(lines)
+        assert out.getvalue().splitlines() == [
+            json.dumps(asdict(log), default=str, separators=(",", ":")) for log in lines
+        ]
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import pytest
+
+from tslogs.fleet import (
+    fleet_total,
+    limit_secs,
+    load_fleet,
+    parse_sources,
+    rank_hosts,
+    rank_value,
+)
+from tslogs.parse import load_files
+from tslogs.stats import get_stats
+
+
+class TestFleet:
+    def test_parse_sources(self, log_root: Path) -> None:
+        sources = parse_sources([f"a={log_root}", log_root, f"a={log_root / 'x'}"])
+        assert sources == {"a": [log_root, log_root / "x"], "logs": [log_root]}
+
+    def test_same_names(self, tmp_path: Path) -> None:
+        alice, bob = (
+            tmp_path / "alice" / "ThrottleStop",
+            tmp_path / "bob" / "ThrottleStop",
+        )
+        sources = parse_sources([alice, bob, alice, tmp_path / "a"])
+        assert sources == {
+            "alice/ThrottleStop": [alice, alice],
+            "bob/ThrottleStop": [bob],
+            "a": [tmp_path / "a"],
+        }
+        # bare paths are told apart from the given labels too
+        sources = parse_sources([alice, f"ThrottleStop={bob}"])
+        assert list(sources) == ["alice/ThrottleStop", "ThrottleStop"]
+
+    def test_load_fleet(self, log_root: Path) -> None:
+        day = log_root / "2020-07-28.txt"
+        sources = {"all": [log_root], "copies": [log_root, log_root], "day": [day]}
+        for workers in [None, 2]:
+            accs = load_fleet(sources, workers=workers)
+            stats = {host: acc.result() for host, acc in accs.items()}
+            expected = get_stats(load_files([log_root]))
+            assert stats["all"].time_elapsed == expected.time_elapsed
+            # copies of the same logs count once
+            assert stats["copies"].time_elapsed == expected.time_elapsed
+            assert stats["copies"].timeline.duplicates == expected.timeline.duplicates
+            assert stats["day"] == get_stats(load_files([day]))
+
+        ranked = rank_hosts(stats, "percent_above_90")
+        values = [rank_value(s, "percent_above_90") for _, s in ranked]
+        assert values == sorted(values, reverse=True)
+        assert rank_value(stats["day"], "time_elapsed") == (
+            stats["day"].time_elapsed.total_seconds()
+        )
+        assert rank_value(stats["all"], "PL1") == limit_secs(stats["all"], "PL1") > 0
+        assert limit_secs(stats["all"], "EDP OTHER") == 0
+
+        total = fleet_total(accs.values()).result()
+        assert total.time_elapsed == sum(
+            (s.time_elapsed for s in stats.values()), total.time_elapsed * 0
+        )
+        assert total.max_cpu_temp == max(s.max_cpu_temp for s in stats.values())
+        assert limit_secs(total, "PL1") == pytest.approx(
+            sum(limit_secs(s, "PL1") for s in stats.values()), abs=1
+        )
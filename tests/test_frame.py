@@ -0,0 +1,123 @@
+import pickle
+import tracemalloc
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pytest
+from conftest import make_line
+
+from tslogs.data_ploting import PlotInput, normalize_data
+from tslogs.frame import CompactLogLine, LogFrame, LogLine, SlottedLogLine
+from tslogs.parse import load_files
+
+
+class TestLogFrame:
+    def test_roundtrip(self) -> None:
+        lines = [
+            make_line(0, 80, ["PL1"]),
+            make_line(1, 91, ["PL2", "PL1"]),
+            make_line(2, 70),
+        ]
+        frame = LogFrame.from_loglines(lines)
+
+        assert len(frame) == 3
+        assert frame.limit_names == ("PL1", "PL2")
+        assert frame.time.dtype == np.dtype("datetime64[s]")
+        assert [asdict(log) for log in frame] == [
+            asdict(make_line(0, 80, ["PL1"])),
+            asdict(make_line(1, 91, ["PL1", "PL2"])),
+            asdict(make_line(2, 70)),
+        ]
+        assert frame[1].cpu_temp == 91
+        assert list(frame.limit_mask("PL2")) == [False, True, False]
+
+    def test_concat_remaps_limits(self) -> None:
+        a = LogFrame.from_loglines([make_line(0, 80, ["PL1"])])
+        b = LogFrame.from_loglines(
+            [make_line(1, 80, ["TEMP"]), make_line(2, 80, ["PL1"])]
+        )
+        frame = LogFrame.concat([b, a])
+
+        assert frame.limit_names == ("TEMP", "PL1")
+        assert [log.limits for log in frame] == [["TEMP"], ["PL1"], ["PL1"]]
+        assert [log.time.second for log in frame.sort()] == [0, 1, 2]
+
+    def test_between(self) -> None:
+        frame = LogFrame.from_loglines([make_line(s, 80) for s in range(10)])
+        sub = frame.between(
+            datetime(2020, 8, 7, 11, 0, 2), datetime(2020, 8, 7, 11, 0, 5)
+        )
+        assert [log.time.second for log in sub] == [2, 3, 4]
+        # unsorted frames are filtered with a mask
+        assert (
+            len(frame.take(np.arange(10)[::-1]).between(sub[0].time, sub[-1].time)) == 2
+        )
+
+    def test_time_slice(self) -> None:
+        frame = LogFrame.from_loglines([make_line(s // 2, 80) for s in range(10)])
+        assert frame.time_slice(
+            datetime(2020, 8, 7, 11, 0, 1), datetime(2020, 8, 7, 11, 0, 3)
+        ) == slice(2, 6)
+        # empty and reversed ranges
+        start = datetime(2020, 8, 7, 11, 0, 9)
+        assert frame.time_slice(start, start) == slice(10, 10)
+        assert frame.time_slice(start, datetime(2020, 8, 7)) == slice(10, 10)
+
+
+def _row_bytes(frame: LogFrame, compact: bool) -> float:
+    tracemalloc.start()
+    try:
+        rows = frame.to_loglines(compact)
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(rows) == len(frame)
+    return size / len(frame)
+
+
+class TestCompactLogLine:
+    def test_compatible(self) -> None:
+        line = make_line(1, 91, ["PL2", "PL1"])
+        compact = CompactLogLine(**asdict(line))
+        assert vars(line)["multi"] == 1
+        assert not hasattr(compact, "__dict__")
+        assert compact == line and line == compact
+        assert asdict(compact) == asdict(line)
+        assert compact.limits == ["PL2", "PL1"]
+        assert pickle.loads(pickle.dumps(compact)) == compact
+        compact.limits = ["TEMP"]
+        assert compact.limits == ["TEMP"] and compact != line
+
+        frame = LogFrame.from_loglines([line, make_line(2, 70)])
+        assert frame.to_loglines(compact=True) == frame.to_loglines()
+
+    @pytest.mark.parametrize("limits", [["PL1", "PL2"], ["PL2", "PL1"]])
+    def test_round_trip(self, limits: List[str]) -> None:
+        line = make_line(1, 91, limits)
+        for cls in (SlottedLogLine, CompactLogLine):
+            row = cls(**asdict(line))
+            assert not hasattr(row, "__dict__")
+            assert row == line and line == row
+            assert row.limits == limits
+            assert LogLine(**asdict(row)) == line
+            assert pickle.loads(pickle.dumps(row)) == row
+        assert CompactLogLine(**asdict(line)) == SlottedLogLine(**asdict(line))
+
+    def test_row_memory(self, log_root: Path) -> None:
+        frame = load_files([log_root])
+        row_bytes, compact_bytes = _row_bytes(frame, False), _row_bytes(frame, True)
+        # slots, shared floats and an int for the limits, measured ~200 bytes
+        # against ~525 for a LogLine
+        assert compact_bytes < 250
+        assert compact_bytes / row_bytes < 0.45
+
+
+class TestFramePipeline:
+    def test_normalize_data(self, log_root: Path) -> None:
+        frame = load_files([log_root])
+        times, data = normalize_data(frame, [PlotInput("cpu_temp")], 1, None)
+        assert data.shape == (1, len(times))
+        assert np.nanmax(data) == frame["cpu_temp"].max()
@@ -0,0 +1,149 @@
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import tslogs.parse as parse
+from tslogs.cache import LogCache
+from tslogs.index import INDEX_INTERVAL, FileIndex
+from tslogs.parse import load_files
+
+HEADER = "   DATE       TIME    MULTI   C0%   CKMOD  CHIPM   BAT_mW  TEMP   NVIDIA GPU"
+START = datetime(2020, 8, 7, 10)
+
+
+def _lines(start: int, stop: int, step: int = 10) -> str:
+    return "".join(
+        f"{START + timedelta(seconds=s):%Y-%m-%d  %H:%M:%S}  26.74   41.0  100.0"
+        f"  100.0    31478   {s % 90}     300    46   1.0313   19.7  PL1\n"
+        for s in range(start, stop, step)
+    )
+
+
+def _rows(frame) -> list:
+    return [asdict(log) for log in frame]
+
+
+class TestFileIndex:
+    def test_byte_range(self) -> None:
+        times = np.datetime64(START, "s") + np.arange(0, 7200, 10)
+        index = FileIndex.empty().extend(times, np.arange(720) * 100, 72000, b"\n")
+        assert len(index.times) == 7200 // INDEX_INTERVAL
+        assert index.monotonic
+        assert index.byte_range(START, START + timedelta(hours=3)) == (0, 72000)
+        lo, hi = index.byte_range(
+            START + timedelta(seconds=650), START + timedelta(seconds=1200)
+        )
+        assert (lo, hi) == (6000, 12000)
+        # rows going back in time
+        assert not index.extend(times[:1], np.array([72000]), 72100, b"\n").monotonic
+
+    def test_range_read(self, tmp_path: Path, monkeypatch) -> None:
+        path = tmp_path / "2020-08-07.txt"
+        path.write_text(HEADER + "\n" + _lines(0, 6 * 3600))
+        cache = LogCache()
+        full = load_files([path], cache=cache)
+        index = cache.get_index(path)
+        assert index.monotonic and index.size == path.stat().st_size
+
+        parsed = []
+        parse_rows = parse._parse_rows
+
+        def counting(buf):
+            parsed.append(len(buf))
+            return parse_rows(buf)
+
+        monkeypatch.setattr(parse, "_parse_rows", counting)
+        # new lines make the parsed rows stale, the index is still good
+        with open(path, "a") as fp:
+            fp.write(_lines(6 * 3600, 6 * 3600 + 600))
+        full = load_files([path])
+        date_range = (datetime(2020, 8, 7, 14), datetime(2020, 8, 7, 15))
+        parsed.clear()
+        assert _rows(load_files([path], date_range, cache=cache)) == _rows(
+            full.between(*date_range)
+        )
+        assert 0 < sum(parsed) < path.stat().st_size / 4
+        # the new lines were indexed
+        assert cache.get_index(path).size == path.stat().st_size
+
+        # the same with a dir and a range within a file
+        date_range = (datetime(2020, 8, 7, 15, 59, 55), datetime(2020, 8, 7, 16, 5))
+        assert _rows(load_files([tmp_path], date_range, cache=cache)) == _rows(
+            full.between(*date_range)
+        )
+
+    def test_range_read_no_cache(self, tmp_path: Path, monkeypatch) -> None:
+        path = tmp_path / "2020-08-07.txt"
+        path.write_text(HEADER + "\n" + _lines(0, 12 * 3600))
+        full = load_files([path])
+        ranges = []
+        parse_range = parse._parse_range
+
+        def counting(file_path, block_size, start=0, stop=None):
+            ranges.append((start, stop))
+            return parse_range(file_path, block_size, start, stop)
+
+        monkeypatch.setattr(parse, "_parse_range", counting)
+        for date_range in [
+            (datetime(2020, 8, 7, 14), datetime(2020, 8, 7, 15)),
+            (START - timedelta(hours=1), START + timedelta(seconds=1)),
+            (datetime(2020, 8, 7, 21, 59, 50), datetime(2020, 8, 8)),
+        ]:
+            ranges.clear()
+            assert _rows(load_files([path], date_range)) == _rows(
+                full.between(*date_range)
+            )
+            # only the bytes around the range were parsed
+            [(lo, hi)] = ranges
+            assert 0 < hi - lo < path.stat().st_size / 4
+
+        # rows out of time order are all read
+        path.write_text(HEADER + "\n" + _lines(3600, 12 * 3600) + _lines(0, 3600))
+        date_range = (START, START + timedelta(minutes=10))
+        ranges.clear()
+        assert len(load_files([path], date_range)) == 60
+        assert ranges == [(0, None)]
+
+    @pytest.mark.parametrize("header", [HEADER + "\n", ""])
+    def test_range_read_first_row(self, tmp_path: Path, header: str) -> None:
+        path = tmp_path / "2020-08-07.txt"
+        path.write_text(header + _lines(0, 8000, 1))
+        assert path.stat().st_size > 4 * parse.PROBE_SIZE
+        assert parse._probe_index(path).offsets[0] == len(header)
+        frame = load_files([path], (START, START + timedelta(hours=1)))
+        assert len(frame) == 3600 and frame[0].time == START
+
+    def test_partial_line(self, tmp_path: Path) -> None:
+        path = tmp_path / "2020-08-07.txt"
+        lines = _lines(0, 3600)
+        path.write_text(HEADER + "\n" + lines[:-20])
+        cache = LogCache()
+        load_files([path], cache=cache)
+        # the last line is only indexed once it is complete
+        assert (
+            cache.get_index(path).size
+            == path.stat().st_size - len(lines.splitlines(keepends=True)[-1]) + 20
+        )
+        with open(path, "a") as fp:
+            fp.write(lines[-20:])
+        date_range = (START, START + timedelta(hours=1))
+        assert len(load_files([path], date_range, cache=cache)) == 360
+        assert cache.get_index(path).size == path.stat().st_size
+
+    def test_invalidation(self, log_root: Path, tmp_path: Path) -> None:
+        cache = LogCache()
+        # the sample logs jump back in time, so they are not read by range
+        load_files([log_root], cache=cache)
+        assert not cache.get_index(log_root / "2020-07-31.txt").monotonic
+
+        path = tmp_path / "2020-08-07.txt"
+        path.write_text(HEADER + "\n" + _lines(0, 3600))
+        load_files([path], cache=cache)
+        assert cache.get_index(path) is not None
+        path.write_text(HEADER + "\n" + _lines(1, 3601))
+        assert cache.get_index(path) is None
+        path.write_text(HEADER + "\n")
+        assert cache.get_index(path) is None
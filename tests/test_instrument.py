@@ -0,0 +1,64 @@
+from pathlib import Path
+
+from tslogs.cache import LogCache
+from tslogs.export import write_ndjson
+from tslogs.instrument import Profiler, active_profiler, profiling, stage
+from tslogs.parse import iter_log_chunks, load_files
+from tslogs.stats import load_stats
+
+
+class TestInstrument:
+    def test_disabled(self) -> None:
+        assert active_profiler() is None
+        with stage("parse") as st:
+            st.add(10, 100)
+        assert stage("parse") is stage("stats")
+
+    def test_stages(self, log_root: Path, tmp_path: Path) -> None:
+        size = sum(p.stat().st_size for p in log_root.iterdir())
+        with profiling() as prof:
+            assert active_profiler() is prof
+            load_stats(log_root, cache=None)
+        assert active_profiler() is None
+        stages = prof.stages
+        assert list(stages) == ["discover", "parse", "stats"]
+        assert stages["parse"].rows == stages["stats"].rows == 10152
+        assert 0 < stages["parse"].bytes <= size
+        assert stages["parse"].calls == 4
+        assert all(s.seconds > 0 for s in stages.values())
+        assert prof.seconds >= stages["parse"].seconds
+        table = prof.format_table()
+        assert "parse" in table and "total" in table
+
+        cache = LogCache(tmp_path / "cache")
+        load_files(log_root, cache=cache)
+        with profiling() as prof:
+            load_files(log_root, cache=cache)
+        assert "parse" not in prof.stages
+        assert prof.stages["cache"].rows == 10152
+
+    def test_nested(self) -> None:
+        events = []
+        prof = Profiler(hook=lambda *event: events.append(event))
+        with profiling(prof):
+            with stage("outer") as outer:
+                outer.add(2)
+                for _ in range(3):
+                    with stage("inner") as inner:
+                        inner.add(1, 8)
+        assert [e[0] for e in events] == ["inner"] * 3 + ["outer"]
+        assert prof.stages["outer"].depth == 0
+        assert prof.stages["inner"].depth == 1
+        assert prof.stages["inner"].calls == 3
+        assert prof.stages["inner"].bytes == 24
+        assert prof.stages["outer"].seconds >= prof.stages["inner"].seconds
+        assert prof.to_dict()["stages"][0]["name"] == "outer"
+
+    def test_export(self, log_root: Path, tmp_path: Path) -> None:
+        dump = tmp_path / "out.prof"
+        with (tmp_path / "out.ndjson").open("w") as out:
+            with profiling(dump=dump) as prof:
+                write_ndjson(iter_log_chunks(log_root), out)
+        assert prof.stages["format"].rows == 10152
+        assert prof.stages["write"].bytes == (tmp_path / "out.ndjson").stat().st_size
+        assert dump.stat().st_size > 0
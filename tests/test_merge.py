@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from conftest import make_frame
+
+from tslogs.frame import LogFrame
+from tslogs.merge import merge_frames, merge_sources
+from tslogs.parse import iter_merged_frames, load_files
+from tslogs.stats import get_stats, load_stats
+
+
+def _seconds(frame: LogFrame) -> list:
+    return (frame.time - np.datetime64("2020-08-07T11:00:00")).astype(int).tolist()
+
+
+class TestMergeSources:
+    def test_policies(self) -> None:
+        sources = [
+            make_frame([0, 1, 1], 80, [["PL1"]] * 3),
+            make_frame([1, 2], 90),
+            make_frame([2], 100),
+        ]
+        keep = merge_sources(sources, "keep")
+        assert _seconds(keep) == [0, 1, 1, 1, 2, 2]
+        first = merge_sources(sources, "first")
+        # the same second twice in one source are two samples
+        assert _seconds(first) == [0, 1, 1, 2]
+        assert first["cpu_temp"].tolist() == [80, 80, 80, 90]
+        last = merge_sources(sources, "last")
+        assert last["cpu_temp"].tolist() == [80, 90, 100]
+        mean = merge_sources(sources, "mean")
+        assert _seconds(mean) == [0, 1, 2]
+        assert mean["cpu_temp"].tolist() == pytest.approx([80, 250 / 3, 95])
+        assert mean.limit_mask("PL1").tolist() == [True, True, False]
+        # no timestamp in several sources
+        alone = merge_sources([make_frame([0, 0, 1]), make_frame([2])], "first")
+        assert _seconds(alone) == [0, 0, 1, 2]
+        with pytest.raises(ValueError):
+            merge_sources(sources, "newest")
+
+
+class TestMergeFrames:
+    def test_merge(self) -> None:
+        a = [make_frame([0, 2]), make_frame([4, 6, 6]), make_frame([6, 8])]
+        b = [make_frame([1, 2, 3], 90), make_frame([]), make_frame([3, 9], 90)]
+        merged = list(merge_frames([a, b], "first"))
+        frame = LogFrame.concat(merged)
+        # rows sharing a second within a stream are kept, across streams not
+        assert _seconds(frame) == [0, 1, 2, 3, 3, 4, 6, 6, 6, 8, 9]
+        # ties go to the first stream
+        assert frame["cpu_temp"][2] == 80
+        assert frame["cpu_temp"][3] == 90
+        # rows are yielded as soon as no stream can precede them
+        assert len(merged) > 1
+        keep = LogFrame.concat(list(merge_frames([a, b], "keep")))
+        assert _seconds(keep) == [0, 1, 2, 2, 3, 3, 4, 6, 6, 6, 8, 9]
+        assert list(merge_frames([], "first")) == []
+
+    def test_overlapping_paths(self, log_root: Path) -> None:
+        frame = load_files([log_root])
+        merged = LogFrame.concat(list(iter_merged_frames([log_root, log_root])))
+        assert merged.is_sorted()
+        # the duplicates within the logs are kept, the copy is dropped
+        assert len(merged) == len(frame) == 10152
+        assert len(load_files([log_root, log_root], on_conflict="first")) == 10152
+        assert len(load_files([log_root, log_root], on_conflict="mean")) == 9984
+
+        stats = load_stats([log_root, log_root], on_conflict="first").result()
+        expected = get_stats(frame)
+        assert stats.time_elapsed == expected.time_elapsed
+        assert stats.timeline.duplicates == expected.timeline.duplicates == 168
+        assert stats.avg_cpu_temp == pytest.approx(expected.avg_cpu_temp)
+
+    def test_distinct_paths(self, log_root: Path) -> None:
+        a, b = log_root / "2020-07-28.txt", log_root / "2020-07-31.txt"
+        sizes = len(load_files([a])), len(load_files([b]))
+        assert sizes == (2925, 2683)
+        for workers in (1, 2):
+            merged = load_files([a, b], workers=workers, on_conflict="first")
+            assert len(merged) == sum(sizes)
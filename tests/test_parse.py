@@ -0,0 +1,192 @@
+import random
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+import tslogs.parse as parse
+from tslogs.frame import MAX_LIMITS, LogFrame
+from tslogs.parse import (
+    LogTailer,
+    _parse_buffer,
+    _parse_log_lines,
+    iter_log_chunks,
+    iter_logs,
+    load_files,
+)
+
+HEADER = (
+    "   DATE       TIME    MULTI   C0%   CKMOD  CHIPM   BAT_mW  TEMP"
+    "   NVIDIA GPU     VID   POWER"
+)
+ODD_NUMBERS = [
+    *["-1.5", "+2", "1e3", "inf", "1.2.3", ".", "-", "1_0", "0.", ".5"],
+    *["12.5.", "1..", "..."],
+]
+ODD_DATES = ["2020-02-30", "2020-13-01", "2020-8-07", "20x0-08-07"]
+ODD_TIMES = ["24:00:00", "12:60:00", "1:02:03", "12-00-00"]
+
+
+def _rows(loglines):
+    # limits are kept as a bitmask, their order in a row is not preserved
+    return [{**asdict(log), "limits": sorted(log.limits)} for log in loglines]
+
+
+def _random_lines(rng: random.Random, count: int):
+    lines = [HEADER]
+    for i in range(count):
+        date = "2020-08-07" if rng.random() > 0.05 else rng.choice(ODD_DATES)
+        time = f"{i // 3600 % 24:02}:{i // 60 % 60:02}:{i % 60:02}"
+        if rng.random() < 0.05:
+            time = rng.choice(ODD_TIMES)
+        values = [
+            f"{rng.uniform(0, 10 ** rng.randint(0, 5)):.{rng.randint(0, 4)}f}"
+            for _ in range(10)
+        ]
+        if rng.random() < 0.05:
+            values[rng.randrange(10)] = rng.choice(ODD_NUMBERS)
+        if rng.random() < 0.02:
+            values.pop()
+        limits = rng.sample(["PL1", "PL2", "TEMP", "EDP", "OTHER"], rng.randint(0, 2))
+        sep = " " * rng.randint(1, 3)
+        lines.append(sep.join([date, time, *values, *limits]))
+        if rng.random() < 0.01:
+            lines.append("")
+    return lines
+
+
+class TestBulkParser:
+    def test_matches_line_parser(self) -> None:
+        rng = random.Random(42)
+        for newline in ["\n", "\r\n"]:
+            lines = _random_lines(rng, 2000)
+            expected = _rows(_parse_log_lines(lines))
+            buffer = newline.join(lines).encode()
+            assert _rows(_parse_buffer(buffer)) == expected
+
+    def test_empty_and_unterminated(self) -> None:
+        assert len(_parse_buffer(b"")) == 0
+        assert len(_parse_buffer(HEADER.encode() + b"\n")) == 0
+        frame = _parse_buffer(
+            b"2020-08-07  11:00:00  1 2 3 4 5 6 7 8 9 10  PL1\n"
+            b"2020-08-07  11:00:01  1 2 3 4 5 6 7 8 9 10  TEMP"
+        )
+        assert [log.limits for log in frame] == [["PL1"], ["TEMP"]]
+
+    def test_malformed_number(self, log_root: Path, tmp_path: Path) -> None:
+        # dots past the end of the decimals used to index out of the powers of ten
+        row = "2020-08-07  11:00:00  {} 2 3 4 5 6 7 8 9 10\n"
+        buffer = (HEADER + "\n" + row.format("12.5.") + row.format("1")).encode()
+        frame = _parse_buffer(buffer)
+        assert len(frame) == 1 and frame[0].multi == 1
+        path = tmp_path / "2020-08-07.txt"
+        path.write_text(HEADER + "\n" + row.format("12.5."))
+        assert len(load_files([path])) == 0
+
+    def test_too_many_limits(self) -> None:
+        lines = [
+            f"2020-08-07  11:{i // 60:02}:{i % 60:02}  1 2 3 4 5 6 7 8 9 10  LIMIT{i}"
+            for i in range(MAX_LIMITS + 1)
+        ]
+        message = f"at most {MAX_LIMITS} distinct limits"
+        with pytest.raises(ValueError, match=message):
+            _parse_buffer("\n".join([HEADER, *lines]).encode())
+        with pytest.raises(ValueError, match=message):
+            _parse_log_lines(lines)
+        assert len(_parse_log_lines(lines[:MAX_LIMITS]).limit_names) == MAX_LIMITS
+
+    def test_fixture_logs(self, log_root: Path) -> None:
+        lines = []
+        for path in sorted(log_root.iterdir()):
+            lines += path.read_text().splitlines()
+        expected = [asdict(log) for log in _parse_log_lines(lines).sort()]
+        parsed = load_files(sorted(log_root.iterdir()))
+        assert [asdict(log) for log in parsed] == expected
+
+
+class TestStreaming:
+    def test_iter_logs(self, log_root: Path, monkeypatch) -> None:
+        expected = _rows(load_files([log_root]))
+        # tiny blocks to cross line boundaries a lot
+        monkeypatch.setattr(parse, "READ_BLOCK_SIZE", 1000)
+        assert _rows(LogFrame.from_loglines(iter_logs([log_root])).sort()) == expected
+
+        chunks = list(iter_log_chunks([log_root], chunk_size=1000))
+        assert [len(c) for c in chunks[:-1]] == [1000] * (len(chunks) - 1)
+        assert _rows(LogFrame.concat(chunks).sort()) == expected
+
+    def test_blocks(self, log_root: Path, tmp_path: Path) -> None:
+        path = tmp_path / "2020-07-28.txt"
+        path.write_bytes((log_root / "2020-07-28.txt").read_bytes().rstrip())
+        expected = _rows(_parse_buffer(path.read_bytes()))
+        # blocks shorter than a line and a last line without line end
+        for block_size in [10, 1000, 1 << 22]:
+            frames = parse._parse_blocks(path, block_size)
+            assert _rows(LogFrame.concat(list(frames))) == expected
+
+        (tmp_path / "empty.txt").write_bytes(b"")
+        assert list(parse._parse_blocks(tmp_path / "empty.txt", 1000)) == []
+
+    def test_date_range(self, log_root: Path) -> None:
+        date_range = (datetime(2020, 7, 28, 16), datetime(2020, 7, 28, 16, 15))
+        paths = [log_root / "2020-07-28.txt"]
+        expected = _rows(load_files(paths, date_range))
+        assert 0 < len(expected) <= 900
+        assert _rows(iter_logs(paths, date_range)) == expected
+
+
+class TestParallel:
+    def test_workers(self, log_root: Path) -> None:
+        expected = load_files([log_root])
+        assert expected.is_sorted()
+        assert _rows(load_files([log_root], workers=2)) == _rows(expected)
+
+
+class TestLogTailer:
+    def test_follow_appends(self, log_root: Path, tmp_path: Path) -> None:
+        lines = (log_root / "2020-07-28.txt").read_bytes().splitlines(True)
+        path = tmp_path / "2020-07-28.txt"
+        path.write_bytes(b"".join(lines[:10]))
+
+        tailer = LogTailer(path, from_start=True)
+        assert len(tailer.poll()) == 9
+        assert len(tailer.poll()) == 0
+
+        # a partial line is only parsed once complete
+        with open(path, "ab") as fp:
+            fp.write(lines[10] + lines[11][:5])
+        assert len(tailer.poll()) == 1
+        with open(path, "ab") as fp:
+            fp.write(lines[11][5:])
+        assert _rows(tailer.poll()) == _rows(_parse_log_lines([lines[11].decode()]))
+
+        # replaced file is read again
+        path.unlink()
+        path.write_bytes(b"".join(lines[:3]))
+        assert len(tailer.poll()) == 2
+
+    def test_skip_existing(self, log_root: Path, tmp_path: Path) -> None:
+        lines = (log_root / "2020-07-28.txt").read_bytes().splitlines(True)
+        path = tmp_path / "2020-07-28.txt"
+        path.write_bytes(b"".join(lines[:10]) + lines[10][:5])
+
+        tailer = LogTailer(path)
+        assert len(tailer.poll()) == 0
+        with open(path, "ab") as fp:
+            fp.write(lines[10][5:])
+        assert len(tailer.poll()) == 1
+
+    def test_rotation(self, log_root: Path, tmp_path: Path) -> None:
+        lines = (log_root / "2020-07-28.txt").read_bytes().splitlines(True)
+        today = tmp_path / "2020-07-28.txt"
+        today.write_bytes(b"".join(lines[:10]))
+        tailer = LogTailer(tmp_path)
+        assert tailer.file == today
+
+        # last line of the day is written without a line end
+        with open(today, "ab") as fp:
+            fp.write(lines[10].rstrip())
+        (tmp_path / "2020-07-29.txt").write_bytes(b"".join(lines[:4]))
+        assert len(tailer.poll()) == 1 + 3
+        assert tailer.file.name == "2020-07-29.txt"
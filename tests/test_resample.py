@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+from conftest import START, make_frame
+
+from tslogs.frame import LogFrame
+from tslogs.resample import REDUCERS, resample
+
+PYTHON_REDUCERS = {"mean": lambda v: sum(v) / len(v), "max": max, "min": min}
+
+
+class TestResample:
+    @pytest.mark.parametrize("reducer", list(REDUCERS))
+    def test_reducers(self, reducer: str) -> None:
+        rng = np.random.default_rng(0)
+        seconds = rng.integers(0, 600, 500)
+        temps = rng.uniform(40, 100, 500).round(1)
+        # unsorted with duplicated times and gaps
+        seconds[100:150] = seconds[99]
+        seconds = seconds[(seconds < 200) | (seconds > 300)]
+        temps = temps[: len(seconds)]
+        times, data = resample(make_frame(seconds, temps), ["cpu_temp"], 60, reducer)
+
+        assert times[0] == np.datetime64(START + timedelta(seconds=int(seconds.min())))
+        base = int(seconds.min())
+        order = np.argsort(seconds, kind="stable")
+        buckets = {}
+        for s, t in zip(seconds[order], temps[order]):
+            buckets.setdefault((s - base) // 60, []).append(t)
+        for i, value in enumerate(data[0]):
+            if i not in buckets:
+                assert np.isnan(value)
+            elif reducer == "last":
+                assert value == buckets[i][-1]
+            else:
+                assert value == pytest.approx(PYTHON_REDUCERS[reducer](buckets[i]))
+
+    def test_empty_and_errors(self) -> None:
+        times, data = resample(LogFrame.empty(), ["cpu_temp", "power"], 60)
+        assert len(times) == 0 and data.shape == (2, 0)
+        with pytest.raises(ValueError):
+            resample(make_frame([0], [50.0]), ["cpu_temp"], 60, "median")
+        with pytest.raises(ValueError):
+            resample(make_frame([0], [50.0]), ["cpu_temp"], 0)
@@ -0,0 +1,55 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from tslogs.sketch import Histogram, TDigest
+
+
+class TestTDigest:
+    def test_quantiles(self) -> None:
+        values = np.random.default_rng(0).gamma(3, 10, 200_000)
+        digest = TDigest()
+        for chunk in np.array_split(values, 50):
+            digest.update(chunk)
+        # memory is bounded by the compression, not by the values
+        assert len(digest.means) <= digest.compression
+        assert digest.count == len(values)
+        for q in [0.01, 0.5, 0.95, 0.99]:
+            assert digest.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.01)
+        assert digest.quantile(0) == values.min()
+        assert digest.quantile(1) == values.max()
+
+    def test_merge(self) -> None:
+        values = np.random.default_rng(1).normal(80, 5, 100_000)
+        parts = [TDigest() for _ in range(4)]
+        for digest, chunk in zip(parts, np.array_split(values, 4)):
+            digest.update(chunk)
+        # digests travel between processes
+        merged = pickle.loads(pickle.dumps(parts[0]))
+        for digest in parts[1:]:
+            merged.merge(digest)
+        assert merged.count == len(values)
+        for q in [0.5, 0.99]:
+            assert merged.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.01)
+
+    def test_edge_cases(self) -> None:
+        digest = TDigest()
+        assert np.isnan(digest.quantile(0.5))
+        digest.update([np.nan, 42.0, np.nan])
+        assert digest.quantile(0.5) == digest.quantile(0.99) == 42.0
+        assert digest.merge(TDigest()).count == 1
+
+
+class TestHistogram:
+    def test_counts(self) -> None:
+        hist = Histogram(0, 10, 5)
+        hist.update([-1, 0, 1.9, 2, 9.5, 10, 11, np.nan])
+        assert hist.counts.tolist() == [2, 1, 0, 0, 2]
+        assert (hist.below, hist.above) == (1, 1)
+
+        other = Histogram(0, 10, 5)
+        other.update([5])
+        assert hist.merge(other).counts.tolist() == [2, 1, 1, 0, 2]
+        with pytest.raises(ValueError):
+            hist.merge(Histogram(0, 10, 4))
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from tslogs.smoothing import SMOOTHERS, smooth
+
+
+def _window(arr: np.ndarray, i: int, span: int) -> np.ndarray:
+    return arr[max(0, i - span) : i + span + 1]
+
+
+def _ewma(arr: np.ndarray, span: int) -> np.ndarray:
+    decay = 1 - 1 / (span + 1)
+    num = den = 0.0
+    out = np.full(len(arr), np.nan)
+    for i, x in enumerate(arr):
+        num, den = num * decay, den * decay
+        if not np.isnan(x):
+            num, den = num + x, den + 1
+            out[i] = num / den
+    return out
+
+
+def _reference(arr: np.ndarray, span: int, method: str) -> np.ndarray:
+    if method == "ewma":
+        return _ewma(arr, span)
+    func = np.nanmean if method == "boxcar" else np.nanmedian
+    out = np.full(len(arr), np.nan)
+    for i in np.flatnonzero(~np.isnan(arr)):
+        out[i] = func(_window(arr, i, span))
+    return out
+
+
+class TestSmoothing:
+    @pytest.mark.parametrize("method", list(SMOOTHERS))
+    @pytest.mark.parametrize("span", [1, 2, 7, 60])
+    def test_matches_reference(self, method: str, span: int) -> None:
+        rng = np.random.default_rng(span)
+        arr = rng.uniform(0, 100, 1000)
+        arr[rng.random(1000) < 0.1] = np.nan
+        arr[300:400] = np.nan
+        out = smooth(arr, span, method)
+        np.testing.assert_allclose(out, _reference(arr, span, method))
+
+    def test_gaps_do_not_spread(self) -> None:
+        arr = np.array([1.0, 2.0, np.nan, 4.0, 5.0])
+        out = smooth(arr, 2)
+        assert np.isnan(out[2])
+        assert out[0] == pytest.approx(np.mean([1.0, 2.0]))
+        assert out[3] == pytest.approx(np.mean([2.0, 4.0, 5.0]))
+
+    def test_edge_cases(self) -> None:
+        assert len(smooth(np.array([]), 3)) == 0
+        assert list(smooth(np.array([5.0]), 3, "median")) == [5.0]
+        with pytest.raises(ValueError):
+            smooth(np.ones(3), 1, "gaussian")
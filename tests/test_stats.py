@@ -0,0 +1,145 @@
+from dataclasses import asdict, replace
+from datetime import datetime, timedelta
+from operator import itemgetter
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from tslogs.frame import LogFrame
+from tslogs.parse import load_files
+from tslogs.stats import (
+    LogStats,
+    StatsAccumulator,
+    get_rollups,
+    get_stats,
+    load_rollups,
+    load_stats,
+    parse_freq,
+)
+
+
+def assert_stats_equal(a: LogStats, b: LogStats) -> None:
+    a, b = asdict(a), asdict(b)
+    for key in a:
+        if key.startswith("avg_"):
+            assert a[key] == pytest.approx(b[key]), key
+        elif key == "limits":
+            # in order of first appearance, which depends on the row order
+            by_name = itemgetter("limit")
+            assert sorted(a[key], key=by_name) == sorted(b[key], key=by_name)
+        else:
+            assert a[key] == b[key], key
+
+
+@pytest.fixture
+def frame(log_root: Path) -> LogFrame:
+    return load_files([log_root])
+
+
+class TestStatsAccumulator:
+    def test_frame_and_rows_agree(self, frame: LogFrame) -> None:
+        expected = get_stats(frame)
+        assert_stats_equal(get_stats(list(frame)), expected)
+        # generators and chunked frames are accepted as well
+        assert_stats_equal(get_stats(log for log in frame), expected)
+        chunks = (frame[i : i + 1000] for i in range(0, len(frame), 1000))
+        assert_stats_equal(get_stats(chunks), expected)
+
+    def test_rows_and_batches(self, frame: LogFrame) -> None:
+        # rows of update() are buffered, batches and merges come after them
+        acc = StatsAccumulator()
+        for log in frame[:3000]:
+            acc.update(log)
+        assert acc.count == 3000
+        acc.update_batch(frame[3000:6000])
+        other = StatsAccumulator()
+        for log in frame[6000:]:
+            other.update(log)
+        acc.merge(other)
+        assert acc.count == len(frame)
+        assert_stats_equal(acc.result(), get_stats(frame))
+
+    def test_merge(self, frame: LogFrame) -> None:
+        half = len(frame) // 2
+        left, right = StatsAccumulator(), StatsAccumulator()
+        left.update_batch(frame[:half])
+        for log in frame[half:]:
+            right.update(log)
+        assert_stats_equal(left.merge(right).result(), get_stats(frame))
+        assert left.merge(StatsAccumulator()).count == len(frame)
+
+    def test_empty(self) -> None:
+        with pytest.raises(ValueError):
+            get_stats([])
+        with pytest.raises(ValueError):
+            StatsAccumulator().result()
+
+    def test_load_stats(self, log_root: Path, frame: LogFrame) -> None:
+        for workers in [None, 2]:
+            acc = load_stats([log_root], workers=workers)
+            assert acc.count == len(frame)
+            assert_stats_equal(acc.result(), get_stats(frame))
+
+
+class TestRollups:
+    @pytest.mark.parametrize("freq", ["15min", "1h", "day", "week"])
+    def test_same_as_get_stats(self, frame: LogFrame, freq: str) -> None:
+        rollups = get_rollups(frame, freq)
+        assert list(rollups) == sorted(rollups)
+        assert sum(s.timeline.samples for s in rollups.values()) == len(frame)
+        interval = timedelta(seconds=parse_freq(freq))
+        for period, stats in rollups.items():
+            assert_stats_equal(
+                stats, get_stats(frame.between(period, period + interval))
+            )
+
+    def test_weeks(self, frame: LogFrame) -> None:
+        assert list(get_rollups(frame, "week")) == [
+            datetime(2020, 7, 27),
+            datetime(2020, 8, 3),
+        ]
+
+    def test_load_rollups(self, log_root: Path, frame: LogFrame) -> None:
+        expected = get_rollups(frame, "day")
+        # rows and chunks are accepted as well
+        assert get_rollups(list(frame[:10]) + [frame[10:]], "day").keys() == (
+            expected.keys()
+        )
+        for workers in [None, 2]:
+            rollups = load_rollups([log_root], freq="day", workers=workers).result()
+            assert rollups.keys() == expected.keys()
+            for period, stats in rollups.items():
+                assert_stats_equal(stats, expected[period])
+
+    def test_parse_freq(self) -> None:
+        assert parse_freq("2h") == parse_freq("120min") == 7200
+        assert parse_freq("w") == parse_freq("week") == 7 * 86400
+        for freq in ["", "0h", "1y", "h1"]:
+            with pytest.raises(ValueError):
+                parse_freq(freq)
+
+
+class TestDistributions:
+    def test_quantiles(self, log_root: Path, frame: LogFrame) -> None:
+        assert get_stats(frame).quantiles is None
+        stats = get_stats(frame, distributions=True)
+        assert_stats_equal(
+            replace(stats, quantiles=None, histograms=None), get_stats(frame)
+        )
+        for name, quantiles in stats.quantiles.items():
+            for q, value in quantiles.items():
+                assert value == pytest.approx(np.quantile(frame[name], q), abs=1)
+            hist = stats.histograms[name]
+            assert sum(hist.counts) + hist.below + hist.above == len(frame)
+
+        # merged across files and processes
+        for workers in [None, 2]:
+            merged = load_stats([log_root], workers=workers, distributions=True)
+            merged = merged.result()
+            assert merged.histograms == stats.histograms
+            for name, quantiles in stats.quantiles.items():
+                assert merged.quantiles[name] == pytest.approx(quantiles, abs=0.5)
+        # from rows
+        rows = get_stats(list(frame[:100]), distributions=True)
+        assert rows.histograms == get_stats(frame[:100], distributions=True).histograms
@@ -0,0 +1,52 @@
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from tslogs.parse import is_valid_log_file, load_files
+from tslogs.synthetic import HEADER, _fixed, generate_day, generate_logs
+from tslogs.timeline import analyze_timeline
+
+DAY = date(2020, 3, 1)
+
+
+class TestSynthetic:
+    def test_fixed(self) -> None:
+        out = _fixed(np.array([0.0, 3.14159, 42.5, 1234.0]), 7, 2)
+        rows = [bytes(row).decode() for row in out]
+        assert rows == [f"{v:7.2f}" for v in (0.0, 3.14159, 42.5, 1234.0)]
+        out = _fixed(np.array([0.0, 7.0, 95.0]), 5, 0)
+        assert [bytes(row).decode() for row in out] == ["    0", "    7", "   95"]
+
+    def test_deterministic(self) -> None:
+        assert generate_day(DAY, seed=1) == generate_day(DAY, seed=1)
+        assert generate_day(DAY, seed=1) != generate_day(DAY, seed=2)
+
+    def test_parse(self, tmp_path: Path) -> None:
+        paths = generate_logs(tmp_path / "logs", DAY, 3, seed=3, max_sessions=4)
+        assert [p.name for p in paths] == [
+            "2020-03-01.txt",
+            "2020-03-02.txt",
+            "2020-03-03.txt",
+        ]
+        # days do not depend on the range they are generated with
+        assert paths[1].read_bytes() == generate_day(date(2020, 3, 2), seed=3)
+
+        lines = paths[0].read_bytes().splitlines()
+        assert lines[0] == HEADER
+        assert is_valid_log_file(lines[0].decode())
+
+        frame = load_files(paths)
+        data_lines = sum(
+            line != HEADER for p in paths for line in p.read_bytes().splitlines()
+        )
+        assert len(frame) == data_lines
+        assert {"TEMP", "PL1", "PL2"} <= set(frame.limit_names)
+        assert frame.limits.any()
+
+        timeline = analyze_timeline(frame.time)
+        assert timeline.interval == 1
+        assert timeline.duplicates > 0
+        # sessions and days are separated by gaps
+        assert len(timeline.gaps) >= 2
+        assert 0 < timeline.coverage < 100
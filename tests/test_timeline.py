@@ -0,0 +1,83 @@
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+from conftest import make_frame
+
+from tslogs.parse import load_files
+from tslogs.stats import StatsAccumulator, get_stats, load_stats
+from tslogs.timeline import analyze_timeline, sample_weights, sampling_interval
+
+START = np.datetime64("2020-08-07T11:00:00", "s")
+
+
+def _times(*seconds: int) -> np.ndarray:
+    return START + np.array(seconds, dtype="timedelta64[s]")
+
+
+class TestSampleWeights:
+    def test_weights(self) -> None:
+        w = sample_weights(_times(0, 2, 2, 4, 100, 101), gap=30)
+        # duplicates share the step, rows before a gap and the last one are open
+        assert w.closed.tolist() == [2, 1, 1, 0, 1, 0]
+        assert w.open.tolist() == [0, 0, 0, 1, 0, 1]
+        assert w.steps.tolist() == [2, 2, 1]
+        assert w.duplicates == 1
+        assert w.gaps[0].tolist() == [_times(4)[0].item()]
+        assert w.gaps[1].tolist() == [_times(100)[0].item()]
+
+        w = sample_weights(_times(0, 1), next_time=_times(3)[0])
+        assert w.closed.tolist() == [1, 2]
+        assert not w.open.any()
+
+        # no step across a break
+        w = sample_weights(_times(0, 1, 2), breaks=np.array([2]))
+        assert w.closed.tolist() == [1, 0, 0]
+        assert w.open.tolist() == [0, 1, 1]
+        assert len(w.gaps[0]) == 0
+
+    def test_sampling_interval(self) -> None:
+        assert sampling_interval({}) == 1
+        assert sampling_interval({2: 10, 1: 3}) == 2
+        assert sampling_interval({2: 3, 1: 3}) == 1
+
+    def test_analyze_timeline(self, log_root: Path) -> None:
+        timeline = analyze_timeline(load_files([log_root]).time)
+        assert timeline.samples == 10152
+        assert timeline.duplicates == 168
+        assert timeline.interval == 1
+        assert len(timeline.gaps) == 10
+        assert all(end - start > timedelta(seconds=30) for start, end in timeline.gaps)
+        with pytest.raises(ValueError):
+            analyze_timeline(np.empty(0, dtype="datetime64[s]"))
+
+
+class TestWeightedStats:
+    def test_duplicates_and_gaps(self) -> None:
+        # a 2 s interval log with one duplicated row and a 10 minutes gap
+        seconds = [0, 2, 2, 4, 6, 606, 608]
+        temps = [80, 95, 95, 80, 80, 95, 80]
+        limits = [["PL1"] if t >= 90 else [] for t in temps]
+        stats = get_stats(make_frame(seconds, temps, limits))
+        assert stats.time_elapsed == timedelta(seconds=12)
+        assert stats.time_above_90 == timedelta(seconds=4)
+        assert stats.limits[0].total_secs == 4
+        assert stats.avg_cpu_temp == pytest.approx((80 * 8 + 95 * 4) / 12)
+        assert stats.timeline.interval == 2
+        assert stats.timeline.duplicates == 1
+        assert stats.timeline.gaps == 1
+        assert stats.timeline.gap_time == timedelta(seconds=598)
+
+    def test_batches_and_merge(self, log_root: Path) -> None:
+        frame = load_files([log_root])
+        expected = get_stats(frame)
+        # batches cut through the duplicates, and files merged one by one
+        acc = StatsAccumulator()
+        for i in range(0, len(frame), 1000):
+            acc.update_batch(frame[i : i + 1000])
+        for stats in [acc.result(), load_stats([log_root]).result()]:
+            assert stats.time_elapsed == expected.time_elapsed
+            assert stats.timeline == expected.timeline
+            assert stats.limits == expected.limits
+            assert stats.avg_power == pytest.approx(expected.avg_power)
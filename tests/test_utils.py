@@ -1,6 +1,11 @@
+import os
+import shutil
 from datetime import datetime
 from pathlib import Path
 
+import tslogs.cli as cli
+from tslogs.cache import LogCache
+from tslogs.discover import DirIndex
 from tslogs.utils import get_files_in_date_range
 
 LOG_VALID_NAME = [
@@ -34,6 +39,10 @@ class TestUtils:
                 valid_dir, (datetime(2020, 10, 10), datetime(2020, 10, 12))
             )
         ) == len(valid_paths[:2])
+        # a range within a day
+        assert get_files_in_date_range(
+            valid_dir, (datetime(2020, 10, 11, 14), datetime(2020, 10, 11, 15))
+        ) == [valid_dir / "2020-10-11.txt"]
 
     def test_invalid_get_files_in_date_range(self, tmp_path: Path):
         invalid_dir = tmp_path / "invalid"
@@ -48,3 +57,64 @@ class TestUtils:
             )
             == []
         )
+
+    def test_recursive(self, tmp_path: Path, monkeypatch):
+        root = tmp_path / "logs"
+        names = {
+            "laptop/2019/2019-12-31.txt",
+            "laptop/2020/2020-10-10.txt",
+            "laptop/2020/notes.txt",
+            "desktop/2020-10-11.txt",
+            "desktop/old/2020-10-12.txt",
+        }
+        for name in names:
+            (root / name).parent.mkdir(parents=True, exist_ok=True)
+            (root / name).touch()
+
+        found = get_files_in_date_range(root)
+        assert {str(f.relative_to(root)) for f in found} == names
+
+        scanned = []
+        scan = DirIndex.scan.__func__
+        monkeypatch.setattr(
+            DirIndex,
+            "scan",
+            classmethod(lambda cls, path: scanned.append(path.name) or scan(cls, path)),
+        )
+        date_range = (datetime(2020, 10, 10), datetime(2020, 10, 12))
+        found = get_files_in_date_range(root, date_range)
+        assert [str(f.relative_to(root)) for f in found] == [
+            "desktop/2020-10-11.txt",
+            "laptop/2020/2020-10-10.txt",
+        ]
+        # the 2019 dir is skipped
+        assert "2019" not in scanned and "old" in scanned
+
+        # unchanged dirs are listed from the cache, until their mtime changes
+        cache = LogCache()
+        assert get_files_in_date_range(root, date_range, cache) == found
+        scanned.clear()
+        assert get_files_in_date_range(root, date_range, cache) == found
+        assert scanned == []
+        new_file = root / "desktop" / "2020-10-10.txt"
+        new_file.touch()
+        stat = os.stat(new_file.parent)
+        os.utime(new_file.parent, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+        assert new_file in get_files_in_date_range(root, date_range, cache)
+        assert scanned == ["desktop"]
+
+    def test_nested_cache_dir(self, log_root: Path, tmp_path: Path):
+        root = tmp_path / "logs"
+        shutil.copytree(log_root, root)
+        (root / ".backup").mkdir()
+        shutil.copy(log_root / "2020-07-28.txt", root / ".backup")
+        cache_dir = root / "cache"
+        for _ in range(2):
+            assert cli.main([str(root), "--cache-dir", str(cache_dir)]) is None
+        assert (cache_dir / "CACHEDIR.TAG").exists()
+        # hidden and cache dirs are not walked, with the cache or not
+        files = get_files_in_date_range(root, cache=LogCache(cache_dir))
+        assert sorted(f.name for f in files) == sorted(
+            p.name for p in log_root.iterdir()
+        )
+        assert len(get_files_in_date_range(root)) == len(files)
@@ -1,19 +1,45 @@
 import logging
+import pkgutil
 
-from .parse import LogLine, load_files, parse_log
-from .stats import get_stats
+from .archive import load_archive, save_archive
+from .cache import LogCache
+from .frame import CompactLogLine, LogFrame, SlottedLogLine
+from .instrument import Profiler, profiling
+from .parse import (
+    LogLine,
+    LogTailer,
+    iter_log_chunks,
+    iter_logs,
+    iter_merged_frames,
+    load_files,
+    parse_log,
+)
+from .stats import StatsAccumulator, get_stats
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
 
 
 __author__ = "Ashutosh Varma <ashutoshvarma11@live.com>"
 __license__ = "MIT"
-__version__ = (
-    __import__("pkg_resources")
-    .resource_string(__name__, "_version.txt")
-    .decode("utf-8")
-    .strip()
-)
+__version__ = pkgutil.get_data(__name__, "_version.txt").decode("utf-8").strip()
 
 
-__all__ = ["parse_log", "LogLine", "load_files", "get_stats"]
+__all__ = [
+    "parse_log",
+    "LogLine",
+    "LogFrame",
+    "CompactLogLine",
+    "SlottedLogLine",
+    "load_files",
+    "iter_logs",
+    "iter_log_chunks",
+    "iter_merged_frames",
+    "get_stats",
+    "StatsAccumulator",
+    "LogCache",
+    "LogTailer",
+    "load_archive",
+    "save_archive",
+    "Profiler",
+    "profiling",
+]
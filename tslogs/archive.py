@@ -0,0 +1,73 @@
+"""
+Binary archive of parsed logs.
+
+An archive is a NumPy ``.npz`` file (a zip of ``.npy`` arrays) holding
+
+- ``format``: the string ``"tslogs"``
+- ``version``: format version, currently 1
+- ``time``: ``datetime64[s]`` time of every row
+- ``column_<name>``: ``float64`` values, one array per name in ``FLOAT_FIELDS``
+- ``limits``: ``uint64`` bitmask per row, bit ``i`` set means ``limit_names[i]``
+- ``limit_names``: unicode names of the limits
+
+Archives can be given to :func:`tslogs.load_files` like any log file.
+"""
+
+from datetime import datetime
+from os import PathLike
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple, Union
+
+import numpy as np
+
+from .frame import LogFrame
+
+ARCHIVE_SUFFIX = ".npz"
+ARCHIVE_FORMAT = "tslogs"
+ARCHIVE_VERSION = 1
+
+
+def is_archive(file_path: Union[str, PathLike]) -> bool:
+    """
+    >>> is_archive("logs/2020-08-07.npz")
+    True
+    >>> is_archive("logs/2020-08-07.txt")
+    False
+    """
+    return Path(file_path).suffix.lower() == ARCHIVE_SUFFIX
+
+
+def save_archive(
+    frame: LogFrame, file: Union[str, PathLike, BinaryIO], compress: bool = True
+) -> None:
+    """
+    Write ``frame`` to ``file`` (a path or a binary file object), compressed
+    unless ``compress`` is False.
+    """
+    savez = np.savez_compressed if compress else np.savez
+    savez(
+        file,
+        format=ARCHIVE_FORMAT,
+        version=ARCHIVE_VERSION,
+        **frame.to_arrays(),
+    )
+
+
+def load_archive(
+    file: Union[str, PathLike, BinaryIO],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+) -> LogFrame:
+    """
+    Read a frame written by :func:`save_archive`, keeping only the rows in
+    ``date_range`` if given.
+    """
+    with np.load(file, allow_pickle=False) as data:
+        if "format" not in data or str(data["format"]) != ARCHIVE_FORMAT:
+            raise ValueError(f"{file} is not a tslogs archive.")
+        version = int(data["version"])
+        if version > ARCHIVE_VERSION:
+            raise ValueError(f"unsupported tslogs archive version {version}.")
+        frame = LogFrame.from_arrays(data)
+    if date_range:
+        frame = frame.between(*date_range)
+    return frame
@@ -0,0 +1,211 @@
+import hashlib
+import logging
+import os
+import sys
+import zipfile
+from os import PathLike
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from .discover import CACHEDIR_TAG, DirIndex
+from .frame import LogFrame
+from .index import FileIndex
+
+logger = logging.getLogger(__name__)
+
+CACHEDIR_SIGNATURE = (
+    "Signature: 8a477f597d28d172789f06886806bc55\n"
+    "# This file is a cache directory tag created by tslogs.\n"
+)
+# bump whenever the parser output or the frame layout changes
+CACHE_VERSION = 1
+DEFAULT_MAX_SIZE = 1 << 30
+
+
+def default_cache_dir() -> Path:
+    """
+    ``$TSLOGS_CACHE_DIR`` if set, else ``tslogs`` in the platform cache dir.
+    """
+    if os.environ.get("TSLOGS_CACHE_DIR"):
+        return Path(os.environ["TSLOGS_CACHE_DIR"])
+    if sys.platform == "win32" and os.environ.get("LOCALAPPDATA"):
+        base = Path(os.environ["LOCALAPPDATA"])
+    elif os.environ.get("XDG_CACHE_HOME"):
+        base = Path(os.environ["XDG_CACHE_HOME"])
+    else:
+        base = Path.home() / ".cache"
+    return base / "tslogs"
+
+
+class LogCache:
+    """
+    On-disk cache of parsed log files, one ``.npz`` entry per source file.
+
+    An entry is only used if the size and mtime of the source file and the
+    cache version still match. Once the cache grows past ``max_size`` bytes the
+    least recently used entries are evicted.
+
+    Next to the parsed rows, a :class:`~tslogs.index.FileIndex` of every file
+    is kept in its own entry. It stays valid while the file grows. Directory
+    listings (:class:`~tslogs.discover.DirIndex`) are kept until the mtime of
+    their directory changes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, PathLike]] = None,
+        max_size: int = DEFAULT_MAX_SIZE,
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_size = max_size
+        # running size of the entries, scanned on the first write
+        self._size: Optional[int] = None
+
+    def _entry(self, file_path: Union[str, PathLike], kind: str = "") -> Path:
+        source = str(Path(file_path).resolve())
+        key = hashlib.sha1(source.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}{kind}.npz"
+
+    def _write(self, entry: Path, **arrays: np.ndarray) -> None:
+        tmp = entry.with_name(f"{entry.stem}.{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            if self._size is None:
+                # keeps the cache out of log dir walks and backups
+                tag = self.cache_dir / CACHEDIR_TAG
+                if not tag.exists():
+                    tag.write_text(CACHEDIR_SIGNATURE)
+                self._size = self._scan()[1]
+            with open(tmp, "wb") as fp:
+                np.savez(fp, version=CACHE_VERSION, **arrays)
+            size = os.stat(tmp).st_size
+            replaced = entry.stat().st_size if entry.exists() else 0
+            os.replace(tmp, entry)
+        except OSError:
+            logger.debug(f"failed to write cache entry {entry}", exc_info=True)
+            tmp.unlink(missing_ok=True)
+            return
+        self._size += size - replaced
+        if self._size > self.max_size:
+            self.evict()
+
+    def get(self, file_path: Union[str, PathLike]) -> Optional[LogFrame]:
+        entry = self._entry(file_path)
+        try:
+            stat = os.stat(file_path)
+            with np.load(entry, allow_pickle=False) as data:
+                if (
+                    int(data["version"]) != CACHE_VERSION
+                    or int(data["size"]) != stat.st_size
+                    or int(data["mtime_ns"]) != stat.st_mtime_ns
+                ):
+                    return None
+                frame = LogFrame.from_arrays(data)
+            # mark as recently used
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            logger.debug(f"dropping corrupted cache entry {entry}")
+            entry.unlink(missing_ok=True)
+            return None
+        return frame
+
+    def put(
+        self,
+        file_path: Union[str, PathLike],
+        frame: LogFrame,
+        stat: Optional[os.stat_result] = None,
+    ) -> None:
+        """
+        Store ``frame`` for ``file_path``, ``stat`` should be taken before the
+        file was read so a file growing meanwhile is parsed again next time.
+        """
+        stat = stat or os.stat(file_path)
+        self._write(
+            self._entry(file_path),
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            **frame.to_arrays(),
+        )
+
+    def get_index(self, file_path: Union[str, PathLike]) -> Optional[FileIndex]:
+        """
+        Index of ``file_path`` if the bytes it covers are still the same, only
+        the end of the indexed part is compared.
+        """
+        entry = self._entry(file_path, ".index")
+        try:
+            with np.load(entry, allow_pickle=False) as data:
+                if int(data["version"]) != CACHE_VERSION:
+                    return None
+                index = FileIndex.from_arrays(data)
+            with open(file_path, "rb") as fp:
+                if os.fstat(fp.fileno()).st_size < index.size:
+                    return None
+                fp.seek(index.size - len(index.tail))
+                if fp.read(len(index.tail)) != index.tail:
+                    return None
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            logger.debug(f"dropping corrupted cache entry {entry}")
+            entry.unlink(missing_ok=True)
+            return None
+        return index
+
+    def put_index(self, file_path: Union[str, PathLike], index: FileIndex) -> None:
+        self._write(self._entry(file_path, ".index"), **index.to_arrays())
+
+    def get_dir_index(self, dir_path: Union[str, PathLike]) -> Optional[DirIndex]:
+        entry = self._entry(dir_path, ".dir")
+        try:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+            with np.load(entry, allow_pickle=False) as data:
+                if int(data["version"]) != CACHE_VERSION:
+                    return None
+                index = DirIndex.from_arrays(data)
+            if index.mtime_ns != mtime_ns:
+                return None
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            logger.debug(f"dropping corrupted cache entry {entry}")
+            entry.unlink(missing_ok=True)
+            return None
+        return index
+
+    def put_dir_index(self, dir_path: Union[str, PathLike], index: DirIndex) -> None:
+        self._write(self._entry(dir_path, ".dir"), **index.to_arrays())
+
+    def _scan(self) -> Tuple[List[Tuple[os.stat_result, Path]], int]:
+        entries = []
+        for entry in self.cache_dir.glob("*.npz"):
+            try:
+                entries.append((entry.stat(), entry))
+            except FileNotFoundError:
+                pass
+        return entries, sum(stat.st_size for stat, _ in entries)
+
+    def evict(self) -> None:
+        """
+        Remove least recently used entries until the cache fits max_size. Writes
+        only call it once their running total of the cache size is over, that
+        total misses the writes of other processes until the next scan.
+        """
+        entries, total = self._scan()
+        for stat, entry in sorted(entries, key=lambda e: e[0].st_mtime_ns):
+            if total <= self.max_size:
+                break
+            entry.unlink(missing_ok=True)
+            total -= stat.st_size
+        self._size = total
+
+    def clear(self) -> None:
+        for entry in self.cache_dir.glob("*.npz"):
+            entry.unlink(missing_ok=True)
+        self._size = 0
@@ -1,23 +1,45 @@
 import argparse
 import io
-import json
 import logging
 import os
 import sys
 import textwrap
-from dataclasses import asdict
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, List, Union
+from typing import Any, Iterable, List, Optional, Tuple, Union
 
 import colorama
-import matplotlib.pyplot as plt
 from colorama.ansi import Fore, Style
 
 from tslogs import __version__
-from tslogs.data_ploting import ALLOWED_INPUTS, PlotInput, plot_logs
-from tslogs.parse import LogLine, load_files
-from tslogs.stats import LogStats, get_stats
+from tslogs.archive import save_archive
+from tslogs.cache import LogCache
+from tslogs.downsample import DOWNSAMPLERS
+from tslogs.episodes import DEFAULT_MAX_GAP, Episode, find_episodes
+from tslogs.export import (
+    write_json,
+    write_ndjson,
+    write_rollups_csv,
+    write_rollups_json,
+    write_rollups_ndjson,
+)
+from tslogs.fleet import (
+    RANK_FIELDS,
+    fleet_total,
+    limit_secs,
+    load_fleet,
+    parse_sources,
+    rank_hosts,
+)
+from tslogs.frame import FLOAT_FIELDS, LogFrame
+from tslogs.instrument import profiling, stage
+from tslogs.merge import CONFLICT_POLICIES
+from tslogs.parse import LogLine, LogTailer, iter_log_chunks, load_files
+from tslogs.resample import REDUCERS
+from tslogs.sketch import QUANTILES
+from tslogs.smoothing import SMOOTHERS
+from tslogs.stats import ROLLUP_PERIODS, LogStats, load_rollups, load_stats
+from tslogs.utils import get_files_in_date_range
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +54,15 @@ RED = Fore.RED
 DIM = Style.DIM
 BOLD = Style.BRIGHT
 
+SPARK_BLOCKS = " ▁▂▃▄▅▆▇█"
+# summary labels and units of the distribution fields
+DISTRIBUTION_LABELS = {
+    "cpu_temp": ("CPU Temp", "°C"),
+    "power": ("Power", " W"),
+    "multi": ("CPU Multiplier", ""),
+    "c0": ("C0", "%"),
+}
+
 
 # https://github.com/psf/black/blob/dd2f86ac0a043815821d228b9db036a295be5372/src/black/__init__.py#L872
 def wrap_stream_for_windows(
@@ -109,11 +140,42 @@ def init_argparse() -> argparse.ArgumentParser:
         default=False,
         help="dump all parsed log data.",
     )
+    mode_group.add_argument(
+        "--ndjson",
+        action="store_true",
+        default=False,
+        help="dump all parsed log data as newline delimited json, one compact"
+        " object per log line.",
+    )
+    mode_group.add_argument(
+        "--binary",
+        "-b",
+        action="store_true",
+        default=False,
+        help="dump all parsed log data as a binary tslogs archive (.npz), which"
+        " can be passed back in place of log files.",
+    )
+    mode_group.add_argument(
+        "--episodes",
+        "-e",
+        action="store_true",
+        default=False,
+        help="List the throttling episodes: runs of each limit and of the CPU"
+        " temp at or above 90°C, with their duration, peak temp and multiplier.",
+    )
+    mode_group.add_argument(
+        "--fleet",
+        "-F",
+        action="store_true",
+        default=False,
+        help="Summarise every path, or 'HOST=PATH', as its own host and list the"
+        " hosts ranked by --rank-by with a fleet wide total.",
+    )
     mode_group.add_argument(
         "--plot",
         "-p",
         nargs="*",
-        choices=ALLOWED_INPUTS,
+        choices=list(FLOAT_FIELDS),
         help=(
             "Plot given the logs attributes (default: %(default)s)."
             " Allowed values are {%(choices)s}"
@@ -131,6 +193,15 @@ def init_argparse() -> argparse.ArgumentParser:
         help="Datetime range to filter (in ISO format, yyyy-mm-dd HH:MM:SS)",
         metavar=("START", "END"),
     )
+    filter_group.add_argument(
+        "--on-conflict",
+        choices=list(CONFLICT_POLICIES),
+        default="keep",
+        help="Merge the paths in time order, a timestamp found in several paths"
+        " keeps the rows of the first or last path having it, or their mean."
+        " Rows of one path are always kept. Merging runs in one process"
+        " (default: %(default)s, the rows of every path in path order)",
+    )
 
     plot_group = parser.add_argument_group("Plot Options")
     plot_group.add_argument(
@@ -140,6 +211,13 @@ def init_argparse() -> argparse.ArgumentParser:
         default=60,
         help="Plot data frequency in seconds (default: 60)",
     )
+    plot_group.add_argument(
+        "--reducer",
+        "-R",
+        choices=list(REDUCERS),
+        default="mean",
+        help="How the logs within one interval are combined (default: mean)",
+    )
     plot_group.add_argument(
         "--smooth",
         "-S",
@@ -151,6 +229,61 @@ def init_argparse() -> argparse.ArgumentParser:
             " smooth graph (default: 2)"
         ),
     )
+    plot_group.add_argument(
+        "--points",
+        type=int,
+        default=None,
+        help="Most points drawn per line, longer series are downsampled keeping"
+        " spikes, 0 to draw all (default: figure width in pixels)",
+        metavar="N",
+    )
+    plot_group.add_argument(
+        "--lod-method",
+        choices=list(DOWNSAMPLERS),
+        default="lttb",
+        help="Downsampling for --points, largest triangle three buckets or"
+        " min/max envelope (default: lttb)",
+    )
+    plot_group.add_argument(
+        "--smooth-method",
+        choices=list(SMOOTHERS),
+        default="boxcar",
+        help="Smoothing kernel, moving average, exponentially weighted average"
+        " or moving median (default: boxcar)",
+    )
+
+    episodes_group = parser.add_argument_group("Episodes Options")
+    episodes_group.add_argument(
+        "--min-duration",
+        type=int,
+        default=0,
+        help="Leave out episodes shorter than this many seconds (default: 0)",
+        metavar="SECS",
+    )
+    episodes_group.add_argument(
+        "--max-gap",
+        type=int,
+        default=DEFAULT_MAX_GAP,
+        help="Longest break in seconds within one episode (default:"
+        f" {DEFAULT_MAX_GAP})",
+        metavar="SECS",
+    )
+
+    fleet_group = parser.add_argument_group("Fleet Options")
+    fleet_group.add_argument(
+        "--rank-by",
+        default="percent_above_90",
+        help="Rank hosts by one of {%s} or by the seconds of a limit, e.g. PL1"
+        " (default: %%(default)s)" % ",".join(RANK_FIELDS),
+        metavar="KEY",
+    )
+    fleet_group.add_argument(
+        "--top",
+        type=_arg_check_positive,
+        default=None,
+        help="Only list the first N hosts (default: all)",
+        metavar="N",
+    )
 
     output_group = parser.add_argument_group("Output")
     output_group.add_argument(
@@ -161,6 +294,14 @@ def init_argparse() -> argparse.ArgumentParser:
         help="Output file path, default is '-' (stdout)",
         metavar="FILE",
     )
+    output_group.add_argument(
+        "--group-by",
+        "-g",
+        choices=list(ROLLUP_PERIODS),
+        default=None,
+        help="Write the stats of every hour, day or week as CSV, or as json with"
+        " --json/--ndjson",
+    )
     output_group.add_argument(
         "--indent",
         type=int,
@@ -169,6 +310,69 @@ def init_argparse() -> argparse.ArgumentParser:
         metavar="VALUE",
     )
 
+    cache_group = parser.add_argument_group("Cache")
+    cache_group.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        default=True,
+        help="Do not read or write the parsed logs cache",
+    )
+    cache_group.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Parsed logs cache directory (default: $TSLOGS_CACHE_DIR or"
+        " the user cache dir)",
+        metavar="DIR",
+    )
+
+    parser.add_argument(
+        "--follow",
+        "-f",
+        action="store_true",
+        default=False,
+        help="Keep running and update the summary or plot with lines appended to"
+        " the newest log of the last path, until interrupted (Ctrl-C)",
+    )
+    parser.add_argument(
+        "--distributions",
+        "-D",
+        action="store_true",
+        default=False,
+        help="Add the p50/p95/p99 and a histogram of the CPU temp, power,"
+        " multiplier and C0 to the summary",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-J",
+        type=int,
+        default=1,
+        help="Number of processes used to parse log files, 0 for one per CPU"
+        " (default: 1)",
+        metavar="N",
+    )
+    profile_group = parser.add_argument_group("Profile")
+    profile_group.add_argument(
+        "--profile",
+        nargs="?",
+        choices=["table", "json"],
+        const="table",
+        default=None,
+        help="Print the time, rows, bytes and peak memory of every stage"
+        " (discovery, parsing, cache, filtering, stats, export, plotting) to"
+        " stderr when done, as a table or json (default: table)",
+        metavar="FORMAT",
+    )
+    profile_group.add_argument(
+        "--profile-dump",
+        type=Path,
+        default=None,
+        help="Also run under cProfile and save its stats to FILE, for pstats or"
+        " snakeviz (implies --profile)",
+        metavar="FILE",
+    )
+
     parser.add_argument(
         "--quiet", "-q", action="store_true", default=False, help="Run in silent mode"
     )
@@ -185,11 +389,26 @@ def version_str():
     return textwrap.dedent(ver_str)
 
 
-def dump_json(loglines: List[LogLine], indent: int, out_fp: argparse.FileType) -> None:
-    content = json.dumps([asdict(log) for log in loglines], default=str, indent=indent)
-    if "b" in out_fp.mode:
-        content = content.encode("utf-8")
-    out_fp.write(content + os.linesep)
+def dump_json(
+    loglines: Iterable[Union[LogLine, LogFrame]],
+    indent: int,
+    out_fp: argparse.FileType,
+) -> int:
+    count = write_json(loglines, out_fp, indent)
+    out_fp.write(os.linesep.encode("utf-8") if "b" in out_fp.mode else os.linesep)
+    return count
+
+
+def sparkline(counts: List[int]) -> str:
+    """
+    Histogram counts as a line of block characters, only empty bins are blank.
+
+    >>> sparkline([0, 1, 4, 8, 2, 0])
+    ' ▁▄█▂ '
+    """
+    top = max(counts, default=0)
+    steps = len(SPARK_BLOCKS) - 1
+    return "".join(SPARK_BLOCKS[c and max(1, steps * c // top)] for c in counts)
 
 
 def print_stats(stats: LogStats):
@@ -211,6 +430,14 @@ def print_stats(stats: LogStats):
     end_t: str = stats.time_range[1].strftime(dt_fmt)
     _print_sub_head(f"Logs from {BOLD}{start_t}{DIM} to {BOLD}{end_t}")
     _print("Total Log time", stats.time_elapsed)
+    if stats.timeline is not None:
+        tl = stats.timeline
+        _print(
+            "Coverage",
+            f"{tl.coverage:.2f}%",
+            f"{tl.gaps} gaps, {tl.gap_time} missing, {tl.interval}s interval",
+        )
+        _print("Duplicate rows", tl.duplicates, f"of {tl.samples} rows")
     nl()
     _print_sub_head("CPU Stats")
     _print("Average CPU Temp", f"{stats.avg_cpu_temp:.2f}°C")
@@ -233,6 +460,22 @@ def print_stats(stats: LogStats):
     _print("Average VID", f"{stats.avg_vid:.4f} V")
     _print("Average Battery Voltage", f"{stats.avg_battery_mw:.2f} mW")
 
+    if stats.quantiles is not None:
+        nl()
+        _print_sub_head("Distribution Stats (p50 / p95 / p99)")
+        for name, (label, unit) in DISTRIBUTION_LABELS.items():
+            q = stats.quantiles[name]
+            hist = stats.histograms[name]
+            # histogram over the bins from the first to the last non empty one
+            used = [i for i, c in enumerate(hist.counts) if c] or [0]
+            lo, hi = used[0], used[-1] + 1
+            _print(
+                label,
+                " / ".join(f"{q[p]:.2f}" for p in QUANTILES) + unit,
+                f"{hist.edges[lo]:g}-{hist.edges[hi]:g}{unit}"
+                f" {sparkline(hist.counts[lo:hi])}",
+            )
+
     if len(stats.limits) > 0:
         nl()
         _print_sub_head("Limits Stats")
@@ -244,6 +487,163 @@ def print_stats(stats: LogStats):
             )
 
 
+def print_episodes(episodes: List[Episode]) -> None:
+    if not episodes:
+        logger.info(f"{BOLD}{GREEN}No throttling episodes{RESET}")
+        return
+    dt_fmt = "%d-%b-%y %H:%M:%S"
+    logger.info(
+        f"{DIM}{YELLOW}{'KIND':14} {'START':18} {'END':18} {'DURATION':>9}"
+        f" {'PEAK':>7} {'AVG GHZ':>8}{RESET}"
+    )
+    for ep in episodes:
+        logger.info(
+            f"{ep.kind:14} {ep.start.strftime(dt_fmt):18} {ep.end.strftime(dt_fmt):18}"
+            f" {str(ep.duration):>9} {RED}{ep.peak_cpu_temp:>5.0f}°C{RESET}"
+            f" {ep.avg_multi / 10:>8.2f}"
+        )
+
+    logger.info("")
+    logger.info(f"{DIM}{YELLOW}Episodes Stats{RESET}")
+    for kind in sorted({ep.kind for ep in episodes}):
+        kind_eps = [ep for ep in episodes if ep.kind == kind]
+        total = sum((ep.duration for ep in kind_eps), timedelta())
+        longest = max(ep.duration for ep in kind_eps)
+        logger.info(
+            f"- {kind:30}: {BOLD}{len(kind_eps):<6} episodes, {str(total):10}"
+            f" (longest {longest}){RESET}"
+        )
+
+
+def print_fleet(
+    ranked: List[Tuple[str, LogStats]], total: LogStats, key: str, empty: List[str]
+) -> None:
+    # the limits with the most seconds across the fleet get a column
+    limits = [lm.limit for lm in sorted(total.limits, key=lambda lm: -lm.total_secs)]
+    limits = limits[:3]
+    if key not in RANK_FIELDS and key not in limits:
+        limits.insert(0, key)
+    head = "".join(f" {f'{lm} SECS':>10}" for lm in limits)
+    logger.info(
+        f"{DIM}{YELLOW}{'#':>4} {'HOST':20} {'LOG TIME':>15} {'AVG':>7} {'MAX':>7}"
+        f" {'>90°C':>7}{head}{RESET}"
+    )
+
+    def row(rank: str, host: str, stats: LogStats, color: str = "") -> None:
+        cells = "".join(f" {limit_secs(stats, lm):>10}" for lm in limits)
+        logger.info(
+            f"{color}{rank:>4} {host[:20]:20} {str(stats.time_elapsed):>15}"
+            f" {stats.avg_cpu_temp:>5.1f}°C {stats.max_cpu_temp:>5.1f}°C"
+            f" {RED}{stats.percent_above_90:>6.2f}%{RESET}{color}{cells}{RESET}"
+        )
+
+    for i, (host, stats) in enumerate(ranked, 1):
+        row(str(i), host, stats)
+    row("", "fleet total", total, BOLD)
+    if empty:
+        logger.info(f"{DIM}no logs for {', '.join(empty)}{RESET}")
+
+
+def _pyplot(A: argparse.Namespace):
+    """
+    Import pyplot on first use only, matplotlib would otherwise dominate the
+    startup time of every run.
+    """
+    with stage("import matplotlib"):
+        import matplotlib
+
+        if A.output != sys.stdout:
+            # rendering to a file needs no GUI toolkit
+            matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+    return plt
+
+
+def _show_plot(parsed: LogFrame, A: argparse.Namespace, block: bool = True) -> None:
+    plt = _pyplot(A)
+    from tslogs.data_ploting import PlotInput, plot_logs
+
+    if len(A.plot) == 0:
+        A.plot.append(PlotInput("cpu_temp", color="red"))
+    with stage("plot") as st:
+        st.add(len(parsed))
+        plot_logs(
+            parsed,
+            A.plot,
+            A.interval,
+            A.smooth,
+            reducer=A.reducer,
+            smooth_method=A.smooth_method,
+            max_points=A.points,
+            lod_method=A.lod_method,
+        )
+    if A.output != sys.stdout:
+        A.output.seek(0)
+        A.output.truncate()
+        with stage("render"):
+            plt.savefig(A.output, format="png")
+        A.output.flush()
+    elif block:
+        plt.show()
+    else:
+        plt.pause(0.1)
+
+
+def follow_logs(
+    A: argparse.Namespace,
+    date_range: List[datetime],
+    cache: Optional[LogCache],
+    on_conflict: Optional[str] = None,
+) -> int:
+    tailer = LogTailer(A.paths[-1], from_start=True)
+    # the tailer reads the followed file, everything else is only loaded once
+    history = [
+        f
+        for f in get_files_in_date_range(A.paths, date_range, cache)
+        if tailer.file is None or not f.samefile(tailer.file)
+    ]
+    if A.plot is not None:
+        parsed = load_files(
+            history, date_range, workers=A.jobs, cache=cache, on_conflict=on_conflict
+        )
+    else:
+        stats = load_stats(
+            history,
+            date_range,
+            workers=A.jobs,
+            cache=cache,
+            distributions=A.distributions,
+            on_conflict=on_conflict,
+        )
+    logger.info(f"{DIM}following {tailer.path}, press Ctrl-C to stop{RESET}")
+
+    try:
+        for frame in tailer.follow():
+            if date_range:
+                frame = frame.between(*date_range)
+            if len(frame) == 0:
+                continue
+            if A.plot is not None:
+                parsed = LogFrame.concat([parsed, frame])
+                _pyplot(A).close("all")
+                _show_plot(parsed, A, block=False)
+            else:
+                stats.update_batch(frame)
+            last = frame[-1]
+            logger.info(
+                f"{last.time}  {BOLD}{last.cpu_temp:.0f}°C{RESET}"
+                f"  {last.multi / 10:.2f} GHz  {last.power:.2f} W"
+                f"  {RED}{' '.join(last.limits)}{RESET}"
+            )
+    except KeyboardInterrupt:
+        pass
+
+    if A.plot is None and stats.count > 0:
+        print_stats(stats.result())
+    return 0
+
+
 def main(args=None):
     setup_logging()
 
@@ -257,6 +657,19 @@ def main(args=None):
     if A.quiet:
         logger.setLevel(logging.ERROR)
 
+    if A.profile or A.profile_dump:
+        with profiling(dump=A.profile_dump) as prof:
+            code = run(P, A)
+        # stdout may be the output
+        if A.profile == "json":
+            print(prof.to_json(), file=sys.stderr)
+        else:
+            print(prof.format_table(), file=sys.stderr)
+        return code
+    return run(P, A)
+
+
+def run(P: argparse.ArgumentParser, A: argparse.Namespace) -> Optional[int]:
     # fix date range
     date_range: List[datetime] = []
     if len(A.dates) == 1:
@@ -265,23 +678,127 @@ def main(args=None):
     elif len(A.dates) >= 2:
         date_range = A.dates[:2]
 
+    cache = LogCache(A.cache_dir) if A.cache else None
+    on_conflict = None if A.on_conflict == "keep" else A.on_conflict
+    # merged paths are streamed through one process, loaded frames use the pool
+    streamed = A.plot is None and not A.binary and not A.episodes and not A.fleet
+    if on_conflict and streamed and A.jobs != 1:
+        logger.warning(
+            f"{YELLOW}--jobs is not used when merging paths, see --on-conflict{RESET}"
+        )
+
+    if A.group_by:
+        if A.follow or A.binary or A.plot is not None:
+            P.error(
+                "argument --group-by: not allowed with --follow, --binary or --plot"
+            )
+        rollups = load_rollups(
+            A.paths,
+            date_range,
+            A.group_by,
+            workers=A.jobs,
+            cache=cache,
+            on_conflict=on_conflict,
+        ).result()
+        if A.json:
+            write_rollups_json(rollups, A.output, A.indent)
+        elif A.ndjson:
+            write_rollups_ndjson(rollups, A.output)
+        else:
+            write_rollups_csv(rollups, A.output)
+        if len(rollups) == 0:
+            logger.info(f"{BOLD}{YELLOW}No logs found 😴{RESET}")
+            return 1
+        return
+
+    if A.fleet:
+        if A.follow:
+            P.error("argument --fleet: not allowed with --follow")
+        if A.distributions:
+            logger.warning(
+                f"{YELLOW}--distributions is not shown with --fleet, run the"
+                f" summary of one host instead{RESET}"
+            )
+        sources = parse_sources(A.paths)
+        accs = load_fleet(
+            sources,
+            date_range,
+            workers=A.jobs,
+            cache=cache,
+            on_conflict=on_conflict,
+        )
+        stats = {host: acc.result() for host, acc in accs.items() if acc.count}
+        logger.info(
+            f"{GREEN}{sum(acc.count for acc in accs.values())} logs parsed"
+            f" from {len(stats)} hosts{RESET}"
+        )
+        if not stats:
+            logger.info(f"{BOLD}{YELLOW}No logs found 😴{RESET}")
+            return 1
+        ranked = rank_hosts(stats, A.rank_by)[: A.top]
+        empty = [host for host in accs if host not in stats]
+        print_fleet(ranked, fleet_total(accs.values()).result(), A.rank_by, empty)
+        return
+
+    if A.follow:
+        if A.json or A.ndjson or A.binary:
+            P.error("argument --follow: only allowed with the summary or --plot")
+        return follow_logs(A, date_range, cache, on_conflict)
+
+    if A.json or A.ndjson:
+        # written while parsing, rows come in file order
+        chunks = iter_log_chunks(
+            A.paths, date_range, cache=cache, on_conflict=on_conflict
+        )
+        try:
+            if A.json:
+                count = dump_json(chunks, A.indent, A.output)
+            else:
+                count = write_ndjson(chunks, A.output)
+        except BrokenPipeError:
+            # reader went away (e.g. `| head`), silence the flush at exit
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+        logger.info(f"{GREEN}{count} logs parsed{RESET}")
+        if count == 0:
+            logger.info(f"{BOLD}{YELLOW}No logs found 😴{RESET}")
+            return 1
+        return
+
     # try to parse log files
-    parsed = load_files(A.paths, date_range)
-    logger.info(f"{GREEN}{len(parsed)} logs parsed{RESET}")
+    if A.plot is None and not A.binary and not A.episodes:
+        # summary only needs running totals, stream the logs through
+        stats = load_stats(
+            A.paths,
+            date_range,
+            workers=A.jobs,
+            cache=cache,
+            distributions=A.distributions,
+            on_conflict=on_conflict,
+        )
+        count = stats.count
+    else:
+        parsed = load_files(
+            A.paths, date_range, workers=A.jobs, cache=cache, on_conflict=on_conflict
+        )
+        count = len(parsed)
+    logger.info(f"{GREEN}{count} logs parsed{RESET}")
 
-    if len(parsed) > 0:
+    if count > 0:
         if A.plot is not None:
-            if len(A.plot) == 0:
-                A.plot.append(PlotInput("cpu_temp", color="red"))
-            plot_logs(parsed, A.plot, A.interval, A.smooth)
-            if A.output != sys.stdout:
-                plt.savefig(A.output, format="png")
-            else:
-                plt.show()
-        elif A.json:
-            dump_json(parsed, A.indent, A.output)
+            _show_plot(parsed, A)
+        elif A.episodes:
+            with stage("episodes") as st:
+                st.add(len(parsed))
+                episodes = find_episodes(
+                    parsed, max_gap=A.max_gap, min_duration=A.min_duration
+                )
+            print_episodes(episodes)
+        elif A.binary:
+            # stdout is a text stream
+            save_archive(parsed, getattr(A.output, "buffer", A.output))
         else:
-            print_stats(get_stats(parsed))
+            print_stats(stats.result())
     else:
         logger.info(f"{BOLD}{YELLOW}No logs found 😴{RESET}")
         return 1
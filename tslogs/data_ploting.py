@@ -1,11 +1,15 @@
 import math
-from dataclasses import dataclass, field, fields
-from typing import Any, Dict, List, Literal, Optional, Tuple, Union, get_args
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple, Union, get_args
 
 import matplotlib.pyplot as plt
 import numpy as np
 
+from tslogs.downsample import downsample
+from tslogs.frame import FLOAT_FIELDS, LogFrame
 from tslogs.parse import LogLine
+from tslogs.resample import resample
+from tslogs.smoothing import boxcar, smooth
 
 PLOT_MODE = {
     "plot": plt.plot,
@@ -14,7 +18,7 @@ PLOT_MODE = {
 TAB_COLORS = Literal[
     "red", "blue", "green", "orange", "brown", "grey", "pink", "olive", "default"
 ]
-ALLOWED_INPUTS = [f.name for f in fields(LogLine) if f.type == float]
+ALLOWED_INPUTS = list(FLOAT_FIELDS)
 
 
 @dataclass
@@ -27,56 +31,39 @@ class PlotInput:
 
 
 def convolve_average(arr, span):
-    re = np.convolve(arr, np.ones(span * 2 + 1) / (span * 2 + 1), mode="same")
-
-    # shrinks the averaging window on the side that
-    # reaches beyond the data, keeps the other side the same size as given
-    # by "span"
-    re[0] = np.average(arr[:span])
-    for i in range(1, span + 1):
-        re[i] = np.average(arr[: i + span])
-        re[-i] = np.average(arr[-i - span :])
-    return re
+    """Centered moving average, see :func:`tslogs.smoothing.boxcar`."""
+    return boxcar(arr, span)
 
 
 def normalize_data(
-    logs: List[LogLine],
+    logs: Union[LogFrame, Iterable[LogLine]],
     inputs: List[PlotInput],
     interval,
     smooth_span,
+    reducer: str = "mean",
+    smooth_method: str = "boxcar",
 ) -> Tuple[np.ndarray, np.ndarray]:
-    # sort array
-    logs.sort(key=lambda l: l.time)
-
-    # time ranges
-    s_time = np.datetime64(str(logs[0].time))
-    e_time = np.datetime64(str(logs[-1].time))
-    times = np.arange(
-        s_time, e_time + np.timedelta64(1, "s"), np.timedelta64(interval, "s")
-    )
-
-    x_array = np.empty((len(inputs), len(times)))
-    x_array[:] = np.nan
-
-    for log in logs:
-        idx = int(((log.time - s_time.item()).total_seconds()) / interval)
-        for i, inp in enumerate(inputs):
-            x_array[i][idx] = getattr(log, inp.name)
+    frame = LogFrame.from_loglines(logs)
+    times, x_array = resample(frame, [inp.name for inp in inputs], interval, reducer)
 
     if smooth_span:
         for i in range(len(x_array)):
-            x_array[i][:] = convolve_average(x_array[i], smooth_span)
+            x_array[i] = smooth(x_array[i], smooth_span, smooth_method)
 
     return times, x_array
 
 
 def plot_logs(
-    logs: List[LogLine],
+    logs: Union[LogFrame, Iterable[LogLine]],
     inputs: List[Union[str, PlotInput]],
     interval: Optional[int] = 1,
     smooth_span: Optional[int] = None,
     title=None,
     subplots_kwargs: Dict[str, Any] = {"figsize": (16, 9), "dpi": 80},
+    reducer: str = "mean",
+    smooth_method: str = "boxcar",
+    max_points: Optional[int] = None,
+    lod_method: str = "lttb",
 ):
     # get valid LogLine fields
     valid_inputs = []
@@ -84,7 +71,7 @@ def plot_logs(
         if isinstance(inp, str):
             inp = PlotInput(inp)
         if (
-            inp.name in [f.name for f in fields(LogLine)]
+            inp.name in FLOAT_FIELDS
             and inp.plot in PLOT_MODE
             and inp.color in get_args(TAB_COLORS)
         ):
@@ -97,11 +84,21 @@ def plot_logs(
     #     and i.color in get_args(TAB_COLORS)
     # ]
 
-    x_data, plot_data = normalize_data(logs, valid_inputs, interval, smooth_span)
+    x_data, plot_data = normalize_data(
+        logs, valid_inputs, interval, smooth_span, reducer, smooth_method
+    )
 
     fig, ax = plt.subplots(1, 1, **subplots_kwargs)
 
+    # no use drawing more points than the figure is pixels wide, 0 draws all
+    if max_points is None:
+        max_points = int(fig.get_figwidth() * fig.dpi)
+    x_seconds = (x_data - x_data[0]).astype(np.float64) if len(x_data) else x_data
+
     for i, inp in enumerate(valid_inputs):
+        idx = slice(None)
+        if max_points:
+            idx = downsample(x_seconds, plot_data[i], max_points, lod_method)
         if inp.color != "default":
             inp.kwargs["color"] = f"tab:{inp.color}"
         else:
@@ -109,7 +106,7 @@ def plot_logs(
         if inp.plot == "fill":
             inp.kwargs["alpha"] = inp.kwargs.get("alpha") or 0.5
         PLOT_MODE[inp.plot](
-            x_data, plot_data[i], label=inp.label or inp.name, **inp.kwargs
+            x_data[idx], plot_data[i][idx], label=inp.label or inp.name, **inp.kwargs
         )
 
     max_y = max(np.nanmax(arr) for arr in plot_data)
@@ -0,0 +1,190 @@
+import os
+import re
+from bisect import bisect_left
+from datetime import date, datetime
+from os import PathLike
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .cache import LogCache
+
+# log files are named after their day, yyyy-mm-dd
+RE_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+# directories named after a year, month or day hold the logs of that period
+RE_DIR_PERIOD = re.compile(r"(\d{4})(?:-(\d{2}))?(?:-(\d{2}))?(?!\d)")
+# marks cache directories (https://bford.info/cachedir/), the tslogs cache too
+CACHEDIR_TAG = "CACHEDIR.TAG"
+
+
+def file_day(name: str) -> Optional[int]:
+    """Ordinal of the day a log file name starts with, None if it does not."""
+    match = RE_ISO_DATE.match(name)
+    if not match:
+        return None
+    try:
+        return date.fromisoformat(match.group()).toordinal()
+    except ValueError:
+        return None
+
+
+def dir_days(name: str) -> Optional[Tuple[int, int]]:
+    """
+    First and last day ordinal of the year, month or day a directory name
+    starts with, None if it is not named after a period.
+
+    >>> [date.fromordinal(d).isoformat() for d in dir_days("2020-02 backup")]
+    ['2020-02-01', '2020-02-29']
+    """
+    match = RE_DIR_PERIOD.match(name)
+    if not match:
+        return None
+    year, month, day = match.groups()
+    try:
+        if day:
+            first = last = date(int(year), int(month), int(day))
+        elif month:
+            first = date(int(year), int(month), 1)
+            following = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+            last = date.fromordinal(following.toordinal() - 1)
+        else:
+            first, last = date(int(year), 1, 1), date(int(year), 12, 31)
+    except ValueError:
+        return None
+    return first.toordinal(), last.toordinal()
+
+
+def day_range(date_range: Tuple[datetime, datetime]) -> Tuple[int, int]:
+    """
+    Day ordinals ``[first, stop)`` of the days overlapping ``date_range``,
+    which may be within a day.
+    """
+    start, end = date_range
+    stop = end.date().toordinal()
+    if end.time() != datetime.min.time():
+        stop += 1
+    return start.date().toordinal(), stop
+
+
+class DirIndex:
+    """
+    Listing of a directory with the dated log files sorted by day, so the files
+    of a date range are found with a binary search. Built with one
+    ``os.scandir``, it is valid while the mtime of the directory is unchanged,
+    which changes when entries are added, removed or renamed.
+    """
+
+    __slots__ = ("mtime_ns", "days", "dated", "undated", "subdirs")
+
+    def __init__(
+        self,
+        mtime_ns: int,
+        days: List[int],
+        dated: List[str],
+        undated: List[str],
+        subdirs: List[str],
+    ):
+        self.mtime_ns = mtime_ns
+        self.days = days
+        self.dated = dated
+        self.undated = undated
+        self.subdirs = subdirs
+
+    @classmethod
+    def scan(cls, dir_path: Union[str, PathLike]) -> "DirIndex":
+        mtime_ns = os.stat(dir_path).st_mtime_ns
+        dated, undated, subdirs = [], [], []
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                elif entry.is_file():
+                    day = file_day(entry.name)
+                    if day is None:
+                        undated.append(entry.name)
+                    else:
+                        dated.append((day, entry.name))
+        dated.sort()
+        return cls(
+            mtime_ns,
+            [day for day, _ in dated],
+            [name for _, name in dated],
+            sorted(undated),
+            sorted(subdirs),
+        )
+
+    def files(self) -> List[str]:
+        return sorted(self.dated + self.undated)
+
+    def files_between(self, first: int, stop: int) -> List[str]:
+        """Names of the files of the days ordinals ``[first, stop)``."""
+        return self.dated[bisect_left(self.days, first) : bisect_left(self.days, stop)]
+
+    def to_arrays(self) -> Mapping[str, np.ndarray]:
+        return {
+            "mtime_ns": np.int64(self.mtime_ns),
+            "days": np.array(self.days, dtype=np.int64),
+            "dated": np.array(self.dated, dtype=np.str_),
+            "undated": np.array(self.undated, dtype=np.str_),
+            "subdirs": np.array(self.subdirs, dtype=np.str_),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> "DirIndex":
+        return cls(
+            int(arrays["mtime_ns"]),
+            arrays["days"].tolist(),
+            arrays["dated"].tolist(),
+            arrays["undated"].tolist(),
+            arrays["subdirs"].tolist(),
+        )
+
+
+def _dir_index(dir_path: Path, cache: Optional["LogCache"]) -> DirIndex:
+    if cache is not None:
+        index = cache.get_dir_index(dir_path)
+        if index is not None:
+            return index
+    index = DirIndex.scan(dir_path)
+    if cache is not None:
+        cache.put_dir_index(dir_path, index)
+    return index
+
+
+def _overlaps(period: Optional[Tuple[int, int]], days: Tuple[int, int]) -> bool:
+    return period is None or (period[0] < days[1] and period[1] >= days[0])
+
+
+def find_files(
+    dir_path: Union[str, PathLike],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+    cache: Optional["LogCache"] = None,
+) -> List[Path]:
+    """
+    Files of ``dir_path`` and its subdirectories: all of them, or only the
+    dated log files of the days overlapping ``date_range``. Subdirectories
+    named after a year, month or day out of the range are not visited, nor
+    hidden ones and cache directories (holding a ``CACHEDIR.TAG``). Files
+    come in name order, then the files of every subdirectory in name order.
+    With a ``cache`` the listing of unchanged directories is read from it.
+    """
+    days = day_range(date_range) if date_range else None
+    found: List[Path] = []
+    stack = [Path(dir_path)]
+    while stack:
+        path = stack.pop()
+        index = _dir_index(path, cache)
+        if CACHEDIR_TAG in index.undated:
+            continue
+        if days is None:
+            names = index.files()
+        else:
+            names = index.files_between(*days)
+        found += [path / name for name in names]
+        subdirs = [d for d in index.subdirs if not d.startswith(".")]
+        if days is not None:
+            subdirs = [d for d in subdirs if _overlaps(dir_days(d), days)]
+        stack += [path / d for d in reversed(subdirs)]
+    return found
@@ -0,0 +1,81 @@
+from typing import Callable, Dict
+
+import numpy as np
+
+
+def _bucket_edges(n: int, buckets: int) -> np.ndarray:
+    # ``buckets`` ranges over the points between the first and the last one
+    return (np.arange(buckets + 1) * ((n - 2) / buckets)).astype(np.intp) + 1
+
+
+def _lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    n = len(x)
+    edges = _bucket_edges(n, points - 2)
+    # mean point of every bucket, from cumulative sums
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+    sizes = np.diff(edges)
+    avg_x = (cx[edges[1:]] - cx[edges[:-1]]) / sizes
+    avg_y = (cy[edges[1:]] - cy[edges[:-1]]) / sizes
+    # the last point closes the last triangle
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    out = np.empty(points, dtype=np.intp)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - avg_x[i]) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y[i] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def _minmax(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    n = len(x)
+    edges = _bucket_edges(n, max((points - 2) // 2, 1))
+    inner = y[1:-1]
+    bucket = np.repeat(np.arange(len(edges) - 1), np.diff(edges))
+    picked = [[0], [n - 1]]
+    for reduce in (np.minimum, np.maximum):
+        # first sample of every bucket equal to its extreme
+        extreme = reduce.reduceat(inner, edges[:-1] - 1)
+        hits = np.flatnonzero(inner == extreme[bucket])
+        _, first = np.unique(bucket[hits], return_index=True)
+        picked.append(hits[first] + 1)
+    return np.unique(np.concatenate(picked))
+
+
+# pick the indices of at most about ``points`` representative samples
+DOWNSAMPLERS: Dict[str, Callable[[np.ndarray, np.ndarray, int], np.ndarray]] = {
+    "lttb": _lttb,
+    "minmax": _minmax,
+}
+
+
+def downsample(
+    x: np.ndarray, y: np.ndarray, points: int, method: str = "lttb"
+) -> np.ndarray:
+    """
+    Indices of about ``points`` samples of the ``(x, y)`` series that keep its
+    visual shape, ``method`` is Largest-Triangle-Three-Buckets (``"lttb"``) or
+    the minimum and maximum of every bucket (``"minmax"``). Both keep spikes.
+
+    NaN samples are gaps: the first sample of every gap is kept so lines
+    stay broken there. All indices are returned when the series is short.
+    """
+    if method not in DOWNSAMPLERS:
+        raise ValueError(f"unknown method {method!r}, use one of {list(DOWNSAMPLERS)}")
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    nan = np.isnan(y)
+    valid = np.flatnonzero(~nan)
+    if points < 3 or len(valid) <= points:
+        return np.arange(len(y))
+    picked = valid[DOWNSAMPLERS[method](x[valid], y[valid], points)]
+    gaps = np.flatnonzero(nan & ~np.concatenate(([False], nan[:-1])))
+    return np.union1d(picked, gaps)
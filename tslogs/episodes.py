@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .frame import LogFrame
+
+# temperatures (°C) at or above which the cpu is considered too hot
+DEFAULT_TEMP_THRESHOLDS = (90.0,)
+# flagged rows at most this many seconds apart belong to the same episode, so
+# a few seconds of respite do not split an episode
+DEFAULT_MAX_GAP = 5
+
+
+@dataclass
+class Episode:
+    # a limit name or a temperature threshold such as "cpu_temp>=90"
+    kind: str
+    start: datetime
+    end: datetime
+    duration: timedelta
+    samples: int
+    peak_cpu_temp: float
+    avg_multi: float
+
+
+def temp_kind(threshold: float) -> str:
+    return f"cpu_temp>={threshold:g}"
+
+
+def _runs(
+    flag: np.ndarray, time: np.ndarray, max_gap: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run-length encode ``flag``: first and past-the-end row of every run of
+    flagged rows, where a run ends once no row is flagged for more than
+    ``max_gap`` seconds.
+    """
+    rows = np.flatnonzero(flag)
+    if len(rows) == 0:
+        return rows, rows
+    breaks = np.diff(time[rows]).astype(np.int64) > max_gap
+    starts = rows[np.concatenate(([True], breaks))]
+    ends = rows[np.concatenate((breaks, [True]))] + 1
+    return starts, ends
+
+
+def find_episodes(
+    frame: LogFrame,
+    limits: Optional[Iterable[str]] = None,
+    temp_thresholds: Iterable[float] = DEFAULT_TEMP_THRESHOLDS,
+    max_gap: int = DEFAULT_MAX_GAP,
+    min_duration: int = 0,
+) -> List[Episode]:
+    """
+    Throttling episodes of every limit (default: all limits of the frame) and
+    every temperature threshold, in time order. An episode is a run of
+    flagged rows with at most ``max_gap`` seconds between them and lasts from
+    its first to its last row plus one second, as logs are one row a second.
+    Episodes shorter than ``min_duration`` seconds are left out.
+
+    The peak temperature and mean multiplier are over all the rows of an
+    episode, ``samples`` only counts the flagged ones.
+    """
+    frame = frame.sort()
+    if len(frame) == 0:
+        return []
+    if limits is None:
+        limits = frame.limit_names
+    flags = [(lm, frame.limit_mask(lm)) for lm in limits]
+    flags += [(temp_kind(t), frame["cpu_temp"] >= t) for t in temp_thresholds]
+
+    # peak and mean of any row range, the sentinel lets a run end on the last row
+    cpu_temp = np.append(frame["cpu_temp"], np.nan)
+    multi_sums = np.concatenate(([0.0], np.cumsum(frame["multi"])))
+    episodes = []
+    for kind, flag in flags:
+        starts, ends = _runs(flag, frame.time, max_gap)
+        flagged = np.concatenate(([0], np.cumsum(flag)))
+        durations = (frame.time[ends - 1] - frame.time[starts]).astype(np.int64) + 1
+        keep = durations >= min_duration
+        starts, ends, durations = starts[keep], ends[keep], durations[keep]
+        if len(starts) == 0:
+            continue
+        peaks = np.fmax.reduceat(cpu_temp, np.stack((starts, ends), 1).ravel())[::2]
+        avg_multi = (multi_sums[ends] - multi_sums[starts]) / (ends - starts)
+        samples = flagged[ends] - flagged[starts]
+        for i in range(len(starts)):
+            episodes.append(
+                Episode(
+                    kind,
+                    frame.time[starts[i]].item(),
+                    frame.time[ends[i] - 1].item(),
+                    timedelta(seconds=int(durations[i])),
+                    int(samples[i]),
+                    float(peaks[i]),
+                    float(avg_multi[i]),
+                )
+            )
+    episodes.sort(key=lambda e: (e.start, e.kind))
+    return episodes
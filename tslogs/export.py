@@ -0,0 +1,249 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+from .frame import FLOAT_FIELDS, LogFrame, LogLine
+from .instrument import stage
+
+if TYPE_CHECKING:
+    from .stats import LogStats
+
+# rows are serialized and written this many at a time
+EXPORT_CHUNK_SIZE = 1 << 12
+
+
+def _json_floats(col: np.ndarray) -> List[str]:
+    """JSON text of float values, as :func:`json.dumps` writes them."""
+    text = list(map(float.__repr__, col.tolist()))
+    for i in np.flatnonzero(~np.isfinite(col)).tolist():
+        text[i] = (
+            "NaN" if np.isnan(col[i]) else "-Infinity" if col[i] < 0 else "Infinity"
+        )
+    return text
+
+
+class _RecordFormat:
+    """
+    Writes rows the way ``json.dumps(record, indent=indent,
+    separators=separators)`` would, nested ``depth`` levels deep, without
+    building a dict per row.
+    """
+
+    def __init__(
+        self, indent: Optional[int], separators: Tuple[str, str], depth: int = 0
+    ):
+        item_sep, key_sep = separators
+        if indent is None:
+            outer = inner = ""
+        else:
+            outer = "\n" + " " * (indent * depth)
+            inner = outer + " " * indent
+        names = ["time", *FLOAT_FIELDS, "limits"]
+        self.template = (
+            "{{"
+            + inner
+            + (item_sep + inner).join(f'"{name}"{key_sep}{{}}' for name in names)
+            + outer
+            + "}}"
+        )
+        self.indent = indent
+        self.separators = separators
+        self.list_pad = inner
+        self._limits: Dict[Tuple[str, ...], str] = {}
+
+    def _limits_text(self, limits: Tuple[str, ...]) -> str:
+        text = self._limits.get(limits)
+        if text is None:
+            text = json.dumps(
+                list(limits), indent=self.indent, separators=self.separators
+            )
+            if self.list_pad:
+                text = text.replace("\n", self.list_pad)
+            self._limits[limits] = text
+        return text
+
+    def records(self, frame: LogFrame) -> Iterator[str]:
+        for start in range(0, len(frame), EXPORT_CHUNK_SIZE):
+            chunk = frame[start : start + EXPORT_CHUNK_SIZE]
+            with stage("format") as st:
+                st.add(len(chunk))
+                # same text as str(datetime), which json.dumps(default=str) gave
+                times = np.datetime_as_string(chunk.time, unit="s").tolist()
+                columns = [_json_floats(chunk[name]) for name in FLOAT_FIELDS]
+                limits = [self._limits_text(lm) for lm in chunk._limits_lists()]
+                fmt = self.template.format
+                records = [
+                    fmt(f'"{t[:10]} {t[11:]}"', *[col[i] for col in columns], limits[i])
+                    for i, t in enumerate(times)
+                ]
+            yield from records
+
+
+def _frames(
+    loglines: Union[LogFrame, Iterable[Union[LogLine, LogFrame]]],
+) -> Iterator[LogFrame]:
+    if isinstance(loglines, LogFrame):
+        yield loglines
+        return
+    pending: List[LogLine] = []
+    for item in loglines:
+        if isinstance(item, LogFrame):
+            if pending:
+                yield LogFrame.from_loglines(pending)
+                pending = []
+            yield item
+        else:
+            pending.append(item)
+            if len(pending) >= EXPORT_CHUNK_SIZE:
+                yield LogFrame.from_loglines(pending)
+                pending = []
+    if pending:
+        yield LogFrame.from_loglines(pending)
+
+
+def _write_chunks(parts: Iterable[str], out_fp: IO) -> None:
+    binary = "b" in getattr(out_fp, "mode", "")
+    buffer = []
+
+    def flush() -> None:
+        content = "".join(buffer)
+        with stage("write") as st:
+            out_fp.write(content.encode("utf-8") if binary else content)
+            st.add(nbytes=len(content))
+        buffer.clear()
+
+    for part in parts:
+        buffer.append(part)
+        if len(buffer) >= EXPORT_CHUNK_SIZE:
+            flush()
+    flush()
+
+
+def write_json(
+    loglines: Union[LogFrame, Iterable[Union[LogLine, LogFrame]]],
+    out_fp: IO,
+    indent: Optional[int] = 4,
+) -> int:
+    """
+    Write rows as a single JSON array, record by record, giving the same text
+    as :func:`json.dumps` of the whole list would. ``loglines`` may be a frame
+    or any iterable of rows or frames. Returns the number of rows.
+    """
+    if indent is None:
+        fmt = _RecordFormat(None, (", ", ": "))
+        begin, sep, end = "[", ", ", "]"
+    else:
+        fmt = _RecordFormat(indent, (",", ": "), depth=1)
+        pad = "\n" + " " * indent
+        begin, sep, end = "[" + pad, "," + pad, "\n]"
+    count = 0
+
+    def parts() -> Iterator[str]:
+        nonlocal count
+        for frame in _frames(loglines):
+            for record in fmt.records(frame):
+                yield (sep if count else begin) + record
+                count += 1
+        yield end if count else "[]"
+
+    _write_chunks(parts(), out_fp)
+    return count
+
+
+def write_ndjson(
+    loglines: Union[LogFrame, Iterable[Union[LogLine, LogFrame]]],
+    out_fp: IO,
+) -> int:
+    """
+    Write rows as newline delimited JSON, one compact object per line. Returns
+    the number of rows.
+    """
+    fmt = _RecordFormat(None, (",", ":"))
+    count = 0
+
+    def lines() -> Iterator[str]:
+        nonlocal count
+        for frame in _frames(loglines):
+            for record in fmt.records(frame):
+                yield record + "\n"
+                count += 1
+
+    _write_chunks(lines(), out_fp)
+    return count
+
+
+def rollup_records(rollups: Mapping[datetime, "LogStats"]) -> List[Dict[str, Any]]:
+    """
+    Flat records of :func:`tslogs.stats.get_rollups` periods, durations in
+    seconds and one ``<limit>_secs`` column per limit seen in any period.
+    """
+    limits = list(
+        dict.fromkeys(lm.limit for stats in rollups.values() for lm in stats.limits)
+    )
+    records = []
+    for period, stats in rollups.items():
+        record = {
+            "period": str(period),
+            "start": str(stats.time_range[0]),
+            "end": str(stats.time_range[1]),
+            "time_elapsed_secs": int(stats.time_elapsed.total_seconds()),
+            "max_cpu_temp": stats.max_cpu_temp,
+            "time_above_90_secs": int(stats.time_above_90.total_seconds()),
+            "percent_above_90": stats.percent_above_90,
+            "samples": stats.timeline.samples,
+            "duplicates": stats.timeline.duplicates,
+            "gaps": stats.timeline.gaps,
+            "coverage": stats.timeline.coverage,
+            **{f"avg_{name}": getattr(stats, f"avg_{name}") for name in FLOAT_FIELDS},
+        }
+        record.update(dict.fromkeys((f"{lm}_secs" for lm in limits), 0))
+        record.update({f"{lm.limit}_secs": lm.total_secs for lm in stats.limits})
+        records.append(record)
+    return records
+
+
+def write_rollups_csv(rollups: Mapping[datetime, "LogStats"], out_fp: IO) -> int:
+    """Write rollups as CSV with a header line, returns the number of periods."""
+    records = rollup_records(rollups)
+    text = io.StringIO()
+    if records:
+        writer = csv.DictWriter(text, fieldnames=list(records[0]), lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(records)
+    _write_chunks([text.getvalue()], out_fp)
+    return len(records)
+
+
+def write_rollups_json(
+    rollups: Mapping[datetime, "LogStats"], out_fp: IO, indent: Optional[int] = 4
+) -> int:
+    """Write rollups as a JSON array of records, returns the number of periods."""
+    records = rollup_records(rollups)
+    _write_chunks([json.dumps(records, indent=indent)], out_fp)
+    return len(records)
+
+
+def write_rollups_ndjson(rollups: Mapping[datetime, "LogStats"], out_fp: IO) -> int:
+    """Write rollups as newline delimited JSON, returns the number of periods."""
+    records = rollup_records(rollups)
+    _write_chunks(
+        (json.dumps(record, separators=(",", ":")) + "\n" for record in records),
+        out_fp,
+    )
+    return len(records)
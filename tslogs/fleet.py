@@ -0,0 +1,151 @@
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+from functools import partial
+from os import PathLike
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+from .cache import LogCache
+from .parse import map_files
+from .stats import LogStats, StatsAccumulator, load_stats
+
+# LogStats fields hosts can be ranked by, a limit name ranks by its seconds
+RANK_FIELDS = (
+    "percent_above_90",
+    "time_above_90",
+    "max_cpu_temp",
+    "avg_cpu_temp",
+    "avg_power",
+    "time_elapsed",
+)
+
+
+def parse_sources(specs: Iterable[Union[str, PathLike]]) -> Dict[str, List[Path]]:
+    """
+    Paths of every host from ``host=path`` specs. Specs with the same label
+    are paths of one host. A bare path is labeled with its name, and with as
+    many of its parents as needed to tell it from the other labels.
+
+    >>> sources = parse_sources(
+    ...     ["laptop=/logs/a", "/alice/logs", "/bob/logs", "laptop=/backup/a"]
+    ... )
+    >>> list(sources)
+    ['laptop', 'alice/logs', 'bob/logs']
+    >>> [p.as_posix() for p in sources["laptop"]]
+    ['/logs/a', '/backup/a']
+    """
+    specs = [str(spec) for spec in specs]
+    hosts: List[Optional[str]] = []
+    for spec in specs:
+        host, sep, _ = spec.partition("=")
+        hosts.append(host if sep and host and not os.path.exists(spec) else None)
+    labels = _path_labels(
+        [spec for spec, host in zip(specs, hosts) if host is None],
+        {host for host in hosts if host is not None},
+    )
+
+    sources: Dict[str, List[Path]] = {}
+    for spec, host in zip(specs, hosts):
+        if host is None:
+            host, path = labels[os.path.abspath(spec)], spec
+        else:
+            path = spec.partition("=")[2]
+        sources.setdefault(host, []).append(Path(path))
+    return sources
+
+
+def _path_labels(paths: List[str], taken: Set[str]) -> Dict[str, str]:
+    """
+    Label of every absolute path in ``paths``: its last parts, the fewest
+    that differ from the labels of the other paths and from ``taken``.
+    """
+    parts = {p: Path(p).parts for p in map(os.path.abspath, paths)}
+    depth = dict.fromkeys(parts, 1)
+    while True:
+        labels = {p: "/".join(parts[p][-depth[p] :]) for p in parts}
+        counts = Counter(labels.values())
+        clashes = [
+            p
+            for p, label in labels.items()
+            if (counts[label] > 1 or label in taken) and depth[p] < len(parts[p])
+        ]
+        if not clashes:
+            return labels
+        for p in clashes:
+            depth[p] += 1
+
+
+def _host_stats(
+    paths: Sequence[Union[str, PathLike]],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+    cache: Optional[LogCache] = None,
+    distributions: bool = False,
+    on_conflict: Optional[str] = None,
+) -> StatsAccumulator:
+    # several paths of a host are likely copies of the same logs
+    if len(paths) == 1:
+        on_conflict = None
+    return load_stats(
+        paths,
+        date_range,
+        cache=cache,
+        distributions=distributions,
+        on_conflict=on_conflict,
+    )
+
+
+def load_fleet(
+    sources: Mapping[str, Sequence[Union[str, PathLike]]],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+    workers: Optional[int] = None,
+    cache: Optional[LogCache] = None,
+    distributions: bool = False,
+    on_conflict: Optional[str] = "first",
+) -> Dict[str, StatsAccumulator]:
+    """
+    Stats accumulator of every host of ``sources`` (see :func:`parse_sources`),
+    hosts are loaded in a pool of ``workers`` processes (see
+    :func:`tslogs.parse.map_files`) and their rows streamed, so memory grows
+    with the number of hosts, not of rows. The paths of a host with several
+    paths are merged by the ``on_conflict`` policy.
+    """
+    host_stats = partial(
+        _host_stats, cache=cache, distributions=distributions, on_conflict=on_conflict
+    )
+    paths = [list(p) for p in sources.values()]
+    return dict(zip(sources, map_files(host_stats, paths, date_range, workers)))
+
+
+def fleet_total(accumulators: Iterable[StatsAccumulator]) -> StatsAccumulator:
+    """
+    Stats of all hosts together, durations add up across hosts and averages
+    are weighted by the log time of every host.
+    """
+    total = StatsAccumulator()
+    for acc in sorted(
+        (acc for acc in accumulators if acc.count), key=lambda acc: acc.start_t
+    ):
+        total.merge(acc)
+    return total
+
+
+def limit_secs(stats: LogStats, limit: str) -> int:
+    return next((lm.total_secs for lm in stats.limits if lm.limit == limit), 0)
+
+
+def rank_value(stats: LogStats, key: str) -> float:
+    """Value of ``key``, a :data:`RANK_FIELDS` field or a limit name."""
+    if key not in RANK_FIELDS:
+        return limit_secs(stats, key)
+    value = getattr(stats, key)
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return value
+
+
+def rank_hosts(
+    stats: Mapping[str, LogStats], key: str = "percent_above_90"
+) -> List[Tuple[str, LogStats]]:
+    """Hosts from the highest ``key`` (see :func:`rank_value`) to the lowest."""
+    return sorted(stats.items(), key=lambda item: -rank_value(item[1], key))
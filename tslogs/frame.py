@@ -0,0 +1,366 @@
+import sys
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+import numpy as np
+
+# limits are stored as a bitmask, one bit per distinct limit token
+LIMITS_DTYPE = np.uint64
+MAX_LIMITS = np.iinfo(LIMITS_DTYPE).bits
+TIME_DTYPE = "datetime64[s]"
+
+T = TypeVar("T")
+
+
+def _slotted(cls: Type[T], name: str) -> Type[T]:
+    """
+    Copy of a dataclass named ``name`` with ``__slots__`` for its fields, so its
+    instances have no ``__dict__`` (``dataclass(slots=True)`` needs Python
+    3.10). Rows compare equal to the rows of ``cls`` with the same fields.
+    """
+    names = tuple(f.name for f in fields(cls))
+    cls_dict = {k: v for k, v in cls.__dict__.items() if k not in names}
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    cls_dict.update(__slots__=names, __qualname__=name, __eq__=_row_eq)
+    return type(cls)(name, cls.__bases__, cls_dict)
+
+
+def _row_eq(self, other: object) -> bool:
+    if not isinstance(other, ROW_TYPES):
+        return NotImplemented
+    return all(getattr(self, f.name) == getattr(other, f.name) for f in fields(self))
+
+
+@dataclass
+class LogLine:
+    time: datetime
+    multi: float
+    c0: float
+    clock_mod: float
+    chip_mod: float
+    battery_mw: float
+    cpu_temp: float
+    gpu_mhz: float
+    gpu_temp: float
+    vid: float
+    power: float
+    limits: List[str] = field(default_factory=list)
+
+
+FLOAT_FIELDS: Tuple[str, ...] = tuple(
+    f.name for f in fields(LogLine) if f.type == float
+)
+
+# LogLine with __slots__ instead of a __dict__, about 100 bytes less per row
+SlottedLogLine = _slotted(LogLine, "SlottedLogLine")
+
+
+class LimitRegistry:
+    """
+    Process wide id of every distinct limits tuple, in the order of the row.
+    Rows keep their limits as this id and all rows with the same limits share
+    one interned tuple.
+    """
+
+    def __init__(self) -> None:
+        self._ids: Dict[Tuple[str, ...], int] = {(): 0}
+        self._names: List[Tuple[str, ...]] = [()]
+
+    def intern(self, names: Iterable[str]) -> int:
+        names = tuple(names)
+        key = self._ids.get(names)
+        if key is None:
+            key = self._ids[names] = len(self._names)
+            self._names.append(tuple(sys.intern(lm) for lm in names))
+        return key
+
+    def names(self, key: int) -> Tuple[str, ...]:
+        return self._names[key]
+
+
+LIMIT_REGISTRY = LimitRegistry()
+
+
+@dataclass(eq=False, repr=False)
+class CompactLogLine(SlottedLogLine):  # type: ignore[misc, valid-type]
+    """
+    :class:`LogLine` of fewer bytes for when millions of rows are kept: only
+    an int stands for the limits (see :class:`LimitRegistry`). ``limits``
+    reads as a new list and ``dataclasses.asdict`` gives the same dict as for
+    a ``LogLine``, but changes to the list are not kept, assign it instead.
+    """
+
+    # the limits slot of SlottedLogLine stays unused
+    __slots__ = ("_limits",)
+
+    @property  # type: ignore[override]
+    def limits(self) -> List[str]:
+        return list(LIMIT_REGISTRY.names(self._limits))
+
+    @limits.setter
+    def limits(self, limits: Iterable[str]) -> None:
+        self._limits = LIMIT_REGISTRY.intern(limits)
+
+    __eq__ = _row_eq
+
+
+# rows comparing equal when their fields are
+ROW_TYPES = (LogLine, SlottedLogLine)
+
+
+def _shared(values: List[float]) -> List[float]:
+    """``values`` with a single object for every distinct value."""
+    seen: Dict[float, float] = {}
+    return [seen.setdefault(v, v) for v in values]
+
+
+class LogFrame:
+    """
+    Columnar container for parsed logs.
+
+    Timestamps are kept in a single ``datetime64[s]`` array, every float field
+    of :class:`LogLine` in its own ``float64`` array and the limits as a bitmask
+    array where bit ``i`` stands for ``limit_names[i]``. ``LogLine`` objects are
+    only built when the frame is iterated or indexed with an integer.
+
+    >>> frame = LogFrame.from_loglines(
+    ...     [LogLine(datetime(2020, 8, 7, 11), *range(10), limits=["PL1"])]
+    ... )
+    >>> len(frame), frame.limit_names
+    (1, ('PL1',))
+    >>> frame[0].limits
+    ['PL1']
+    """
+
+    __slots__ = ("time", "columns", "limits", "limit_names")
+
+    def __init__(
+        self,
+        time: np.ndarray,
+        columns: Dict[str, np.ndarray],
+        limits: Optional[np.ndarray] = None,
+        limit_names: Sequence[str] = (),
+    ):
+        self.time: np.ndarray = np.asarray(time, dtype=TIME_DTYPE)
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.asarray(columns[name], dtype=np.float64) for name in FLOAT_FIELDS
+        }
+        if limits is None:
+            limits = np.zeros(len(self.time), dtype=LIMITS_DTYPE)
+        self.limits: np.ndarray = np.asarray(limits, dtype=LIMITS_DTYPE)
+        self.limit_names: Tuple[str, ...] = tuple(limit_names)
+
+        if len(self.limit_names) > MAX_LIMITS:
+            raise ValueError(f"at most {MAX_LIMITS} distinct limits are supported.")
+        n = len(self.time)
+        if len(self.limits) != n or any(len(c) != n for c in self.columns.values()):
+            raise ValueError("all columns must have the same length.")
+
+    @classmethod
+    def empty(cls) -> "LogFrame":
+        return cls(
+            np.empty(0, dtype=TIME_DTYPE),
+            {name: np.empty(0) for name in FLOAT_FIELDS},
+        )
+
+    @classmethod
+    def from_loglines(cls, loglines: Iterable[LogLine]) -> "LogFrame":
+        if isinstance(loglines, LogFrame):
+            return loglines
+        times: List[datetime] = []
+        values: Dict[str, List[float]] = {name: [] for name in FLOAT_FIELDS}
+        masks: List[int] = []
+        bits: Dict[str, int] = {}
+        for log in loglines:
+            times.append(log.time)
+            for name in FLOAT_FIELDS:
+                values[name].append(getattr(log, name))
+            mask = 0
+            for lm in log.limits:
+                if lm not in bits:
+                    bits[lm] = len(bits)
+                mask |= 1 << bits[lm]
+            masks.append(mask)
+        if len(bits) > MAX_LIMITS:
+            raise ValueError(f"at most {MAX_LIMITS} distinct limits are supported.")
+        return cls(
+            np.array(times, dtype=TIME_DTYPE),
+            {name: np.array(v, dtype=np.float64) for name, v in values.items()},
+            np.array(masks, dtype=LIMITS_DTYPE),
+            tuple(bits),
+        )
+
+    @classmethod
+    def concat(cls, frames: Iterable["LogFrame"]) -> "LogFrame":
+        """
+        Join frames end to end, re-mapping limit bits into a shared set of names.
+        """
+        frames = [f for f in frames if len(f) > 0]
+        if not frames:
+            return cls.empty()
+        if len(frames) == 1:
+            return frames[0]
+
+        names: Dict[str, int] = {}
+        for f in frames:
+            for lm in f.limit_names:
+                names.setdefault(lm, len(names))
+        if len(names) > MAX_LIMITS:
+            raise ValueError(f"at most {MAX_LIMITS} distinct limits are supported.")
+
+        limits = [f._remap_limits(tuple(names)) for f in frames]
+        return cls(
+            np.concatenate([f.time for f in frames]),
+            {
+                name: np.concatenate([f.columns[name] for f in frames])
+                for name in FLOAT_FIELDS
+            },
+            np.concatenate(limits),
+            tuple(names),
+        )
+
+    def _remap_limits(self, limit_names: Tuple[str, ...]) -> np.ndarray:
+        """Limits bitmask re-encoded against ``limit_names`` (a superset)."""
+        if self.limit_names == limit_names[: len(self.limit_names)]:
+            return self.limits
+        out = np.zeros(len(self), dtype=LIMITS_DTYPE)
+        for i, lm in enumerate(self.limit_names):
+            has = (self.limits & LIMITS_DTYPE(1 << i)) != 0
+            out[has] |= LIMITS_DTYPE(1 << limit_names.index(lm))
+        return out
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __iter__(self) -> Iterator[LogLine]:
+        return self.iter_rows()
+
+    def iter_rows(self, compact: bool = False) -> Iterator[LogLine]:
+        """Rows as :class:`LogLine`, or as :class:`CompactLogLine` if ``compact``."""
+        times = self.time.tolist()
+        if compact:
+            # rows share the float objects of equal values, and limits ids
+            cols = [_shared(self.columns[name].tolist()) for name in FLOAT_FIELDS]
+            ids = {
+                m: LIMIT_REGISTRY.intern(self._mask_to_names(m))
+                for m in set(self.limits.tolist())
+            }
+            row_ids = [ids[m] for m in self.limits.tolist()]
+            for i, t in enumerate(times):
+                row = CompactLogLine(t, *[c[i] for c in cols])
+                row._limits = row_ids[i]
+                yield row
+            return
+        cols = [self.columns[name].tolist() for name in FLOAT_FIELDS]
+        limits = self._limits_lists()
+        for i, t in enumerate(times):
+            yield LogLine(t, *[c[i] for c in cols], limits=list(limits[i]))
+
+    def __getitem__(
+        self, key: Union[int, str, slice, np.ndarray]
+    ) -> Union[LogLine, np.ndarray, "LogFrame"]:
+        if isinstance(key, str):
+            if key == "time":
+                return self.time
+            return self.columns[key]
+        if isinstance(key, (int, np.integer)):
+            mask = int(self.limits[key])
+            return LogLine(
+                self.time[key].item(),
+                *[self.columns[name][key].item() for name in FLOAT_FIELDS],
+                limits=self._mask_to_names(mask),
+            )
+        return self.take(key)
+
+    def __repr__(self) -> str:
+        if len(self) == 0:
+            return "LogFrame(rows=0)"
+        return f"LogFrame(rows={len(self)}, from={self.time[0]}, to={self.time[-1]})"
+
+    def _mask_to_names(self, mask: int) -> List[str]:
+        return [lm for i, lm in enumerate(self.limit_names) if mask >> i & 1]
+
+    def _limits_lists(self) -> List[Tuple[str, ...]]:
+        # only a handful of distinct masks exist, decode each of them once
+        uniq, inverse = np.unique(self.limits, return_inverse=True)
+        decoded = [tuple(self._mask_to_names(int(m))) for m in uniq]
+        return [decoded[i] for i in inverse.ravel().tolist()]
+
+    def take(self, index: Union[slice, np.ndarray]) -> "LogFrame":
+        """Rows selected by a slice, an integer index array or a boolean mask."""
+        return LogFrame(
+            self.time[index],
+            {name: col[index] for name, col in self.columns.items()},
+            self.limits[index],
+            self.limit_names,
+        )
+
+    def limit_mask(self, limit: str) -> np.ndarray:
+        """Boolean array telling which rows carry ``limit``."""
+        if limit not in self.limit_names:
+            return np.zeros(len(self), dtype=bool)
+        bit = LIMITS_DTYPE(1 << self.limit_names.index(limit))
+        return (self.limits & bit) != 0
+
+    def is_sorted(self) -> bool:
+        return bool(len(self) < 2 or np.all(self.time[1:] >= self.time[:-1]))
+
+    def sort(self) -> "LogFrame":
+        """Frame ordered by time, rows with equal time keep their order."""
+        if self.is_sorted():
+            return self
+        return self.take(np.argsort(self.time, kind="stable"))
+
+    def time_slice(self, start: datetime, end: datetime) -> slice:
+        """
+        Rows with ``start <= time < end`` of a time sorted frame, found with a
+        binary search.
+        """
+        lo, hi = np.searchsorted(
+            self.time, [np.datetime64(start, "s"), np.datetime64(end, "s")]
+        )
+        return slice(int(lo), max(int(lo), int(hi)))
+
+    def between(self, start: datetime, end: datetime) -> "LogFrame":
+        """Rows with ``start <= time < end``, a view when the frame is sorted."""
+        if self.is_sorted():
+            return self.take(self.time_slice(start, end))
+        start64 = np.datetime64(start, "s")
+        end64 = np.datetime64(end, "s")
+        return self.take((self.time >= start64) & (self.time < end64))
+
+    def to_loglines(self, compact: bool = False) -> List[LogLine]:
+        return list(self.iter_rows(compact))
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Plain arrays of the frame, suitable for ``np.savez``."""
+        return {
+            "time": self.time,
+            **{f"column_{name}": col for name, col in self.columns.items()},
+            "limits": self.limits,
+            "limit_names": np.array(self.limit_names, dtype=np.str_),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> "LogFrame":
+        """Inverse of :meth:`to_arrays`."""
+        return cls(
+            arrays["time"],
+            {name: arrays[f"column_{name}"] for name in FLOAT_FIELDS},
+            arrays["limits"],
+            [str(lm) for lm in arrays["limit_names"]],
+        )
@@ -0,0 +1,137 @@
+from datetime import datetime
+from os import PathLike
+from typing import Dict, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from .frame import TIME_DTYPE
+
+# seconds between two entries of a sparse file index
+INDEX_INTERVAL = 600
+# bytes kept from the end of the indexed part to notice rewritten files
+INDEX_TAIL_SIZE = 64
+# how far back to look for the last line end of a file
+_SCAN_SIZE = 1 << 16
+
+
+def read_tail(file_path: Union[str, PathLike], size: int) -> Tuple[int, bytes]:
+    """
+    End of the last complete line within the first ``size`` bytes of a file and
+    the bytes just before it, a partial last line is left out of an index.
+    """
+    start = max(size - _SCAN_SIZE, 0)
+    with open(file_path, "rb") as fp:
+        fp.seek(start)
+        data = fp.read(size - start)
+    cut = data.rfind(b"\n") + 1
+    if cut == 0:
+        return 0, b""
+    return start + cut, data[max(cut - INDEX_TAIL_SIZE, 0) : cut]
+
+
+class FileIndex:
+    """
+    Sparse index of the first ``size`` bytes of a log file: the time and line
+    byte offset of the first row of every ``INDEX_INTERVAL`` seconds.
+
+    As long as the rows of a file are in time order (``monotonic``, true unless
+    the clock was changed) a time range maps to a byte range through a binary
+    search, so only those bytes need to be parsed. ThrottleStop only appends
+    to its logs, an index stays valid while the file grows and can be
+    extended with the rows of the new bytes.
+    """
+
+    __slots__ = ("times", "offsets", "size", "last_time", "monotonic", "tail")
+
+    def __init__(
+        self,
+        times: np.ndarray,
+        offsets: np.ndarray,
+        size: int,
+        last_time: Optional[np.datetime64],
+        monotonic: bool,
+        tail: bytes,
+    ):
+        self.times = times
+        self.offsets = offsets
+        self.size = size
+        self.last_time = last_time
+        self.monotonic = monotonic
+        self.tail = tail
+
+    @classmethod
+    def empty(cls) -> "FileIndex":
+        return cls(
+            np.empty(0, dtype=TIME_DTYPE),
+            np.empty(0, dtype=np.int64),
+            0,
+            None,
+            True,
+            b"",
+        )
+
+    def extend(
+        self, times: np.ndarray, offsets: np.ndarray, size: int, tail: bytes
+    ) -> "FileIndex":
+        """
+        Index of the file grown to ``size`` bytes, ``times`` and ``offsets`` are
+        the rows of the new bytes in file order.
+        """
+        if len(times) == 0:
+            return FileIndex(
+                self.times, self.offsets, size, self.last_time, self.monotonic, tail
+            )
+        monotonic = self.monotonic and bool(np.all(times[1:] >= times[:-1]))
+        if self.last_time is not None:
+            monotonic &= bool(times[0] >= self.last_time)
+        # first row of every interval
+        bucket = times.astype(np.int64) // INDEX_INTERVAL
+        previous = -1 if self.last_time is None else self.last_time.astype(np.int64)
+        new = np.diff(bucket, prepend=previous // INDEX_INTERVAL) != 0
+        return FileIndex(
+            np.concatenate((self.times, times[new])),
+            np.concatenate((self.offsets, offsets[new].astype(np.int64))),
+            size,
+            times[-1],
+            monotonic,
+            tail,
+        )
+
+    def byte_range(self, start: datetime, end: datetime) -> Tuple[int, int]:
+        """
+        Bytes of the indexed part holding every row with ``start <= time <
+        end``, only meaningful for a ``monotonic`` index.
+        """
+        if len(self.times) == 0:
+            return 0, 0
+        start64 = np.datetime64(start, "s")
+        end64 = np.datetime64(end, "s")
+        # rows of the second of an entry may come before it
+        lo = max(int(np.searchsorted(self.times, start64, side="left")) - 1, 0)
+        hi = int(np.searchsorted(self.times, end64, side="left"))
+        stop = int(self.offsets[hi]) if hi < len(self.offsets) else self.size
+        return int(self.offsets[lo]), stop
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "times": self.times,
+            "offsets": self.offsets,
+            "size": np.int64(self.size),
+            "last_time": np.array(
+                self.last_time if self.last_time is not None else "NaT", TIME_DTYPE
+            ),
+            "monotonic": np.bool_(self.monotonic),
+            "tail": np.frombuffer(self.tail, dtype=np.uint8),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> "FileIndex":
+        last_time = arrays["last_time"][()]
+        return cls(
+            arrays["times"],
+            arrays["offsets"],
+            int(arrays["size"]),
+            None if np.isnat(last_time) else last_time,
+            bool(arrays["monotonic"]),
+            arrays["tail"].tobytes(),
+        )
@@ -0,0 +1,210 @@
+"""
+Timing of the pipeline stages: file discovery, parsing, cache reads, date
+filtering, merging, stats, export and plotting.
+
+The stages report to the active :class:`Profiler`, if any, and are close to
+free otherwise::
+
+    with profiling() as prof:
+        stats = load_stats(paths)
+    print(prof.format_table())
+
+Stages run in worker processes (``workers`` > 1) are only seen as the time
+spent waiting on the pool.
+"""
+
+import cProfile
+import json
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from os import PathLike
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+# called with every finished stage: name, seconds, rows, bytes
+StageHook = Callable[[str, float, int, int], None]
+
+
+def peak_rss() -> Optional[int]:
+    """Peak resident size of this process so far in bytes, None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macos
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class StageStat:
+    name: str
+    # nesting of the stage when first run, its time includes the nested ones
+    depth: int
+    calls: int = 0
+    seconds: float = 0.0
+    rows: int = 0
+    # bytes read, or written by the export
+    bytes: int = 0
+    # peak resident size of the process when the stage last finished
+    peak_rss: Optional[int] = None
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "rows", "bytes", "start")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.rows = 0
+        self.bytes = 0
+
+    def add(self, rows: int = 0, nbytes: int = 0) -> None:
+        """Count ``rows`` processed and ``nbytes`` read or written by the stage."""
+        self.rows += rows
+        self.bytes += nbytes
+
+    def __enter__(self) -> "_Stage":
+        self.profiler._begin(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        seconds = time.perf_counter() - self.start
+        self.profiler._depth -= 1
+        self.profiler.record(self.name, seconds, self.rows, self.bytes)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def add(self, rows: int = 0, nbytes: int = 0) -> None:
+        pass
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Profiler:
+    """
+    Wall time, rows, bytes read and peak memory of every stage by name, in
+    the order stages first ran. ``hook`` is also called with every finished
+    stage, to forward them to other metrics.
+    """
+
+    def __init__(self, hook: Optional[StageHook] = None):
+        self.hook = hook
+        self.stages: Dict[str, StageStat] = {}
+        self.start = time.perf_counter()
+        self.seconds = 0.0
+        self._depth = 0
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def _begin(self, name: str) -> None:
+        if name not in self.stages:
+            self.stages[name] = StageStat(name, self._depth)
+        self._depth += 1
+
+    def record(self, name: str, seconds: float, rows: int = 0, nbytes: int = 0):
+        stat = self.stages.get(name)
+        if stat is None:
+            stat = self.stages[name] = StageStat(name, self._depth)
+        stat.calls += 1
+        stat.seconds += seconds
+        stat.rows += rows
+        stat.bytes += nbytes
+        stat.peak_rss = peak_rss()
+        if self.hook is not None:
+            self.hook(name, seconds, rows, nbytes)
+
+    def stop(self) -> None:
+        self.seconds += time.perf_counter() - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seconds": self.seconds,
+            "peak_rss": peak_rss(),
+            "stages": [asdict(stat) for stat in self.stages.values()],
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def format_table(self) -> str:
+        def mb(value: Optional[int]) -> str:
+            return f"{value / 2**20:.1f}MB" if value is not None else "-"
+
+        lines = [
+            f"{'STAGE':22} {'CALLS':>7} {'TIME':>10} {'ROWS':>11} {'ROWS/S':>12}"
+            f" {'BYTES':>10} {'PEAK RSS':>10}"
+        ]
+        for stat in self.stages.values():
+            speed = f"{stat.rows / stat.seconds:,.0f}" if stat.seconds else "-"
+            lines.append(
+                f"{'  ' * stat.depth + stat.name:22} {stat.calls:>7}"
+                f" {stat.seconds * 1000:>8.1f}ms {stat.rows:>11}"
+                f" {speed if stat.rows else '':>12}"
+                f" {mb(stat.bytes) if stat.bytes else '':>10}"
+                f" {mb(stat.peak_rss):>10}"
+            )
+        lines.append(
+            f"{'total':22} {'':>7} {self.seconds * 1000:>8.1f}ms {'':>11} {'':>12}"
+            f" {'':>10} {mb(peak_rss()):>10}"
+        )
+        return "\n".join(lines)
+
+
+_profiler: Optional[Profiler] = None
+
+
+def active_profiler() -> Optional[Profiler]:
+    return _profiler
+
+
+def stage(name: str) -> Union[_Stage, _NullStage]:
+    """
+    Context manager timing the stage ``name`` on the active profiler, its
+    ``add(rows, nbytes)`` counts what the stage went over. Without a profiler
+    it does nothing.
+    """
+    if _profiler is None:
+        return _NULL_STAGE
+    return _profiler.stage(name)
+
+
+@contextmanager
+def profiling(
+    profiler: Optional[Profiler] = None,
+    dump: Optional[Union[str, PathLike]] = None,
+) -> Iterator[Profiler]:
+    """
+    Make ``profiler``, or a new one, the active profiler for the block. With
+    ``dump`` the block is also run under :mod:`cProfile` and its stats saved
+    there, to be read with :mod:`pstats`.
+    """
+    global _profiler
+    previous, _profiler = _profiler, profiler or Profiler()
+    _profiler.start = time.perf_counter()
+    cprofile = cProfile.Profile() if dump else None
+    try:
+        if cprofile is not None:
+            cprofile.enable()
+        yield _profiler
+    finally:
+        if cprofile is not None:
+            cprofile.disable()
+            cprofile.dump_stats(dump)
+        _profiler.stop()
+        _profiler = previous
@@ -0,0 +1,110 @@
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from .frame import FLOAT_FIELDS, LogFrame
+from .instrument import stage
+
+# which rows are kept when sources have rows with the same timestamp: the rows
+# of the first or last source having it (in the order given), their mean (limits
+# of any of them), or all rows. Rows sharing a timestamp within one source are
+# samples of their own and always kept.
+CONFLICT_POLICIES = ("first", "last", "mean", "keep")
+
+
+def merge_sources(frames: Sequence[LogFrame], policy: str = "first") -> LogFrame:
+    """
+    Time sorted rows of the time sorted ``frames``, one per source, with the
+    timestamps found in more than one source resolved by ``policy`` (see
+    :data:`CONFLICT_POLICIES`).
+    """
+    if policy not in CONFLICT_POLICIES:
+        raise ValueError(f"unknown conflict policy {policy!r}.")
+    frames = [f for f in frames if len(f)]
+    if len(frames) == 0:
+        return LogFrame.empty()
+    if len(frames) == 1:
+        return frames[0]
+    source = np.repeat(np.arange(len(frames)), [len(f) for f in frames])
+    # rows of a timestamp come in source order, then in their order
+    order = np.argsort(np.concatenate([f.time for f in frames]), kind="stable")
+    frame = LogFrame.concat(frames).take(order)
+    if policy == "keep":
+        return frame
+    source = source[order]
+    new = np.empty(len(frame), dtype=bool)
+    new[0] = True
+    np.not_equal(frame.time[1:], frame.time[:-1], out=new[1:])
+    starts = np.flatnonzero(new)
+    ends = np.append(starts[1:], len(frame))
+    group = np.cumsum(new) - 1
+    first, last = source[starts], source[ends - 1]
+    clash = first != last
+    if not clash.any():
+        return frame
+    if policy == "first":
+        return frame.take(np.flatnonzero(source == first[group]))
+    if policy == "last":
+        return frame.take(np.flatnonzero(source == last[group]))
+    # one mean row for every clashing timestamp
+    sizes = (ends - starts)[clash]
+    means = LogFrame(
+        frame.time[starts[clash]],
+        {
+            name: np.add.reduceat(frame[name], starts)[clash] / sizes
+            for name in FLOAT_FIELDS
+        },
+        np.bitwise_or.reduceat(frame.limits, starts)[clash],
+        frame.limit_names,
+    )
+    return LogFrame.concat([frame.take(np.flatnonzero(~clash[group])), means]).sort()
+
+
+def merge_frames(
+    streams: Iterable[Iterable[LogFrame]], policy: str = "first"
+) -> Iterator[LogFrame]:
+    """
+    k-way merge of streams of time sorted frames into one time sorted stream,
+    timestamps of several streams resolved by ``policy`` (see
+    :func:`merge_sources`).
+
+    Only the pending frame of every stream is held. The rows before the
+    earliest last timestamp of the pending frames can not be preceded by rows
+    still to come, those are merged and yielded, then the streams that ran
+    out of rows are advanced. Memory is O(number of streams) frames, not
+    O(total rows).
+    """
+    if policy not in CONFLICT_POLICIES:
+        raise ValueError(f"unknown conflict policy {policy!r}.")
+    iters: List[Optional[Iterator[LogFrame]]] = [iter(s) for s in streams]
+    pending = [LogFrame.empty() for _ in iters]
+
+    while True:
+        for i, it in enumerate(iters):
+            # advance until the pending rows span more than one timestamp, the
+            # rows of the last one may continue in the next frame
+            while it is not None and (
+                len(pending[i]) == 0 or pending[i].time[0] == pending[i].time[-1]
+            ):
+                frame = next(it, None)
+                if frame is None:
+                    it = iters[i] = None
+                elif len(frame):
+                    pending[i] = LogFrame.concat([pending[i], frame])
+
+        ends = [p.time[-1] for p, it in zip(pending, iters) if it is not None]
+        if ends:
+            bound = min(ends)
+            cuts = [int(np.searchsorted(p.time, bound)) for p in pending]
+        else:
+            cuts = [len(p) for p in pending]
+        ready = [p[:cut] for p, cut in zip(pending, cuts)]
+        pending = [p[cut:] for p, cut in zip(pending, cuts)]
+
+        with stage("merge") as st:
+            merged = merge_sources(ready, policy)
+            st.add(len(merged))
+        if len(merged):
+            yield merged
+        if not ends:
+            return
@@ -1,30 +1,55 @@
 #!/usr/bin/env python
 
 import logging
-from dataclasses import dataclass, field
+import mmap
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import partial
+from itertools import repeat
 from os import PathLike
-from typing import Iterable, List, Optional, Tuple, Union
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
+import numpy as np
+
+from .archive import is_archive, load_archive
+from .cache import LogCache
+from .frame import (  # noqa: F401
+    FLOAT_FIELDS,
+    LIMITS_DTYPE,
+    MAX_LIMITS,
+    TIME_DTYPE,
+    CompactLogLine,
+    LogFrame,
+    LogLine,
+)
+from .index import FileIndex, read_tail
+from .instrument import stage
+from .merge import merge_frames, merge_sources
 from .utils import RE_ISO_DATE, get_files_in_date_range
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
 
-@dataclass
-class LogLine:
-    time: datetime
-    multi: float
-    c0: float
-    clock_mod: float
-    chip_mod: float
-    battery_mw: float
-    cpu_temp: float
-    gpu_mhz: float
-    gpu_temp: float
-    vid: float
-    power: float
-    limits: List[str] = field(default_factory=list)
+# files are read and parsed in blocks of about this many bytes
+READ_BLOCK_SIZE = 1 << 22
+DEFAULT_CHUNK_SIZE = 1 << 16
+# bytes between the rows sampled to read a time range of a file with no index
+PROBE_SIZE = 1 << 16
 
 
 def is_valid_log_file(line: str) -> bool:
@@ -52,45 +77,737 @@ def is_valid_log_file(line: str) -> bool:
     return bool(len(line) > 0 and (("DATE" in line[0]) or RE_ISO_DATE.match(line[0])))
 
 
-def _parse_log_lines(lines: List[str]) -> List[LogLine]:
-    loglines = []
+def _parse_log_lines(lines: List[str]) -> LogFrame:
+    times: List[datetime] = []
+    values: List[List[float]] = []
+    masks: List[int] = []
+    bits: Dict[str, int] = {}
     data = [log.split() for log in lines if "DATE" not in log]
 
     for line in data:
         try:
             # date and time
             dt = datetime.strptime(" ".join(line[:2]), "%Y-%m-%d %H:%M:%S")
+            row = [float(i) for i in line[2:12]]
+            if len(row) != len(FLOAT_FIELDS):
+                raise ValueError(f"expected {len(FLOAT_FIELDS)} values")
             # limits
-            limits = line[12:]
-            loglines.append(LogLine(dt, *[float(i) for i in line[2:12]], limits=limits))
+            mask = 0
+            for lm in line[12:]:
+                mask |= 1 << bits.setdefault(lm, len(bits))
         except Exception:
-            logger.exception("failed to parse line - {line}")
-    logger.debug(f"{len(loglines)} parsed.")
-    return loglines
+            logger.exception(f"failed to parse line - {line}")
+        else:
+            times.append(dt)
+            values.append(row)
+            masks.append(mask)
+    if len(bits) > MAX_LIMITS:
+        raise ValueError(f"at most {MAX_LIMITS} distinct limits are supported.")
 
+    columns = np.array(values, dtype=np.float64).reshape(-1, len(FLOAT_FIELDS))
+    return LogFrame(
+        np.array(times, dtype=TIME_DTYPE),
+        dict(zip(FLOAT_FIELDS, columns.T)),
+        np.array(masks, dtype=LIMITS_DTYPE),
+        tuple(bits),
+    )
 
-def parse_log(
-    files: List[Union[PathLike, str]],
+
+# ``yyyy-mm-dd`` and ``HH:MM:SS`` layouts, None marks a digit
+_DATE_LAYOUT = [None] * 4 + [ord("-")] + [None] * 2 + [ord("-")] + [None] * 2
+_TIME_LAYOUT = [None] * 2 + [ord(":")] + [None] * 2 + [ord(":")] + [None] * 2
+# longest mantissa that is still exact in a float64
+_MAX_DIGITS = 15
+_POW10 = 10.0 ** np.arange(_MAX_DIGITS + 1)
+
+
+def _gather(
+    data: np.ndarray, starts: np.ndarray, lengths: np.ndarray, min_width: int = 1
+) -> np.ndarray:
+    """
+    Copy tokens out of ``data`` into a ``(len(starts), width)`` byte array where
+    width is the longest token (at least ``min_width``), shorter tokens are
+    padded with null bytes.
+    """
+    width = max(int(lengths.max()) if len(lengths) else 0, min_width)
+    padded = len(lengths) and lengths.min() < width
+    out = np.empty((len(starts), width), dtype=np.uint8)
+    for c in range(width):
+        if padded:
+            out[:, c] = data[np.minimum(starts + c, len(data) - 1)]
+            out[lengths <= c, c] = 0
+        else:
+            out[:, c] = data[starts + c]
+    return out
+
+
+def _match_layout(chars: np.ndarray, layout: List[Optional[int]]) -> np.ndarray:
+    ok = np.ones(len(chars), dtype=bool)
+    for i, c in enumerate(layout):
+        if c is None:
+            ok &= (chars[:, i] >= ord("0")) & (chars[:, i] <= ord("9"))
+        else:
+            ok &= chars[:, i] == c
+    return ok
+
+
+def _digits(chars: np.ndarray, start: int, stop: int) -> np.ndarray:
+    value = np.zeros(len(chars), dtype=np.int64)
+    for i in range(start, stop):
+        value = value * 10 + (chars[:, i].astype(np.int64) - ord("0"))
+    return value
+
+
+def _to_datetime64(
+    dates: np.ndarray, times: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert ``yyyy-mm-dd`` and ``HH:MM:SS`` byte rows to ``datetime64[s]``,
+    also returns the mask of rows holding a real calendar date and time.
+    """
+    year, month, day = _digits(dates, 0, 4), _digits(dates, 5, 7), _digits(dates, 8, 10)
+    hour, minute, sec = _digits(times, 0, 2), _digits(times, 3, 5), _digits(times, 6, 8)
+
+    ok = (month >= 1) & (month <= 12) & (day >= 1)
+    ok &= (hour < 24) & (minute < 60) & (sec < 60)
+    months = ((year - 1970) * 12 + np.clip(month, 1, 12) - 1).astype("datetime64[M]")
+    first_day = months.astype("datetime64[D]")
+    ok &= day <= ((months + 1).astype("datetime64[D]") - first_day).astype(np.int64)
+
+    seconds = hour * 3600 + minute * 60 + sec
+    stamp = (first_day + (day - 1)).astype(TIME_DTYPE) + seconds.astype("m8[s]")
+    return stamp, ok
+
+
+def _to_float64(
+    data: np.ndarray, starts: np.ndarray, lengths: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode number tokens, returns the values and the mask of valid tokens.
+
+    Plain decimals (``12.345``) are decoded from their bytes, one batch per
+    token length: the digits give an exact integer mantissa which is divided
+    by a power of ten, so it rounds exactly like :func:`float` does. Anything
+    else (signs, exponents, ``nan``) goes through :func:`float` itself.
+    """
+    values = np.zeros(len(starts))
+    ok = np.ones(len(starts), dtype=bool)
+    for width in np.flatnonzero(np.bincount(lengths)).tolist():
+        idx = np.flatnonzero(lengths == width)
+        if width <= _MAX_DIGITS:
+            pos = starts[idx]
+            plain = np.ones(len(idx), dtype=bool)
+            n_dots = np.zeros(len(idx), dtype=np.int64)
+            dot = np.zeros(len(idx), dtype=np.int64)
+            mantissa = np.zeros(len(idx), dtype=np.int64)
+            for c in range(width):
+                char = data[pos]
+                pos += 1
+                digit = char - np.uint8(ord("0"))
+                is_digit = digit < 10
+                is_dot = char == ord(".")
+                plain &= is_digit | is_dot
+                n_dots += is_dot
+                dot += is_dot * c
+                digit *= is_digit
+                # the dot does not shift the mantissa
+                mantissa *= np.uint8(10) - is_dot * np.uint8(9)
+                mantissa += digit
+            plain &= (n_dots <= 1) & (n_dots < width)
+            # tokens with several dots go to float() below, their scale is unused
+            decimals = np.where(plain & (n_dots == 1), width - 1 - dot, 0)
+            values[idx] = mantissa / _POW10[decimals]
+            idx = idx[~plain]
+        for i in idx.tolist():
+            try:
+                values[i] = float(data[starts[i] : starts[i] + width].tobytes())
+            except ValueError:
+                ok[i] = False
+    return values, ok
+
+
+def _parse_buffer(buf: Union[bytes, bytearray, memoryview, np.ndarray]) -> LogFrame:
+    """
+    Parse a whole log file buffer into a :class:`LogFrame` in one pass.
+
+    Lines are tokenized with NumPy over the raw bytes, dates and numbers are
+    decoded in batch from the token bytes. Lines not matching the regular
+    layout (headers, corrupted rows, exponents, ...) are decoded and handed to
+    :func:`_parse_log_lines`.
+    """
+    return _parse_rows(buf)[0]
+
+
+def _parse_rows(
+    buf: Union[bytes, bytearray, memoryview, np.ndarray],
+) -> Tuple[LogFrame, np.ndarray]:
+    """
+    :func:`_parse_buffer`, also returns the byte offset of the line of every row.
+    """
+    data = np.frombuffer(buf, dtype=np.uint8)
+    if len(data) == 0:
+        return LogFrame.empty(), np.empty(0, dtype=np.int64)
+    width = 2 + len(FLOAT_FIELDS)
+
+    # line and token boundaries, anything up to ' ' counts as whitespace
+    line_ends = np.flatnonzero(data == ord("\n"))
+    if len(line_ends) == 0 or line_ends[-1] != len(data) - 1:
+        line_ends = np.append(line_ends, len(data))
+    line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+    space = data <= ord(" ")
+    edges = np.flatnonzero(space[1:] != space[:-1]) + 1
+    if not space[0]:
+        edges = np.concatenate(([0], edges))
+    if not space[-1]:
+        edges = np.append(edges, len(data))
+    del space
+    tok_start = edges[0::2]
+    tok_len = edges[1::2] - tok_start
+    first_tok = np.searchsorted(tok_start, line_starts)
+    n_tok = np.diff(first_tok, append=len(tok_start))
+
+    # lines with a regular "date time 10*number [limits]" layout
+    lines = np.flatnonzero(n_tok >= width)
+    t0 = first_tok[lines]
+    ok = (tok_len[t0] == len(_DATE_LAYOUT)) & (tok_len[t0 + 1] == len(_TIME_LAYOUT))
+    lines, t0 = lines[ok], t0[ok]
+    # widths also hold when there are no such lines, e.g. a header only block
+    dates = _gather(data, tok_start[t0], tok_len[t0], len(_DATE_LAYOUT))
+    times = _gather(data, tok_start[t0 + 1], tok_len[t0 + 1], len(_TIME_LAYOUT))
+    stamps, ok = _to_datetime64(dates, times)
+    ok &= _match_layout(dates, _DATE_LAYOUT) & _match_layout(times, _TIME_LAYOUT)
+
+    num_tok = (t0[:, None] + np.arange(2, width)).ravel()
+    values, num_ok = _to_float64(data, tok_start[num_tok], tok_len[num_tok])
+    values = values.reshape(len(t0), len(FLOAT_FIELDS))
+    ok[np.flatnonzero(~num_ok) // len(FLOAT_FIELDS)] = False
+    lines, t0, stamps, values = lines[ok], t0[ok], stamps[ok], values[ok]
+
+    # limit tokens, bit codes are given in order of first appearance
+    n_limits = n_tok[lines] - width
+    masks = np.zeros(len(lines), dtype=LIMITS_DTYPE)
+    limit_names: Tuple[str, ...] = ()
+    has_limits = np.flatnonzero(n_limits > 0)
+    if len(has_limits):
+        counts = n_limits[has_limits]
+        group = np.cumsum(counts) - counts
+        lm_tok = np.repeat(t0[has_limits] + width - group, counts)
+        lm_tok += np.arange(len(lm_tok))
+        lm_chars = _gather(data, tok_start[lm_tok], tok_len[lm_tok])
+        lm_strings = lm_chars.view(f"S{lm_chars.shape[1]}").ravel()
+        uniq, first, inverse = np.unique(
+            lm_strings, return_index=True, return_inverse=True
+        )
+        if len(uniq) > MAX_LIMITS:
+            raise ValueError(f"at most {MAX_LIMITS} distinct limits are supported.")
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        limit_names = tuple(
+            bytes(u).decode("utf-8", errors="ignore") for u in uniq[order]
+        )
+        bits = np.left_shift(
+            LIMITS_DTYPE(1), rank[inverse.ravel()].astype(LIMITS_DTYPE)
+        )
+        masks[has_limits] = np.bitwise_or.reduceat(bits, group)
+
+    frame = LogFrame(stamps, dict(zip(FLOAT_FIELDS, values.T)), masks, limit_names)
+
+    # everything else goes through the per line parser
+    irregular = n_tok > 0
+    irregular[lines] = False
+    if not irregular.any():
+        return frame, line_starts[lines]
+    parsed_lines = [lines]
+    parsed = [frame]
+    for i in np.flatnonzero(irregular).tolist():
+        raw = data[line_starts[i] : line_ends[i]].tobytes()
+        row = _parse_log_lines([raw.decode("utf-8", errors="ignore")])
+        if len(row):
+            parsed_lines.append(np.array([i]))
+            parsed.append(row)
+    if len(parsed) == 1:
+        return frame, line_starts[lines]
+    parsed_lines = np.concatenate(parsed_lines)
+    order = np.argsort(parsed_lines, kind="stable")
+    return LogFrame.concat(parsed).take(order), line_starts[parsed_lines[order]]
+
+
+def _parse_blocks(
+    file_path: Union[PathLike, str], block_size: int
+) -> Iterator[LogFrame]:
+    """
+    Parse a log file lazily in blocks of about ``block_size`` bytes, every block
+    ends on a line boundary. The file is memory mapped and blocks are parsed
+    in place, without reading or copying them. Files not looking like a log
+    yield nothing.
+    """
+    for frame, _ in _parse_range(file_path, block_size):
+        yield frame
+
+
+def _parse_range(
+    file_path: Union[PathLike, str],
+    block_size: int,
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> Iterator[Tuple[LogFrame, np.ndarray]]:
+    """
+    :func:`_parse_blocks` over the bytes ``start:stop`` of the file, which must
+    start on a line, also yields the file offset of the line of every row.
+    """
+    with open(file_path, "rb") as fp:
+        if not is_valid_log_file(fp.readline().decode("utf-8", errors="ignore")):
+            logger.debug(f"ignoring {file_path}")
+            return
+        mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    # the kernel may drop pages once parsed, keeping the resident size bounded
+    # by a block (madvise is missing on some platforms)
+    madvise = getattr(mm, "madvise", None)
+    if madvise and hasattr(mmap, "MADV_SEQUENTIAL"):
+        madvise(mmap.MADV_SEQUENTIAL)
+    data = np.frombuffer(mm, dtype=np.uint8)
+    stop = len(data) if stop is None else min(stop, len(data))
+    while start < stop:
+        end = start + block_size
+        if end < stop:
+            # cut after the last line end, or the next one for a huge line
+            cut = mm.rfind(b"\n", start, end)
+            if cut < 0:
+                cut = mm.find(b"\n", end, stop)
+            end = cut + 1 if cut >= 0 else stop
+        else:
+            end = stop
+        with stage("parse") as st:
+            frame, offsets = _parse_rows(data[start:end])
+            st.add(len(frame), end - start)
+        yield frame, offsets + start
+        if madvise and hasattr(mmap, "MADV_DONTNEED"):
+            madvise(mmap.MADV_DONTNEED, 0, end - end % mmap.PAGESIZE)
+        start = end
+    # parsed frames never point into the mapping, so it can go right away
+    del data
+    try:
+        mm.close()
+    except BufferError:
+        # a logged parse error keeps the frames of the parser, and their views
+        # of the mapping, alive; it is then unmapped once they are released
+        pass
+
+
+def _parse_indexing(
+    file_path: Union[PathLike, str],
+    cache: LogCache,
+    index: FileIndex,
+    frames: Optional[List[LogFrame]] = None,
+) -> Iterator[LogFrame]:
+    """
+    Parse the bytes of a file after the part covered by ``index`` and store the
+    index extended with their complete lines, the parsed frames are also added
+    to ``frames`` if given.
+    """
+    size = os.stat(file_path).st_size
+    times, offsets = [], []
+    for frame, row_offsets in _parse_range(file_path, READ_BLOCK_SIZE, index.size):
+        times.append(frame.time)
+        offsets.append(row_offsets)
+        if frames is not None:
+            frames.append(frame)
+        yield frame
+    covered, tail = read_tail(file_path, size)
+    if covered <= index.size:
+        return
+    offsets = np.concatenate(offsets or [np.empty(0, dtype=np.int64)])
+    complete = offsets < covered
+    times = np.concatenate(times or [np.empty(0, dtype=TIME_DTYPE)])[complete]
+    cache.put_index(file_path, index.extend(times, offsets[complete], covered, tail))
+
+
+def _probe_index(file_path: Union[PathLike, str]) -> Optional[FileIndex]:
+    """
+    :class:`FileIndex` of the rows found every ``PROBE_SIZE`` bytes of a file,
+    for a time range to be read without a cached index. None for files too
+    small to gain from it, or when the rows found are not in time order.
+    """
+    size = os.path.getsize(file_path)
+    if size < 4 * PROBE_SIZE:
+        return None
+    times, offsets = [], []
+    with open(file_path, "rb") as fp:
+        first = fp.readline()
+        if not is_valid_log_file(first.decode("utf-8", errors="ignore")):
+            return None
+        # the first row is on the first line, or on the one after the header
+        starts = [0 if len(_parse_rows(first)[0]) else len(first)]
+        for pos in range(PROBE_SIZE, size, PROBE_SIZE):
+            # the first line starting at or after pos
+            fp.seek(pos - 1)
+            fp.readline()
+            starts.append(fp.tell())
+        for offset in starts:
+            fp.seek(offset)
+            frame, _ = _parse_rows(fp.readline())
+            if len(frame):
+                times.append(frame.time[0])
+                offsets.append(offset)
+    times = np.array(times, dtype=TIME_DTYPE)
+    if len(times) == 0 or np.any(times[1:] < times[:-1]):
+        return None
+    return FileIndex(times, np.array(offsets), size, times[-1], True, b"")
+
+
+def _iter_file_frames(
+    file_path: Union[PathLike, str],
+    cache: Optional[LogCache],
     date_range: Optional[Tuple[datetime, datetime]] = None,
-) -> List[LogLine]:
-    lines = []
+) -> Iterator[LogFrame]:
+    if is_archive(file_path):
+        with stage("archive") as st:
+            try:
+                frame = load_archive(file_path)
+            except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+                # other .npz files, e.g. of a cache dir within the logs
+                logger.debug(f"ignoring {file_path}, not a tslogs archive")
+                return
+            st.add(len(frame), os.path.getsize(file_path))
+        yield frame
+        return
+
+    if date_range:
+        with stage("index"):
+            if cache is not None:
+                index = cache.get_index(file_path)
+            else:
+                index = _probe_index(file_path)
+        if index is not None and index.monotonic:
+            # only the indexed bytes in range and the bytes added since
+            lo, hi = index.byte_range(*date_range)
+            logger.debug(f"reading bytes {lo}:{hi} of {str(file_path)} by index")
+            if lo < hi:
+                for frame, _ in _parse_range(file_path, READ_BLOCK_SIZE, lo, hi):
+                    yield frame
+            if cache is not None:
+                yield from _parse_indexing(file_path, cache, index)
+            return
+    if cache is None:
+        yield from _parse_blocks(file_path, READ_BLOCK_SIZE)
+        return
+
+    with stage("cache") as st:
+        cached = cache.get(file_path)
+        st.add(len(cached) if cached is not None else 0)
+    if cached is not None:
+        logger.debug(f"cache hit for {str(file_path)}")
+        yield cached
+        return
+    # stat before reading, a file still being written is parsed again next time
+    stat = os.stat(file_path)
+    frames: List[LogFrame] = []
+    yield from _parse_indexing(file_path, cache, FileIndex.empty(), frames)
+    cache.put(file_path, LogFrame.concat(frames), stat)
+
+
+def iter_frames(
+    files: Iterable[Union[PathLike, str]],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+    cache: Optional[LogCache] = None,
+) -> Iterator[LogFrame]:
+    """
+    Parse ``files`` one block at a time, yielding the rows of each block that
+    fall in ``date_range`` as a :class:`LogFrame`. Files are only read around
+    ``date_range`` if their index, cached or else sampled, allows it. With a
+    ``cache`` unchanged files are loaded from it instead and files read in
+    full are stored in it.
+    """
     for file_path in files:
         logger.debug(f"loading file {str(file_path)}")
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as fp:
-            if is_valid_log_file(fp.readline()):
-                fp.seek(0)
-                lines += fp.readlines()
-            else:
-                logger.debug(f"ignoring {file_path}")
+        for frame in _iter_file_frames(file_path, cache, date_range):
+            if date_range:
+                with stage("filter") as st:
+                    st.add(len(frame))
+                    frame = frame.between(*date_range)
+            if len(frame):
+                yield frame
 
-    parsed = _parse_log_lines(lines)
-    if date_range:
-        parsed = [p for p in parsed if date_range[0] <= p.time < date_range[1]]
+
+def _rebatch(frames: Iterable[LogFrame], size: int) -> Iterator[LogFrame]:
+    pending: List[LogFrame] = []
+    count = 0
+    for frame in frames:
+        while len(frame):
+            part, frame = frame[: size - count], frame[size - count :]
+            pending.append(part)
+            count += len(part)
+            if count == size:
+                yield LogFrame.concat(pending)
+                pending, count = [], 0
+    if pending:
+        yield LogFrame.concat(pending)
+
+
+def iter_log_chunks(
+    paths: Iterable[Union[str, PathLike]],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache: Optional[LogCache] = None,
+    on_conflict: Optional[str] = None,
+) -> Iterator[LogFrame]:
+    """
+    Lazily load logs as :class:`LogFrame` batches of at most ``chunk_size``
+    rows. Files are read and parsed incrementally so memory use is bounded by
+    a chunk, not by the size of the logs. Rows come in file order, or merged
+    in time order with an ``on_conflict`` policy (see
+    :func:`iter_merged_frames`).
+    """
+    if chunk_size <= 0:
+        raise ValueError("'chunk_size' must be positive.")
+    if on_conflict is not None:
+        frames = iter_merged_frames(paths, date_range, on_conflict, cache)
+    else:
+        files = get_files_in_date_range(paths, date_range, cache)
+        frames = iter_frames(files, date_range, cache)
+    yield from _rebatch(frames, chunk_size)
+
+
+def iter_logs(
+    paths: Iterable[Union[str, PathLike]],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+    compact: bool = False,
+) -> Iterator[LogLine]:
+    """
+    Lazily load logs one :class:`LogLine` at a time, or one
+    :class:`~tslogs.frame.CompactLogLine` if ``compact``.
+    """
+    for chunk in iter_log_chunks(paths, date_range):
+        yield from chunk.iter_rows(compact)
+
+
+def map_files(
+    func: Callable[[Union[PathLike, str], Optional[Tuple[datetime, datetime]]], T],
+    files: List[Union[PathLike, str]],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+    workers: Optional[int] = None,
+) -> List[T]:
+    """
+    Call ``func(file, date_range)`` for every file, in a pool of ``workers``
+    processes when it is more than 1 (0 means one per CPU). ``func`` must be
+    picklable and its results are returned in the order of ``files``.
+    """
+    if workers is not None and workers <= 0:
+        workers = os.cpu_count() or 1
+    if not workers or workers == 1 or len(files) <= 1:
+        return [func(f, date_range) for f in files]
+    # the stages of the workers are not seen here, only the time waiting on them
+    with stage("workers"), ProcessPoolExecutor(
+        max_workers=min(workers, len(files))
+    ) as pool:
+        return list(pool.map(func, files, repeat(date_range)))
+
+
+def _parse_file(
+    file_path: Union[PathLike, str],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+    cache: Optional[LogCache] = None,
+) -> LogFrame:
+    return LogFrame.concat(list(iter_frames([file_path], date_range, cache)))
+
+
+def parse_log(
+    files: List[Union[PathLike, str]],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+    workers: Optional[int] = None,
+    cache: Optional[LogCache] = None,
+    on_conflict: Optional[str] = None,
+) -> LogFrame:
+    """
+    Parse ``files`` into a single frame, see :func:`map_files` for ``workers``.
+    Every file is parsed on its own and the results are joined in time order.
+    Parsed files are kept in and reused from ``cache`` if given. With an
+    ``on_conflict`` policy every file is a source of
+    :func:`tslogs.merge.merge_sources`, the order of ``files`` deciding ties.
+    """
+    sources = [list(files)] if on_conflict is None else [[f] for f in files]
+    return _parse_sources(sources, date_range, workers, cache, on_conflict)
+
+
+def _parse_sources(
+    sources: List[List[Union[PathLike, str]]],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+    workers: Optional[int] = None,
+    cache: Optional[LogCache] = None,
+    on_conflict: Optional[str] = None,
+) -> LogFrame:
+    parse_file = partial(_parse_file, cache=cache)
+    files = [f for source in sources for f in source]
+    frames = map_files(parse_file, files, date_range, workers)
+    with stage("sort") as st:
+        if on_conflict is None:
+            # files may overlap or jump back in time (clock changes)
+            frames = [f for f in frames if len(f)]
+            frames.sort(key=lambda f: f.time[0])
+            parsed = LogFrame.concat(frames).sort()
+        else:
+            bounds = np.cumsum([0] + [len(source) for source in sources])
+            parsed = merge_sources(
+                [
+                    LogFrame.concat(frames[lo:hi]).sort()
+                    for lo, hi in zip(bounds[:-1], bounds[1:])
+                ],
+                on_conflict,
+            )
+        st.add(len(parsed))
+    logger.debug(f"{len(parsed)} parsed.")
     return parsed
 
 
 def load_files(
     paths: Iterable[Union[str, PathLike]],
     date_range: Optional[Tuple[datetime, datetime]] = None,
-) -> List[LogLine]:
-    return parse_log(get_files_in_date_range(paths, date_range), date_range)
+    workers: Optional[int] = None,
+    cache: Optional[LogCache] = None,
+    on_conflict: Optional[str] = None,
+) -> LogFrame:
+    """
+    :func:`parse_log` of the files of ``paths``, with an ``on_conflict`` policy
+    every path is a source of :func:`tslogs.merge.merge_sources`.
+    """
+    if on_conflict is None:
+        files = get_files_in_date_range(paths, date_range, cache)
+        return parse_log(files, date_range, workers, cache)
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+    sources = [get_files_in_date_range([p], date_range, cache) for p in paths]
+    return _parse_sources(sources, date_range, workers, cache, on_conflict)
+
+
+def _source_frames(
+    files: Iterable[Union[PathLike, str]],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+    cache: Optional[LogCache] = None,
+) -> Iterator[LogFrame]:
+    """
+    Time sorted frames of the files of one source, a file at a time. Files
+    overlapping the one before (clock changes) are sorted into it.
+    """
+    previous = LogFrame.empty()
+    for file_path in files:
+        frame = _parse_file(file_path, date_range, cache).sort()
+        if len(frame) == 0:
+            continue
+        if len(previous) and frame.time[0] < previous.time[-1]:
+            frame = LogFrame.concat([previous, frame]).sort()
+        elif len(previous):
+            yield previous
+        previous = frame
+    if len(previous):
+        yield previous
+
+
+def iter_merged_frames(
+    paths: Iterable[Union[str, PathLike]],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+    on_conflict: str = "first",
+    cache: Optional[LogCache] = None,
+) -> Iterator[LogFrame]:
+    """
+    Logs of possibly overlapping ``paths`` (e.g. copies of the same log dir)
+    as one time sorted stream of frames, every path is a source and rows with
+    the same timestamp are resolved by the ``on_conflict`` policy, see
+    :func:`tslogs.merge.merge_frames`. About one file per path is held in
+    memory at a time.
+    """
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+    sources = [
+        _source_frames(
+            get_files_in_date_range([p], date_range, cache), date_range, cache
+        )
+        for p in paths
+    ]
+    yield from merge_frames(sources, on_conflict)
+
+
+class LogTailer:
+    """
+    Follow a log that is still being written, every :meth:`poll` parses only the
+    complete lines appended since the previous one.
+
+    ``path`` is a log file or a log dir. For a dir the newest ``yyyy-mm-dd``
+    file is followed and once the next day's file shows up the rest of the old
+    one is read and the tailer moves on. A followed file that is replaced or
+    truncated is read again from the start. Unless ``from_start`` is set the
+    lines already in the file are skipped.
+    """
+
+    # how far back to look for the last line end when skipping existing lines
+    TAIL_SCAN_SIZE = 1 << 16
+
+    def __init__(self, path: Union[str, PathLike], from_start: bool = False):
+        self.path = Path(path)
+        self.file: Optional[Path] = self._latest_file()
+        self.offset = 0
+        self._inode: Optional[int] = None
+        if self.file is not None and not from_start:
+            self._skip_to_end()
+
+    def _latest_file(self) -> Optional[Path]:
+        if not self.path.is_dir():
+            return self.path if self.path.is_file() else None
+        logs = [
+            f for f in self.path.iterdir() if f.is_file() and RE_ISO_DATE.match(f.name)
+        ]
+        return max(logs, key=lambda f: f.name, default=None)
+
+    def _skip_to_end(self) -> None:
+        with open(self.file, "rb") as fp:
+            stat = os.fstat(fp.fileno())
+            start = max(stat.st_size - self.TAIL_SCAN_SIZE, 0)
+            fp.seek(start)
+            # leave a partial last line to be parsed once it is complete
+            self.offset = start + fp.read().rfind(b"\n") + 1
+            self._inode = stat.st_ino
+
+    def _read(self, final: bool = False) -> LogFrame:
+        try:
+            with open(self.file, "rb") as fp:
+                stat = os.fstat(fp.fileno())
+                if self._inode is not None and (
+                    stat.st_ino != self._inode or stat.st_size < self.offset
+                ):
+                    logger.debug(f"{str(self.file)} was replaced, reading it again")
+                    self.offset = 0
+                self._inode = stat.st_ino
+                fp.seek(self.offset)
+                data = fp.read()
+        except FileNotFoundError:
+            return LogFrame.empty()
+        cut = len(data) if final else data.rfind(b"\n") + 1
+        self.offset += cut
+        return _parse_buffer(data[:cut])
+
+    def poll(self) -> LogFrame:
+        """
+        Parse the lines appended since the last call, in file order.
+        """
+        frames = []
+        latest = self._latest_file()
+        if latest is not None and (self.file is None or latest.name > self.file.name):
+            if self.file is not None:
+                # the old file is done, its last line will not get a line end
+                frames.append(self._read(final=True))
+                logger.debug(f"following {str(latest)}")
+            self.file, self.offset, self._inode = latest, 0, None
+        if self.file is not None:
+            frames.append(self._read())
+        return LogFrame.concat(frames)
+
+    def follow(self, interval: float = 1.0) -> Iterator[LogFrame]:
+        """
+        Poll forever, waiting ``interval`` seconds whenever there is nothing new.
+        """
+        while True:
+            frame = self.poll()
+            if len(frame):
+                yield frame
+            else:
+                time.sleep(interval)
@@ -0,0 +1,67 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .frame import TIME_DTYPE, LogFrame
+
+
+def _mean(col: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    return np.add.reduceat(col, starts) / (ends - starts)
+
+
+def _last(col: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    return col[ends - 1]
+
+
+# reduce the rows ``starts[i]:ends[i]`` of a column, one value per bucket
+REDUCERS: Dict[str, Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray]] = {
+    "mean": _mean,
+    "max": lambda col, starts, ends: np.maximum.reduceat(col, starts),
+    "min": lambda col, starts, ends: np.minimum.reduceat(col, starts),
+    "last": _last,
+}
+
+
+def bucket_index(time: np.ndarray, start: np.datetime64, interval: int) -> np.ndarray:
+    """Index of the ``interval`` seconds bucket every time falls in."""
+    return (time - start).astype(np.int64) // interval
+
+
+def resample(
+    frame: LogFrame,
+    names: List[str],
+    interval: int,
+    reducer: str = "mean",
+    start: Optional[np.datetime64] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Aggregate the ``names`` columns of ``frame`` into buckets of ``interval``
+    seconds from ``start`` (default: the first time), combining the samples
+    of a bucket with ``reducer`` (one of :data:`REDUCERS`).
+
+    Returns the bucket start times and a ``(len(names), buckets)`` array,
+    buckets without samples are NaN.
+    """
+    if interval <= 0:
+        raise ValueError("'interval' must be positive.")
+    if reducer not in REDUCERS:
+        raise ValueError(f"unknown reducer {reducer!r}, use one of {list(REDUCERS)}")
+    frame = frame.sort()
+    if start is not None and len(frame) and frame.time[0] < start:
+        frame = frame.take(frame.time >= start)
+    if len(frame) == 0:
+        return np.empty(0, dtype=TIME_DTYPE), np.empty((len(names), 0))
+    if start is None:
+        start = frame.time[0]
+
+    idx = bucket_index(frame.time, start, interval)
+    n_buckets = int(idx[-1]) + 1
+    times = start + np.arange(n_buckets) * np.timedelta64(interval, "s")
+    out = np.full((len(names), n_buckets), np.nan)
+    # rows are time sorted, so every bucket is a contiguous run of rows
+    starts = np.flatnonzero(np.diff(idx, prepend=-1))
+    ends = np.append(starts[1:], len(idx))
+    reduce = REDUCERS[reducer]
+    for i, name in enumerate(names):
+        out[i, idx[starts]] = reduce(frame[name], starts, ends)
+    return times, out
@@ -0,0 +1,143 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# columns summarised by quantiles and histograms, and the quantiles reported
+DISTRIBUTION_FIELDS = ("cpu_temp", "power", "multi", "c0")
+QUANTILES = (0.5, 0.95, 0.99)
+# fixed histogram bins of every column: lowest edge, highest edge, bin count
+HISTOGRAM_BINS: Dict[str, Tuple[float, float, int]] = {
+    "cpu_temp": (0, 110, 110),
+    "power": (0, 150, 75),
+    "multi": (0, 60, 60),
+    "c0": (0, 100, 50),
+}
+DEFAULT_COMPRESSION = 200
+
+
+class TDigest:
+    """
+    Mergeable streaming quantile sketch (merging t-digest).
+
+    Values are summarised by at most about ``compression / 2`` weighted
+    centroids, small near the tails and larger around the median, so
+    extreme quantiles stay accurate while memory stays bounded however many
+    values are added. Added values are buffered and merged in batches, each
+    merge is one sort and a grouped reduction.
+    """
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+        self._pending: List[np.ndarray] = []
+        self._pending_count = 0
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum()) + self._pending_count
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._pending.append(values)
+        self._pending_count += len(values)
+        if self._pending_count >= 10 * self.compression:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        other._compress()
+        if len(other.means):
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress(other.means, other.weights)
+        return self
+
+    def _compress(
+        self, means: Optional[np.ndarray] = None, weights: Optional[np.ndarray] = None
+    ) -> None:
+        """Merge the buffered values and the given centroids into the digest."""
+        if not self._pending and means is None:
+            return
+        pending = np.concatenate([np.empty(0), *self._pending])
+        means = np.concatenate((self.means, pending, [] if means is None else means))
+        weights = np.concatenate(
+            (self.weights, np.ones(len(pending)), [] if weights is None else weights)
+        )
+        self._pending, self._pending_count = [], 0
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        # k1 scale function, a centroid covers at most one unit of k
+        cum = np.cumsum(weights)
+        q_left = (cum - weights) / cum[-1]
+        k = self.compression / (2 * math.pi) * np.arcsin(2 * q_left - 1)
+        cluster = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.diff(cluster, prepend=-1))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q: float) -> float:
+        """Estimated ``q`` quantile, NaN when the digest is empty."""
+        self._compress()
+        if len(self.means) == 0:
+            return math.nan
+        # centroids sit at the middle of their weight, the extremes are exact
+        total = float(self.weights.sum())
+        mids = np.cumsum(self.weights) - self.weights / 2
+        return float(
+            np.interp(
+                q * total,
+                np.concatenate(([0.0], mids, [total])),
+                np.concatenate(([self.min], self.means, [self.max])),
+            )
+        )
+
+    def quantiles(self, qs: Tuple[float, ...] = QUANTILES) -> Dict[float, float]:
+        return {q: self.quantile(q) for q in qs}
+
+
+class Histogram:
+    """
+    Counts of values in ``bins`` equal width bins from ``lo`` to ``hi``, values
+    out of that range are counted ``below`` or ``above`` it. Merging adds the
+    counts, so the bins must match.
+    """
+
+    def __init__(self, lo: float, hi: float, bins: int):
+        self.edges = np.linspace(lo, hi, bins + 1)
+        # below, every bin, above
+        self._counts = np.zeros(bins + 2, dtype=np.int64)
+
+    @property
+    def counts(self) -> np.ndarray:
+        return self._counts[1:-1]
+
+    @property
+    def below(self) -> int:
+        return int(self._counts[0])
+
+    @property
+    def above(self) -> int:
+        return int(self._counts[-1])
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        idx = np.searchsorted(self.edges, values, side="right")
+        # the highest edge closes the last bin
+        idx[values == self.edges[-1]] = len(self.edges) - 1
+        self._counts += np.bincount(idx, minlength=len(self._counts))
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("cannot merge histograms with different bins.")
+        self._counts += other._counts
+        return self
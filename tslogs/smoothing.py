@@ -0,0 +1,102 @@
+import math
+from typing import Callable, Dict
+
+import numpy as np
+
+# rows of a (rows, window) median batch, bounds the temporary copy
+_MEDIAN_BATCH = 1 << 20
+
+
+def _window_sums(values: np.ndarray, span: int) -> np.ndarray:
+    """Sums over ``[i - span, i + span]`` clipped to the array, from a cumsum."""
+    cs = np.concatenate(([0.0], np.cumsum(values)))
+    i = np.arange(len(values))
+    return cs[np.minimum(i + span + 1, len(values))] - cs[np.maximum(i - span, 0)]
+
+
+def boxcar(arr: np.ndarray, span: int) -> np.ndarray:
+    """
+    Mean over a centered window of ``2 * span + 1`` samples, the window shrinks
+    at the edges. NaN samples are left out of the windows and stay NaN, so a
+    gap does not spread into its neighbours. O(n) whatever the span.
+    """
+    arr = np.asarray(arr, dtype=np.float64)
+    valid = ~np.isnan(arr)
+    sums = _window_sums(np.where(valid, arr, 0.0), span)
+    counts = _window_sums(valid.astype(np.float64), span)
+    out = np.full(len(arr), np.nan)
+    np.divide(sums, counts, out=out, where=valid)
+    return out
+
+
+def ewma(arr: np.ndarray, span: int) -> np.ndarray:
+    """
+    Exponentially weighted mean with the decay of a ``2 * span + 1`` samples
+    window (``alpha = 1 / (span + 1)``). NaN samples carry no weight and stay
+    NaN. O(n): the recurrence is solved in closed form over blocks short
+    enough for the powers of the decay to stay well within float range.
+    """
+    arr = np.asarray(arr, dtype=np.float64)
+    valid = ~np.isnan(arr)
+    decay = 1 - 1 / (span + 1)
+    # decay ** -block stays below 1e12
+    block = max(1, min(len(arr), int(12 * math.log(10) / -math.log(decay))))
+    powers = decay ** -np.arange(block, dtype=np.float64)
+
+    # weighted sums and weights, z[t] = decay * z[t - 1] + u[t]
+    num = np.where(valid, arr, 0.0)
+    den = valid.astype(np.float64)
+    carry_num = carry_den = 0.0
+    for start in range(0, len(arr), block):
+        p = powers[: min(block, len(arr) - start)]
+        seg = slice(start, start + len(p))
+        # z[j] = decay ** j * (sum(u[k] * decay ** -k, k <= j) + decay * carry)
+        num[seg] = (np.cumsum(num[seg] * p) + carry_num * decay) / p
+        den[seg] = (np.cumsum(den[seg] * p) + carry_den * decay) / p
+        carry_num, carry_den = num[seg.stop - 1], den[seg.stop - 1]
+
+    out = np.full(len(arr), np.nan)
+    np.divide(num, den, out=out, where=valid)
+    return out
+
+
+def median(arr: np.ndarray, span: int) -> np.ndarray:
+    """
+    Median over a centered window of ``2 * span + 1`` samples, ignoring NaN
+    samples, which stay NaN. Robust to spikes but O(n * span * log(span)).
+    """
+    arr = np.asarray(arr, dtype=np.float64)
+    width = 2 * span + 1
+    padded = np.pad(arr, span, constant_values=np.nan)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, width)
+    counts = _window_sums((~np.isnan(arr)).astype(np.float64), span).astype(np.intp)
+    out = np.full(len(arr), np.nan)
+    batch = max(1, _MEDIAN_BATCH // width)
+    for start in range(0, len(arr), batch):
+        # NaN sorts last, the median is in the middle of the first count values
+        ordered = np.sort(windows[start : start + batch], axis=1)
+        rows = np.arange(len(ordered))
+        k = np.maximum(counts[start : start + batch], 1)
+        out[start : start + batch] = (
+            ordered[rows, (k - 1) // 2] + ordered[rows, k // 2]
+        ) / 2
+    out[np.isnan(arr)] = np.nan
+    return out
+
+
+SMOOTHERS: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {
+    "boxcar": boxcar,
+    "ewma": ewma,
+    "median": median,
+}
+
+
+def smooth(arr: np.ndarray, span: int, method: str = "boxcar") -> np.ndarray:
+    """Smooth ``arr`` with one of :data:`SMOOTHERS` over ``span`` samples each side."""
+    if span < 0:
+        raise ValueError("'span' cannot be negative.")
+    if method not in SMOOTHERS:
+        raise ValueError(f"unknown smoothing {method!r}, use one of {list(SMOOTHERS)}")
+    if span == 0 or len(arr) == 0:
+        return np.array(arr, dtype=np.float64)
+    return SMOOTHERS[method](arr, span)
@@ -1,8 +1,31 @@
-from dataclasses import dataclass, fields
+import copy
+import math
+import re
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, Iterable, List, Tuple
+from functools import partial
+from os import PathLike
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
-from tslogs.parse import LogLine
+import numpy as np
+
+from tslogs.cache import LogCache
+from tslogs.frame import FLOAT_FIELDS, LogFrame
+from tslogs.instrument import stage
+from tslogs.parse import LogLine, iter_frames, iter_merged_frames, map_files
+from tslogs.resample import bucket_index
+from tslogs.sketch import DISTRIBUTION_FIELDS, HISTOGRAM_BINS, Histogram, TDigest
+from tslogs.timeline import DEFAULT_GAP, sample_weights, sampling_interval, step_counts
+from tslogs.utils import get_files_in_date_range
+
+# rows of StatsAccumulator.update are added this many at a time
+UPDATE_BATCH_SIZE = 1 << 12
+# rollup periods start on a monday at midnight (utc), like the weeks
+ROLLUP_ORIGIN = np.datetime64("1970-01-05T00:00:00", "s")
+ROLLUP_UNITS = {"s": 1, "min": 60, "h": 3600, "d": 86400, "w": 604800}
+# names accepted for common frequencies, e.g. by --group-by
+ROLLUP_PERIODS = {"hour": "1h", "day": "1d", "week": "1w"}
+_RE_FREQ = re.compile(r"(\d*)\s*(" + "|".join(ROLLUP_UNITS) + r")")
 
 
 @dataclass
@@ -12,6 +35,27 @@ class LimitStat:
     percent_time: float
 
 
+@dataclass
+class HistogramStat:
+    edges: List[float]
+    counts: List[int]
+    below: int
+    above: int
+
+
+@dataclass
+class TimelineStat:
+    # most common step between rows, in seconds
+    interval: int
+    samples: int
+    # rows sharing their timestamp with the previous row
+    duplicates: int
+    gaps: int
+    gap_time: timedelta
+    # percent of the time range covered by logs
+    coverage: float
+
+
 @dataclass
 class LogStats:
     time_range: Tuple[datetime, datetime]
@@ -34,70 +78,441 @@ class LogStats:
 
     limits: List[LimitStat]
 
+    timeline: Optional[TimelineStat] = None
+    # of DISTRIBUTION_FIELDS, only when asked for
+    quantiles: Optional[Dict[str, Dict[float, float]]] = None
+    histograms: Optional[Dict[str, HistogramStat]] = None
 
-def _get_limits_elasped(loglines: Iterable[LogLine], total_sec: int) -> List[LimitStat]:
-    # limits_dict: Dict[str, datetime] = {}
-    # for line in loglines:
-    #     if len(line.limits) > 0:
-    #         for lm in line.limits:
-    #             if not limits_dict.get(lm):
-    #                 limits_dict[lm] = []
-    #             limits_dict[lm].append(line.time)
-
-    # limit_stats: List[LimitsStat] = []
-    # for lm, times in limits_dict.items():
-    #     limit_stats.append(LimitsStat(lm, (max(times) - max(times))))
-    # return limit_stats
-
-    limit_stats: Dict[str, int] = {}
-    for log in loglines:
-        if len(log.limits) > 0:
-            for lm in log.limits:
-                if not limit_stats.get(lm):
-                    limit_stats[lm] = 1
-                else:
-                    limit_stats[lm] += 1
-    return [
-        LimitStat(k, v, percent_time=(v / total_sec) * 100)
-        for k, v in limit_stats.items()
-    ]
-
-
-def get_stats(loglines: Iterable[LogLine]) -> LogStats:
-    # FIXME: extremely unoptimised implementaion, lots of repetaed
-    #       loops. Change to a single for loop
-    count = len(loglines)
-    if count <= 0:
-        raise ValueError("'loglines' cannot be empty.")
-
-    start_t = min(loglines, key=lambda x: x.time).time
-    end_t = max(loglines, key=lambda x: x.time).time
-
-    # logs are print per second
-    time_elapsed = timedelta(seconds=len(loglines))
-    # above_90 = [l.time for l in loglines if l.cpu_temp >= 90]
-    time_above_90 = timedelta(seconds=sum(log.cpu_temp >= 90 for log in loglines))
-    percent_above_90 = (
-        time_above_90.total_seconds() / time_elapsed.total_seconds()
-    ) * 100
-
-    max_cpu_temp = max(loglines, key=lambda x: x.cpu_temp).cpu_temp
-
-    avg_dict: Dict[str, float] = {}
-    for f in fields(LogLine):
-        if f.type == float:
-            avg_dict[f"avg_{f.name}"] = (
-                sum(log.__dict__[f.name] for log in loglines) / count
+
+class StatsAccumulator:
+    """
+    Builds :class:`LogStats` in a single pass with constant memory.
+
+    Feed it rows with :meth:`update`, whole frames with :meth:`update_batch`,
+    combine partial results (e.g. one per file) with :meth:`merge` and get the
+    final stats from :meth:`result`.
+
+    Every row is weighted by the time it covers (see
+    :func:`tslogs.timeline.sample_weights`), so duplicated rows, sleep gaps
+    and logging intervals other than 1 s do not skew durations, percentages
+    and averages. Rows are expected in about time order, the rows of the last
+    timestamp of a batch wait for the next batch to know their step.
+
+    With ``distributions`` the quantiles and histograms of
+    :data:`~tslogs.sketch.DISTRIBUTION_FIELDS` are kept as well, in mergeable
+    sketches of bounded size.
+    """
+
+    def __init__(self, distributions: bool = False, gap: int = DEFAULT_GAP) -> None:
+        self.count = 0
+        self.start_t: Optional[datetime] = None
+        self.end_t: Optional[datetime] = None
+        self.max_cpu_temp = -math.inf
+        self.gap = gap
+        # time weighted totals as (seconds of the rows with a known step,
+        # rows covering one sampling interval), see SampleWeights
+        self.elapsed = np.zeros(2)
+        self.above_90 = np.zeros(2)
+        self.sums: Dict[str, np.ndarray] = {name: np.zeros(2) for name in FLOAT_FIELDS}
+        self.limits: Dict[str, np.ndarray] = {}
+        self.steps: Dict[int, int] = {}
+        self.duplicates = 0
+        self.gaps = 0
+        self._tail: Optional[LogFrame] = None
+        # rows of update() not added yet
+        self._pending: List[LogLine] = []
+        self.digests: Optional[Dict[str, TDigest]] = None
+        self.histograms: Optional[Dict[str, Histogram]] = None
+        if distributions:
+            self.digests = {name: TDigest() for name in DISTRIBUTION_FIELDS}
+            self.histograms = {
+                name: Histogram(*HISTOGRAM_BINS[name]) for name in DISTRIBUTION_FIELDS
+            }
+
+    def _update_distributions(self, columns: Dict[str, np.ndarray]) -> None:
+        if self.digests is None:
+            return
+        for name in DISTRIBUTION_FIELDS:
+            self.digests[name].update(columns[name])
+            self.histograms[name].update(columns[name])
+
+    def _update_range(self, start_t: datetime, end_t: datetime) -> None:
+        if self.start_t is None or start_t < self.start_t:
+            self.start_t = start_t
+        if self.end_t is None or end_t > self.end_t:
+            self.end_t = end_t
+
+    def _add_steps(self, steps: Dict[int, int]) -> None:
+        for step, count in steps.items():
+            self.steps[step] = self.steps.get(step, 0) + count
+
+    def _add_limit(self, limit: str, secs: np.ndarray) -> None:
+        if secs.any():
+            self.limits[limit] = self.limits.get(limit, 0) + secs
+
+    def _add_weighted(
+        self, frame: LogFrame, next_time: Optional[np.datetime64] = None
+    ) -> None:
+        w = sample_weights(frame.time, next_time, self.gap)
+        weights = np.stack((w.closed, w.open))
+        self.elapsed += weights.sum(axis=1)
+        self.above_90 += weights @ (frame["cpu_temp"] >= 90)
+        for name in FLOAT_FIELDS:
+            self.sums[name] += weights @ frame[name]
+        for lm in frame.limit_names:
+            self._add_limit(lm, weights @ frame.limit_mask(lm))
+        self._add_steps(step_counts(w.steps))
+        self.duplicates += w.duplicates
+        self.gaps += len(w.gaps[0])
+
+    def update(self, log: LogLine) -> None:
+        # rows are added in batches, a frame per row would cost a sort each
+        self.count += 1
+        self._pending.append(log)
+        if len(self._pending) >= UPDATE_BATCH_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._pending:
+            rows, self._pending = self._pending, []
+            self._add_batch(LogFrame.from_loglines(rows))
+
+    def update_batch(self, columns: LogFrame) -> None:
+        if len(columns) == 0:
+            return
+        self._flush()
+        self.count += len(columns)
+        self._add_batch(columns)
+
+    def _add_batch(self, columns: LogFrame) -> None:
+        with stage("stats") as st:
+            st.add(len(columns))
+            self._update_range(columns.time.min().item(), columns.time.max().item())
+            self.max_cpu_temp = max(self.max_cpu_temp, float(columns["cpu_temp"].max()))
+            self._update_distributions(columns.columns)
+
+            if self._tail is not None:
+                columns = LogFrame.concat([self._tail, columns])
+            frame = columns.sort()
+            # the rows of the last timestamp wait for the step to the next one
+            cut = int(np.searchsorted(frame.time, frame.time[-1]))
+            if cut:
+                self._add_weighted(frame[:cut], frame.time[cut])
+            self._tail = frame.take(np.arange(cut, len(frame)))
+
+    def merge(self, other: "StatsAccumulator") -> "StatsAccumulator":
+        self._flush()
+        other._flush()
+        if other.count == 0:
+            return self
+        if self.count and (other.start_t - self.end_t).total_seconds() > self.gap:
+            self.gaps += 1
+        self.count += other.count
+        self._update_range(other.start_t, other.end_t)
+        self.max_cpu_temp = max(self.max_cpu_temp, other.max_cpu_temp)
+        self.elapsed += other.elapsed
+        self.above_90 += other.above_90
+        for name in FLOAT_FIELDS:
+            self.sums[name] += other.sums[name]
+        for lm, secs in other.limits.items():
+            self._add_limit(lm, secs)
+        self._add_steps(other.steps)
+        self.duplicates += other.duplicates
+        self.gaps += other.gaps
+        if self._tail is not None:
+            # the rows of the other accumulator do not follow these
+            self._add_weighted(self._tail)
+        self._tail = other._tail
+        if self.digests is not None and other.digests is not None:
+            for name in DISTRIBUTION_FIELDS:
+                self.digests[name].merge(other.digests[name])
+                self.histograms[name].merge(other.histograms[name])
+        return self
+
+    def result(self) -> LogStats:
+        if self.count <= 0:
+            raise ValueError("'loglines' cannot be empty.")
+        self._flush()
+        acc = self
+        if self._tail is not None:
+            # the last rows cover one interval, unless more rows come
+            acc = copy.deepcopy(self)
+            acc._add_weighted(acc._tail)
+            acc._tail = None
+
+        interval = sampling_interval(acc.steps)
+        scale = np.array([1.0, interval])
+        elapsed = float(acc.elapsed @ scale)
+        above_90 = float(acc.above_90 @ scale)
+        limits_stats = []
+        for lm, secs in acc.limits.items():
+            secs = float(secs @ scale)
+            limits_stats.append(
+                LimitStat(lm, round(secs), percent_time=(secs / elapsed) * 100)
             )
 
-    limits_stats = _get_limits_elasped(loglines, time_elapsed.total_seconds())
+        span = (self.end_t - self.start_t).total_seconds() + interval
+        timeline = TimelineStat(
+            interval=interval,
+            samples=self.count,
+            duplicates=acc.duplicates,
+            gaps=acc.gaps,
+            gap_time=timedelta(seconds=round(max(span - elapsed, 0))),
+            coverage=elapsed / span * 100,
+        )
+
+        quantiles = histograms = None
+        if self.digests is not None:
+            quantiles = {name: d.quantiles() for name, d in self.digests.items()}
+            histograms = {
+                name: HistogramStat(
+                    h.edges.tolist(), h.counts.tolist(), h.below, h.above
+                )
+                for name, h in self.histograms.items()
+            }
+
+        return LogStats(
+            time_range=(self.start_t, self.end_t),
+            time_elapsed=timedelta(seconds=round(elapsed)),
+            max_cpu_temp=self.max_cpu_temp,
+            time_above_90=timedelta(seconds=round(above_90)),
+            percent_above_90=(above_90 / elapsed) * 100,
+            limits=limits_stats,
+            timeline=timeline,
+            quantiles=quantiles,
+            histograms=histograms,
+            **{
+                f"avg_{name}": float(s @ scale) / elapsed
+                for name, s in acc.sums.items()
+            },
+        )
 
-    return LogStats(
-        time_range=(start_t, end_t),
-        time_elapsed=time_elapsed,
-        max_cpu_temp=max_cpu_temp,
-        time_above_90=time_above_90,
-        percent_above_90=percent_above_90,
-        limits=limits_stats,
-        **avg_dict,
+
+def parse_freq(freq: str) -> int:
+    """
+    Length in seconds of a rollup frequency, a count and a unit or one of
+    :data:`ROLLUP_PERIODS`.
+
+    >>> parse_freq("1h"), parse_freq("15min"), parse_freq("day")
+    (3600, 900, 86400)
+    """
+    match = _RE_FREQ.fullmatch(ROLLUP_PERIODS.get(freq, freq).strip())
+    if not match or match.group(1) == "0":
+        raise ValueError(
+            f"invalid frequency {freq!r}, use a count and one of {list(ROLLUP_UNITS)}"
+            f" or one of {list(ROLLUP_PERIODS)}"
+        )
+    return int(match.group(1) or 1) * ROLLUP_UNITS[match.group(2)]
+
+
+def _rollup_batch(frame: LogFrame, interval: int) -> Dict[int, StatsAccumulator]:
+    """
+    Accumulators of the rows of ``frame`` in every ``interval`` seconds period,
+    filled with one grouped reduction per column.
+    """
+    frame = frame.sort()
+    keys = bucket_index(frame.time, ROLLUP_ORIGIN, interval)
+    # rows are time sorted, so every period is a contiguous run of rows
+    starts = np.flatnonzero(np.diff(keys, prepend=keys[0] - 1))
+    ends = np.append(starts[1:], len(keys))
+    # periods are weighted on their own, as if no row followed them
+    w = sample_weights(frame.time, breaks=starts)
+    weights = np.stack((w.closed, w.open), axis=1)
+
+    def weighted(values: np.ndarray) -> np.ndarray:
+        return np.add.reduceat(weights * values[:, None], starts, axis=0)
+
+    elapsed = np.add.reduceat(weights, starts, axis=0)
+    above_90 = weighted(frame["cpu_temp"] >= 90)
+    max_cpu_temp = np.maximum.reduceat(frame["cpu_temp"], starts)
+    sums = {name: weighted(frame[name]) for name in FLOAT_FIELDS}
+    limits = {lm: weighted(frame.limit_mask(lm)) for lm in frame.limit_names}
+    duplicates = np.add.reduceat(
+        np.concatenate(([False], frame.time[1:] == frame.time[:-1])), starts
+    )
+    # steps and gaps are in time order too, each period is a slice of them
+    period_keys = keys[starts]
+    step_keys = bucket_index(w.step_times, ROLLUP_ORIGIN, interval)
+    step_ends = np.searchsorted(step_keys, period_keys, side="right")
+    step_starts = np.searchsorted(step_keys, period_keys, side="left")
+    gap_keys = bucket_index(w.gaps[0], ROLLUP_ORIGIN, interval)
+    gaps = np.searchsorted(gap_keys, period_keys, side="right") - np.searchsorted(
+        gap_keys, period_keys, side="left"
     )
+
+    out = {}
+    for i, key in enumerate(period_keys.tolist()):
+        acc = out[key] = StatsAccumulator()
+        acc.count = int(ends[i] - starts[i])
+        acc.start_t = frame.time[starts[i]].item()
+        acc.end_t = frame.time[ends[i] - 1].item()
+        acc.max_cpu_temp = float(max_cpu_temp[i])
+        acc.elapsed = elapsed[i]
+        acc.above_90 = above_90[i]
+        acc.sums = {name: col[i] for name, col in sums.items()}
+        for lm, secs in limits.items():
+            acc._add_limit(lm, secs[i])
+        acc.steps = step_counts(w.steps[step_starts[i] : step_ends[i]])
+        acc.duplicates = int(duplicates[i])
+        acc.gaps = int(gaps[i])
+    return out
+
+
+class RollupAccumulator:
+    """
+    :class:`StatsAccumulator` of every ``freq`` long period (see
+    :func:`parse_freq`), periods are aligned on mondays at midnight.
+    """
+
+    def __init__(self, freq: str = "1h") -> None:
+        self.interval = parse_freq(freq)
+        self.periods: Dict[int, StatsAccumulator] = {}
+
+    def update_batch(self, columns: LogFrame) -> None:
+        if len(columns) == 0:
+            return
+        with stage("rollups") as st:
+            st.add(len(columns))
+            for key, acc in _rollup_batch(columns, self.interval).items():
+                if key in self.periods:
+                    self.periods[key].merge(acc)
+                else:
+                    self.periods[key] = acc
+
+    def merge(self, other: "RollupAccumulator") -> "RollupAccumulator":
+        for key, acc in other.periods.items():
+            if key in self.periods:
+                self.periods[key].merge(acc)
+            else:
+                self.periods[key] = acc
+        return self
+
+    def result(self) -> Dict[datetime, LogStats]:
+        """Stats of every period with logs by period start, in time order."""
+        step = np.timedelta64(self.interval, "s")
+        return {
+            (ROLLUP_ORIGIN + key * step).item(): self.periods[key].result()
+            for key in sorted(self.periods)
+        }
+
+
+def _file_stats(
+    file_path: Union[PathLike, str],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+    cache: Optional[LogCache] = None,
+    distributions: bool = False,
+) -> StatsAccumulator:
+    acc = StatsAccumulator(distributions)
+    for frame in iter_frames([file_path], date_range, cache):
+        acc.update_batch(frame)
+    return acc
+
+
+def load_stats(
+    paths: Iterable[Union[str, PathLike]],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+    workers: Optional[int] = None,
+    cache: Optional[LogCache] = None,
+    distributions: bool = False,
+    on_conflict: Optional[str] = None,
+) -> StatsAccumulator:
+    """
+    Accumulate stats of the logs in ``paths`` file by file, possibly in a
+    process pool (see :func:`tslogs.parse.map_files`). Only the small per file
+    accumulators travel between processes, sketches included.
+
+    With an ``on_conflict`` policy overlapping paths are merged without
+    timestamps found in several paths instead (see
+    :func:`tslogs.parse.iter_merged_frames`), streamed in this process so
+    ``workers`` is not used.
+    """
+    acc = StatsAccumulator(distributions)
+    if on_conflict is not None:
+        for frame in iter_merged_frames(paths, date_range, on_conflict, cache):
+            acc.update_batch(frame)
+        return acc
+    files = get_files_in_date_range(paths, date_range, cache)
+    file_stats = partial(_file_stats, cache=cache, distributions=distributions)
+    for file_acc in map_files(file_stats, files, date_range, workers):
+        acc.merge(file_acc)
+    return acc
+
+
+def _file_rollups(
+    file_path: Union[PathLike, str],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+    freq: str = "1h",
+    cache: Optional[LogCache] = None,
+) -> RollupAccumulator:
+    acc = RollupAccumulator(freq)
+    for frame in iter_frames([file_path], date_range, cache):
+        acc.update_batch(frame)
+    return acc
+
+
+def load_rollups(
+    paths: Iterable[Union[str, PathLike]],
+    date_range: Optional[Tuple[datetime, datetime]] = None,
+    freq: str = "1h",
+    workers: Optional[int] = None,
+    cache: Optional[LogCache] = None,
+    on_conflict: Optional[str] = None,
+) -> RollupAccumulator:
+    """
+    :func:`load_stats` for every ``freq`` long period, files are read once.
+    """
+    acc = RollupAccumulator(freq)
+    if on_conflict is not None:
+        for frame in iter_merged_frames(paths, date_range, on_conflict, cache):
+            acc.update_batch(frame)
+        return acc
+    files = get_files_in_date_range(paths, date_range, cache)
+    file_rollups = partial(_file_rollups, freq=freq, cache=cache)
+    for file_acc in map_files(file_rollups, files, date_range, workers):
+        acc.merge(file_acc)
+    return acc
+
+
+def get_stats(
+    loglines: Union[LogFrame, Iterable[Union[LogLine, LogFrame]]],
+    distributions: bool = False,
+) -> LogStats:
+    """
+    Summarise logs in one pass, ``loglines`` can be a :class:`LogFrame` or any
+    iterable of :class:`LogLine` or :class:`LogFrame` chunks, so a streaming
+    parser can be fed without keeping the whole log in memory. Quantiles and
+    histograms are only computed with ``distributions``.
+    """
+    acc = StatsAccumulator(distributions)
+    if isinstance(loglines, LogFrame):
+        acc.update_batch(loglines)
+    else:
+        for item in loglines:
+            if isinstance(item, LogFrame):
+                acc.update_batch(item)
+            else:
+                acc.update(item)
+    return acc.result()
+
+
+def get_rollups(
+    loglines: Union[LogFrame, Iterable[Union[LogLine, LogFrame]]],
+    freq: str = "1h",
+) -> Dict[datetime, LogStats]:
+    """
+    :func:`get_stats` of every ``freq`` long period (``"1h"``, ``"15min"``,
+    ``"day"``, ... see :func:`parse_freq`) in one pass, keyed by period start.
+    Periods without logs are left out.
+    """
+    acc = RollupAccumulator(freq)
+    if isinstance(loglines, LogFrame):
+        acc.update_batch(loglines)
+    else:
+        rows = []
+        for item in loglines:
+            if isinstance(item, LogFrame):
+                acc.update_batch(item)
+            else:
+                rows.append(item)
+        acc.update_batch(LogFrame.from_loglines(rows))
+    return acc.result()
@@ -0,0 +1,218 @@
+"""
+Deterministic synthetic ThrottleStop logs, for benchmarks and tests.
+
+Every day is generated from ``(seed, day)`` alone, so any day of a long range
+comes out the same whichever days are generated with it::
+
+    python -m tslogs.synthetic OUT_DIR [--start 2020-01-01] [--days 365]
+"""
+
+import argparse
+from datetime import date, timedelta
+from os import PathLike
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+HEADER = (
+    b"   DATE       TIME    MULTI   C0%   CKMOD  CHIPM   BAT_mW  TEMP"
+    b"   NVIDIA GPU     VID   POWER"
+)
+# right aligned width and decimals of the columns after the time, in order
+COLUMN_FORMATS: Sequence[Tuple[str, int, int]] = (
+    ("multi", 7, 2),
+    ("c0", 7, 1),
+    ("clock_mod", 7, 1),
+    ("chip_mod", 7, 1),
+    ("battery_mw", 9, 0),
+    ("cpu_temp", 5, 0),
+    ("gpu_mhz", 8, 0),
+    ("gpu_temp", 6, 0),
+    ("vid", 9, 4),
+    ("power", 7, 1),
+)
+LIMIT_NAMES = ("TEMP", "PL2", "PL1", "EDP OTHER")
+# rows repeating the timestamp of the row before, as ThrottleStop writes some
+DUPLICATE_RATE = 0.01
+
+# limit tokens of every combination of LIMIT_NAMES bits
+_SUFFIXES = [
+    b"".join(b"   " + lm.encode() for i, lm in enumerate(LIMIT_NAMES) if f >> i & 1)
+    for f in range(1 << len(LIMIT_NAMES))
+]
+
+
+def _fixed(values: np.ndarray, width: int, decimals: int) -> np.ndarray:
+    """
+    Non negative ``values`` formatted ``%{width}.{decimals}f`` as a
+    ``(len(values), width)`` byte array, digits that do not fit are dropped.
+    """
+    rest = np.rint(np.abs(values) * 10.0**decimals).astype(np.int64)
+    out = np.full((len(values), width), ord(" "), dtype=np.uint8)
+    for k in range(width):
+        col = width - 1 - k
+        if decimals and k == decimals:
+            out[:, col] = ord(".")
+            continue
+        digit = (rest % 10).astype(np.uint8) + ord("0")
+        # integer digits are blank once the value is used up, but for units
+        shown = (k <= decimals + (decimals > 0)) | (rest > 0)
+        out[shown, col] = digit[shown]
+        rest //= 10
+    return out
+
+
+def _smooth(values: np.ndarray, span: int) -> np.ndarray:
+    """Exponential moving average over about ``span`` rows."""
+    kernel = np.exp(-np.arange(4 * span) / span)
+    padded = np.concatenate((np.full(len(kernel) - 1, values[0]), values))
+    return np.convolve(padded, kernel / kernel.sum(), mode="valid")
+
+
+def _sessions(
+    rng: np.random.Generator, max_sessions: int, mean_session: float
+) -> List[Tuple[int, int]]:
+    """Non overlapping (start, stop) seconds of the day with logging on."""
+    count = int(rng.integers(1, max_sessions + 1))
+    starts = np.sort(rng.integers(0, 86400, count))
+    lengths = rng.exponential(mean_session, count).astype(np.int64) + 60
+    sessions = []
+    last = 0
+    for start, length in zip(starts.tolist(), lengths.tolist()):
+        start = max(start, last + 60)
+        stop = min(start + length, 86400)
+        if stop > start:
+            sessions.append((start, stop))
+            last = stop
+    return sessions
+
+
+def _session_rows(rng: np.random.Generator, n: int) -> dict:
+    """Columns of ``n`` rows of one logging session."""
+    # load switches between idle, moderate and full every minute or two
+    segments = rng.exponential(90, n // 30 + 2).astype(np.int64) + 5
+    levels = rng.choice([0.05, 0.4, 1.0], len(segments), p=[0.5, 0.3, 0.2])
+    load = np.repeat(levels, segments)[:n]
+    load = np.resize(load, n) * rng.uniform(0.85, 1.0, n)
+    gpu_on = np.repeat(rng.random(len(segments)) < 0.3, segments)
+    gpu_on = np.resize(gpu_on, n)
+
+    cpu_temp = _smooth(42 + 55 * load, 20) + rng.normal(0, 1.5, n)
+    cpu_temp = np.clip(np.rint(cpu_temp), 30, 100)
+    hot = cpu_temp >= 90
+    power = np.clip(4 + 42 * load + rng.normal(0, 1.5, n), 0.5, 99)
+    # PL1 once the power has stayed high for a while, PL2 on short bursts
+    pl1 = _smooth(power, 28) > 35
+    multi = 8 + 32 * load - 6 * hot - 4 * pl1 + rng.normal(0, 0.3, n)
+    battery = rng.choice([0, rng.integers(3000, 40000)])
+
+    limits = np.zeros(n, dtype=np.uint8)
+    limits |= (hot & (rng.random(n) < 0.95)).astype(np.uint8)
+    limits |= ((power > 38) & ~pl1 & (rng.random(n) < 0.6)).astype(np.uint8) << 1
+    limits |= (pl1 & (rng.random(n) < 0.9)).astype(np.uint8) << 2
+    limits |= (rng.random(n) < 0.001).astype(np.uint8) << 3
+    return {
+        "multi": np.clip(multi, 8, 45),
+        "c0": np.clip(100 * load + rng.normal(0, 3, n), 0.1, 100),
+        "clock_mod": np.full(n, 100.0),
+        "chip_mod": np.full(n, 100.0),
+        "battery_mw": np.full(n, float(battery)),
+        "cpu_temp": cpu_temp,
+        "gpu_mhz": np.where(gpu_on, np.rint(rng.uniform(300, 1800, n)), 0),
+        "gpu_temp": np.where(gpu_on, np.rint(55 + 15 * load), 0),
+        "vid": np.clip(0.7 + 0.55 * load + rng.normal(0, 0.01, n), 0.5, 1.5),
+        "power": power,
+        "limits": limits,
+    }
+
+
+def generate_day(
+    day: date,
+    seed: int = 0,
+    interval: int = 1,
+    max_sessions: int = 3,
+    mean_session: float = 3 * 3600,
+) -> bytes:
+    """
+    One day of ThrottleStop log: up to ``max_sessions`` logging sessions of
+    about ``mean_session`` seconds, each starting with a header line, one row
+    every ``interval`` seconds with a few duplicated rows, limit tokens when
+    the simulated CPU runs hot or at its power limits, and gaps in between.
+    """
+    rng = np.random.default_rng([seed, day.toordinal()])
+    midnight = np.datetime64(day.isoformat(), "s")
+    lines: List[bytes] = []
+    for start, stop in _sessions(rng, max_sessions, mean_session):
+        seconds = np.arange(start, stop, interval)
+        seconds = np.sort(
+            np.concatenate(
+                (seconds, seconds[rng.random(len(seconds)) < DUPLICATE_RATE])
+            )
+        )
+        n = len(seconds)
+        columns = _session_rows(rng, n)
+
+        stamps = np.datetime_as_string(midnight + seconds, unit="s").astype("S19")
+        stamps = stamps.view(np.uint8).reshape(n, 19)
+        # "yyyy-mm-ddTHH:MM:SS" to "yyyy-mm-dd  HH:MM:SS"
+        parts = [stamps[:, :10], np.full((n, 2), ord(" "), np.uint8), stamps[:, 11:]]
+        for name, width, decimals in COLUMN_FORMATS:
+            parts.append(_fixed(columns[name], width, decimals))
+        rows = np.ascontiguousarray(np.hstack(parts))
+        rows = rows.view(f"S{rows.shape[1]}").ravel().tolist()
+        lines.append(HEADER)
+        lines += [
+            row + _SUFFIXES[f] for row, f in zip(rows, columns["limits"].tolist())
+        ]
+    return b"\n".join(lines) + b"\n" if lines else b""
+
+
+def generate_logs(
+    out_dir: Union[str, PathLike],
+    start: date,
+    days: int,
+    seed: int = 0,
+    interval: int = 1,
+    max_sessions: int = 3,
+    mean_session: float = 3 * 3600,
+) -> List[Path]:
+    """
+    Write ``days`` days of :func:`generate_day` logs from ``start`` into
+    ``out_dir`` as ``yyyy-mm-dd.txt`` files, returns their paths.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        path = out_dir / f"{day.isoformat()}.txt"
+        path.write_bytes(generate_day(day, seed, interval, max_sessions, mean_session))
+        paths.append(path)
+    return paths
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2020, 1, 1))
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--interval", type=int, default=1)
+    parser.add_argument("--sessions", type=int, default=3, help="most per day")
+    parser.add_argument("--session-hours", type=float, default=3, help="mean")
+    A = parser.parse_args(argv)
+    paths = generate_logs(
+        A.out_dir,
+        A.start,
+        A.days,
+        A.seed,
+        A.interval,
+        A.sessions,
+        A.session_hours * 3600,
+    )
+    print(f"{len(paths)} log files written to {A.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
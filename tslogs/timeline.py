@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# a step between two log rows longer than this many seconds is a gap (sleep,
+# hibernation, logging stopped), not a sampling interval
+DEFAULT_GAP = 30
+
+
+@dataclass
+class SampleWeights:
+    """
+    Time covered by every row of a sorted timestamp array.
+
+    A row covers the step to the next distinct timestamp, shared by the rows
+    with the same timestamp (duplicates, or faster than 1 s logging). Rows
+    before a gap and at the very end have no known step, they cover one
+    sampling interval: ``open`` counts them in intervals, ``closed`` has the
+    seconds of the others.
+    """
+
+    closed: np.ndarray
+    open: np.ndarray
+    # steps of at most ``gap`` seconds between distinct timestamps, and their
+    # start times
+    steps: np.ndarray
+    step_times: np.ndarray
+    # start and end times of the gaps
+    gaps: Tuple[np.ndarray, np.ndarray]
+    duplicates: int
+
+
+def sample_weights(
+    time: np.ndarray,
+    next_time: Optional[np.datetime64] = None,
+    gap: int = DEFAULT_GAP,
+    breaks: Optional[np.ndarray] = None,
+) -> SampleWeights:
+    """
+    :class:`SampleWeights` of the time sorted ``time``, ``next_time`` is the
+    timestamp following the last one if known. The rows before the ``breaks``
+    row indices (first rows of a timestamp) are weighted as if no row followed
+    them. O(n).
+    """
+    n = len(time)
+    if n == 0:
+        empty = np.empty(0)
+        return SampleWeights(
+            empty, empty, empty.astype(np.int64), time, (time, time), 0
+        )
+    new = np.empty(n, dtype=bool)
+    new[0] = True
+    np.not_equal(time[1:], time[:-1], out=new[1:])
+    starts = np.flatnonzero(new)
+    sizes = np.diff(starts, append=n)
+    times = time[starts]
+    if next_time is not None:
+        times = np.append(times, next_time)
+    steps = np.diff(times).astype(np.int64)
+    known = np.ones(len(steps), dtype=bool)
+    if breaks is not None:
+        known[np.searchsorted(starts, breaks[breaks > 0]) - 1] = False
+    closed = known & (steps <= gap)
+    is_gap = known & ~closed
+    if next_time is None:
+        # the last rows wait for a step that is not known
+        closed = np.append(closed, False)
+    seconds = np.where(closed, np.append(steps, 0)[: len(closed)], 0) / sizes
+    return SampleWeights(
+        np.repeat(seconds, sizes),
+        np.repeat(~closed / sizes, sizes),
+        steps[closed[: len(steps)]],
+        times[:-1][closed[: len(steps)]],
+        (times[:-1][is_gap], times[1:][is_gap]),
+        n - len(starts),
+    )
+
+
+def step_counts(steps: np.ndarray) -> Dict[int, int]:
+    """Histogram of steps in seconds."""
+    counts = np.bincount(steps)
+    return {int(s): int(counts[s]) for s in np.flatnonzero(counts)}
+
+
+def sampling_interval(steps: Dict[int, int]) -> int:
+    """Most common step between rows in seconds from a step histogram, 1 if none."""
+    if not steps:
+        return 1
+    return min(steps, key=lambda s: (-steps[s], s))
+
+
+@dataclass
+class Timeline:
+    start: datetime
+    end: datetime
+    samples: int
+    # rows sharing their timestamp with the previous row
+    duplicates: int
+    # most common step between rows, in seconds
+    interval: int
+    gaps: List[Tuple[datetime, datetime]]
+    # time covered by the rows, and its percentage of start to end
+    covered: timedelta
+    coverage: float
+
+
+def analyze_timeline(time: np.ndarray, gap: int = DEFAULT_GAP) -> Timeline:
+    """
+    Gaps, duplicates, sampling interval and coverage of a timestamp array.
+    """
+    if len(time) == 0:
+        raise ValueError("'time' cannot be empty.")
+    time = np.sort(time, kind="stable")
+    weights = sample_weights(time, gap=gap)
+    interval = sampling_interval(step_counts(weights.steps))
+    covered = weights.closed.sum() + weights.open.sum() * interval
+    span = (time[-1] - time[0]).astype(np.int64) + interval
+    return Timeline(
+        start=time[0].item(),
+        end=time[-1].item(),
+        samples=len(time),
+        duplicates=weights.duplicates,
+        interval=interval,
+        gaps=list(zip(weights.gaps[0].tolist(), weights.gaps[1].tolist())),
+        covered=timedelta(seconds=float(covered)),
+        coverage=float(covered / span * 100),
+    )